@@ -0,0 +1,38 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.config import JOB_WORKER_HEARTBEAT_SEC
+from app.jobs.job_queue import get_job_queue
+
+router = APIRouter()
+
+# GET: liveness — the process is up and serving requests
+@router.get("/live")
+def liveness():
+    return {"status": "ok"}
+
+# GET: readiness — at least one job worker has its models resident and is heartbeating
+@router.get("/ready")
+def readiness():
+    workers = get_job_queue().workers(max_age_sec=3 * JOB_WORKER_HEARTBEAT_SEC)
+    ready = [worker for worker in workers if worker.get("ready")]
+    errors = sorted({worker["error"] for worker in workers if worker.get("error")})
+
+    if not ready:
+        if not workers:
+            status = "no_workers"
+        else:
+            status = "failed" if errors else "loading"
+        return JSONResponse(
+            status_code=503,
+            content={"status": status, "workers": len(workers), "errors": errors},
+        )
+
+    return {
+        "status": "ready",
+        "workers": len(workers),
+        "ready_workers": len(ready),
+        "emotion_model": ready[0].get("emotion_model"),
+        "running_jobs": sum(worker.get("running", 0) for worker in workers),
+        "errors": errors,
+    }
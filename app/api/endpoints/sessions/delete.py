@@ -1,31 +1,22 @@
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 
+from app.core.cancellation import DELETED
 from app.db.session_db import SessionDB
-from app.storage.session_storage import SessionStorage
+from app.storage.session_storage import get_session_storage
+from app.jobs.handlers import cancel_session_and_wait
 from app.api.dependencies.auth import get_current_user
 
 router = APIRouter()
 session_db = SessionDB()
-session_storage = SessionStorage()
+session_storage = get_session_storage()
 
 class BulkDeleteRequest(BaseModel):
     session_ids: list[str]
 
-def delete_related_blobs(session: dict):
-    session_id = session["id"]
-
-    if session.get("audio_file_status") == "completed":
-        session_storage.delete_audio(session_id)
-
-    if session.get("transcript_status") == "completed":
-        session_storage.delete_transcript(session_id)
-
-    if session.get("summary_status") == "completed":
-        session_storage.delete_summary(session_id)
-
-    if session.get("emotion_breakdown_status") == "completed":
-        session_storage.delete_emotions(session_id)
+async def delete_related_blobs(session: dict):
+    # By prefix, not by status: failed runs and on-demand summary styles leave blobs too
+    await session_storage.delete_all_async(session["id"])
 
 @router.delete("/{session_id}")
 async def delete_session(session_id: str, current_user: dict = Depends(get_current_user)):
@@ -36,7 +27,9 @@ async def delete_session(session_id: str, current_user: dict = Depends(get_curre
         raise HTTPException(status_code=404, detail="Session not found or unauthorized")
 
     try:
-        delete_related_blobs(session)
+        # A running stage could still write blobs until its worker notices the cancel
+        await cancel_session_and_wait(session_id, reason=DELETED)
+        await delete_related_blobs(session)
         session_db.delete_session(session_id)
         return {"success": True}
     except Exception as e:
@@ -57,7 +50,8 @@ async def delete_multiple_sessions(
             if not session or session.get("user_id") != user_id:
                 failed_deletes.append(session_id)
                 continue
-            delete_related_blobs(session)
+            await cancel_session_and_wait(session_id, reason=DELETED)
+            await delete_related_blobs(session)
             session_db.delete_session(session_id)
         except Exception:
             failed_deletes.append(session_id)
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.db.session_db import SessionDB
-from app.storage.session_storage import SessionStorage
+from app.storage.session_storage import get_session_storage
 from app.api.dependencies.auth import get_current_user
 
 router = APIRouter()
 session_db = SessionDB()
-session_storage = SessionStorage()
+session_storage = get_session_storage()
 
 @router.get("/{session_id}")
 def get_emotions(session_id: str, current_user: dict = Depends(get_current_user)):
@@ -1,25 +1,41 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import FileResponse
 from app.db.session_db import SessionDB
-from app.storage.session_storage import SessionStorage
+from app.storage.session_storage import get_session_storage
+from app.services.summary.prompts import PromptStyle
 from app.utils.pdf import generate_session_pdf
 from app.api.dependencies.auth import get_current_user
 import requests
 
 router = APIRouter()
 session_db = SessionDB()
-session_storage = SessionStorage()
+session_storage = get_session_storage()
 
-# GET: text summary of a session
+def resolve_summary_blob(session: dict, style: Optional[PromptStyle]) -> Optional[str]:
+    # The default style is tracked in the session row; other styles live next to it under their own blob name
+    if style is None:
+        return session.get("summary_url")
+
+    blob_path = session_storage.summary_blob_path(session["id"], style.value)
+    if blob_path == session.get("summary_url") or session_storage.blob_exists(blob_path):
+        return blob_path
+    return None
+
+# GET: text summary of a session (optionally in a specific prompt style)
 @router.get("/{session_id}")
-def get_summary(session_id: str, current_user: dict = Depends(get_current_user)):
+def get_summary(session_id: str, style: Optional[PromptStyle] = None, current_user: dict = Depends(get_current_user)):
     session = session_db.get_session(session_id)
 
     if not session or session["user_id"] != current_user["id"]:
         raise HTTPException(status_code=404, detail="Summary not found or access denied")
 
     summary_status = session.get("summary_status")
-    summary_blob = session.get("summary_url")
+    summary_blob = resolve_summary_blob(session, style) if summary_status == "completed" else None
+
+    # A style that was never generated for this session is reported as not started
+    if summary_status == "completed" and style is not None and not summary_blob:
+        summary_status = "not_started"
 
     if summary_status != "completed" or not summary_blob:
         return {
@@ -39,13 +55,13 @@ def get_summary(session_id: str, current_user: dict = Depends(get_current_user))
 
 # GET: download summary as PDF
 @router.get("/{session_id}/download")
-def download_summary_pdf(session_id: str, current_user: dict = Depends(get_current_user)):
+def download_summary_pdf(session_id: str, style: Optional[PromptStyle] = None, current_user: dict = Depends(get_current_user)):
     session = session_db.get_session(session_id)
 
     if not session or session["user_id"] != current_user["id"]:
         raise HTTPException(status_code=404, detail="Session not found or access denied")
 
-    summary_blob = session.get("summary_url")
+    summary_blob = resolve_summary_blob(session, style)
     if not summary_blob:
         raise HTTPException(status_code=404, detail="Summary not yet generated")
 
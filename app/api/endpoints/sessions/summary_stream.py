@@ -0,0 +1,90 @@
+import json
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from app.core.config import SUMMARY_DEFAULT_STYLE
+from app.db.session_db import SessionDB
+from app.jobs.job_queue import get_job_queue
+from app.storage.session_storage import get_session_storage
+from app.services.summary.summarizer import Summarizer
+from app.services.summary.prompts import PromptStyle
+from app.api.dependencies.auth import get_current_user
+
+router = APIRouter()
+session_db = SessionDB()
+session_storage = get_session_storage()
+summarizer = Summarizer()
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+# GET: generate the summary and stream it as Server-Sent Events while the model writes it
+@router.get("/{session_id}/stream")
+def stream_summary(
+    session_id: str,
+    style: PromptStyle = PromptStyle.EMOTIONAL_STORY,
+    current_user: dict = Depends(get_current_user)
+):
+    session = session_db.get_session(session_id)
+
+    if not session or session["user_id"] != current_user["id"]:
+        raise HTTPException(status_code=404, detail="Session not found or access denied")
+
+    if session.get("transcript_status") != "completed" or session.get("emotion_breakdown_status") != "completed":
+        raise HTTPException(status_code=409, detail="Transcript and emotions must be completed before summarizing")
+
+    # The pipeline's summary stage writes the same blob and status; don't race it
+    if session.get("session_status") == "processing" or get_job_queue().is_active(session_id):
+        raise HTTPException(status_code=409, detail="Session is still being processed")
+
+    try:
+        transcript = session_storage.load_transcript(session_id)
+        emotions = session_storage.load_emotions(session_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to load session artifacts: {str(e)}")
+
+    # Only the default style is tracked on the session row; other styles are just extra blobs
+    is_default_style = style.value == SUMMARY_DEFAULT_STYLE
+
+    # A summary that was already stored stays usable if this stream never finishes
+    previous_status = "completed" if session.get("summary_url") else session.get("summary_status")
+
+    def event_stream():
+        if is_default_style:
+            session_db.set_status(session_id, "summary_status", "processing")
+        parts = []
+        settled = False
+
+        try:
+            for token in summarizer.stream_summary(transcript, emotions, style):
+                parts.append(token)
+                yield _sse("token", {"text": token})
+
+            # 💾 Persist the full text once the stream ends so regular GETs see it too
+            summary_blob = session_storage.store_summary(session_id, "".join(parts).strip(), style.value)
+            # Same shape as GET /summary/{id}: a readable URL, not the blob path
+            summary_url = session_storage.generate_sas_url(summary_blob)
+            if is_default_style:
+                session_db.transition(session_id, {"summary_url": summary_blob, "summary_status": "completed"})
+            settled = True
+            yield _sse("done", {"status": "completed", "data": summary_url})
+        except Exception as e:
+            if is_default_style:
+                session_db.set_status(session_id, "summary_status", "failed", error=str(e))
+            settled = True
+            print(f"❌ Streaming summarization failed: {e}")
+            yield _sse("error", {"status": "failed", "detail": str(e)})
+        finally:
+            # The client went away mid-stream (GeneratorExit at a yield): undo "processing"
+            if is_default_style and not settled:
+                session_db.set_status(session_id, "summary_status", previous_status)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Disable proxy buffering so tokens reach the client immediately
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
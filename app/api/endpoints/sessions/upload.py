@@ -1,21 +1,41 @@
-from fastapi import UploadFile, File, Form, HTTPException, Depends, BackgroundTasks, APIRouter
+from fastapi import UploadFile, File, Form, HTTPException, Depends, APIRouter
 from app.services.facade import DialogueProcessor
 from app.db.session_db import SessionDB
+from app.jobs.handlers import cancel_session, enqueue_session
+from app.jobs.admission import AdmissionRejected, get_admission
 from app.api.dependencies.auth import get_current_user
 
 router = APIRouter()
 processor = DialogueProcessor()
 session_db = SessionDB()
+admission = get_admission()
+
+
+def too_many_requests(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail={"message": e.reason, "retry_after": e.retry_after},
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def admit_or_429(user_id: str):
+    try:
+        admission.admit(user_id)
+    except AdmissionRejected as e:
+        raise too_many_requests(e)
 
 @router.post("/")
 async def create_session(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: str = Form(...),
     current_user: dict = Depends(get_current_user)
 ):
     user_id = current_user["id"]
 
+    # 🚦 Refuse before the upload if the user or the queue is saturated
+    admit_or_429(user_id)
+
     # ✅ Upload file and get session_id + blob path
     try:
         session_id, audio_path = processor.upload_audio_file(file=file)
@@ -51,11 +71,58 @@ async def create_session(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create session record: {str(e)}")
 
-    # ✅ Start background processing
-    background_tasks.add_task(
-        processor.process_audio,
-        session_id=session_id,
-        audio_path=audio_path
-    )
+    # ✅ Queue processing for the job workers (the limits are enforced again as the job is inserted)
+    try:
+        job_id = enqueue_session(session_id, audio_path=audio_path, owner=user_id, admit=True)
+    except AdmissionRejected as e:
+        # Another upload took the last place meanwhile; the stored audio can be resumed later
+        session_db.transition(session_id, {"session_status": "failed"}, error=e.reason)
+        raise too_many_requests(e)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to queue session processing: {str(e)}")
+
+    return {"session_id": session_id, "job_id": job_id, "queue_position": admission.position(job_id)}
+
+@router.post("/{session_id}/resume")
+async def resume_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    session = session_db.get_session(session_id)
+    if not session or session.get("user_id") != current_user["id"]:
+        raise HTTPException(status_code=404, detail="Session not found or unauthorized")
+
+    if session.get("session_status") == "completed":
+        return {"session_id": session_id, "status": "completed"}
+
+    # 🔁 Continue from the first stage without a checkpoint
+    try:
+        job_id = enqueue_session(session_id, resume=True, owner=current_user["id"], admit=True)
+    except AdmissionRejected as e:
+        raise too_many_requests(e)
+
+    return {
+        "session_id": session_id,
+        "status": "processing",
+        "job_id": job_id,
+        "queue_position": admission.position(job_id),
+    }
+
+@router.post("/{session_id}/cancel")
+async def cancel_session_processing(
+    session_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    session = session_db.get_session(session_id)
+    if not session or session.get("user_id") != current_user["id"]:
+        raise HTTPException(status_code=404, detail="Session not found or unauthorized")
+
+    # ⏹️ A queued session is dropped here; a running one is stopped by its worker
+    result = cancel_session(session_id)
+    if result is None:
+        return {"session_id": session_id, "status": session.get("session_status")}
+
+    if result == "cancelled":
+        session_db.transition(session_id, {"session_status": "cancelled"}, error="Processing cancelled")
 
-    return {"session_id": session_id}
\ No newline at end of file
+    return {"session_id": session_id, "status": result}
@@ -0,0 +1,79 @@
+"""
+alignment_bench.py
+
+Benchmarks transcript/emotion alignment used by `Summarizer.annotate_by_matching`.
+
+Usage:
+    python -m app.benchmarks.alignment_bench [--sizes 1000 10000 50000] [--legacy-max 2000]
+
+The legacy O(n·m) SequenceMatcher scan is only timed up to `--legacy-max` lines,
+since it takes hours at 50k.
+"""
+
+import argparse
+import random
+import time
+from difflib import SequenceMatcher
+
+from app.services.summary.aligner import EmotionAligner
+
+WORDS = ["okay", "yes", "no", "really", "I think", "we should", "maybe", "tomorrow", "great", "sorry",
+         "the budget", "honestly", "let's", "meeting", "deadline", "you know", "right", "exactly"]
+
+
+def synthetic_session(lines: int, seed: int = 42) -> tuple[list[dict], list[dict]]:
+    rng = random.Random(seed)
+    transcript, emotions = [], []
+    start = 0.0
+    for _ in range(lines):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 14)))
+        start = round(start + rng.uniform(0.5, 4.0), 2)
+        transcript.append({"speaker": rng.randint(1, 4), "text": text, "start_time": start, "end_time": start + 1})
+        if rng.random() < 0.97:
+            noisy = text + "." if rng.random() < 0.1 else text
+            emotions.append({"speaker": "1", "text": noisy, "start_time": start, "emotions": [{"label": "neutral", "score": 0.9}]})
+    return transcript, emotions
+
+
+def legacy_align(transcript, emotions, time_threshold=0.05, similarity_threshold=0.95):
+    matches = []
+    for t in transcript:
+        match = None
+        for e in emotions:
+            time_match = abs(float(t["start_time"]) - float(e["start_time"])) <= time_threshold
+            text_match = SequenceMatcher(None, t["text"].strip(), e["text"].strip()).ratio() >= similarity_threshold
+            if time_match and text_match:
+                match = e
+                break
+        matches.append(match)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript/emotion alignment")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000, 50000])
+    parser.add_argument("--legacy-max", type=int, default=2000)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        transcript, emotions = synthetic_session(size)
+
+        t0 = time.perf_counter()
+        matches = EmotionAligner(emotions).align(transcript)
+        indexed_sec = time.perf_counter() - t0
+        matched = sum(m is not None for m in matches)
+
+        line = f"📊 {size:>6} lines | indexed: {indexed_sec * 1000:9.1f} ms | matched {matched}/{size}"
+
+        if size <= args.legacy_max:
+            t0 = time.perf_counter()
+            legacy = legacy_align(transcript, emotions)
+            legacy_sec = time.perf_counter() - t0
+            agree = sum(a is b for a, b in zip(matches, legacy))
+            line += f" | legacy: {legacy_sec * 1000:9.1f} ms ({legacy_sec / indexed_sec:,.0f}x) | agreement {agree}/{size}"
+
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
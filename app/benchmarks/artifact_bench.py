@@ -0,0 +1,87 @@
+"""
+artifact_bench.py
+
+Benchmarks how session artifacts (transcript and emotions JSON) are prepared for upload.
+
+Usage:
+    python -m app.benchmarks.artifact_bench [--lines 50000] [--repeat 5]
+
+Compares the old path (indented json.dumps → temp file → reopen and read, as the blob SDK
+does) with the in-memory path of `SessionStorage`: compact stdlib JSON and, when installed,
+orjson. Upload latency is left out; the upload itself sends the bytes in either case.
+Reports time per artifact, payload size and peak Python allocation.
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any, Callable
+
+from app.benchmarks.alignment_bench import synthetic_session
+from app.storage import serialization
+
+
+def legacy_temp_file(content: Any) -> bytes:
+    with NamedTemporaryFile(delete=False, suffix=".json", mode="w", encoding="utf-8") as tmp:
+        tmp.write(json.dumps(content, indent=2))
+        tmp_path = Path(tmp.name)
+    try:
+        with open(tmp_path, "rb") as file:
+            return file.read()
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def compact_stdlib(content: Any) -> bytes:
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def measure(encode: Callable[[Any], bytes], content: Any, repeat: int) -> dict[str, float]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = encode(content)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    encode(content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"ms": statistics.median(times) * 1000, "kb": len(payload) / 1024, "peak_mb": peak / 2**20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark session artifact serialization")
+    parser.add_argument("--lines", nargs="+", type=int, default=[50000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    encoders: dict[str, Callable[[Any], bytes]] = {
+        "indent=2 + temp file": legacy_temp_file,
+        "compact json, in memory": compact_stdlib,
+    }
+    if serialization.orjson is not None:
+        encoders["orjson, in memory"] = serialization.dumps_json
+    else:
+        print("ℹ️ orjson is not installed; only the stdlib encoders are compared")
+
+    for lines in args.lines:
+        transcript, emotions = synthetic_session(lines)
+        for entry in emotions:
+            entry["emotions"] = [{"label": label, "score": 0.1} for label in ("joy", "anger", "neutral", "sadness")]
+
+        for name, content in (("transcript", transcript), ("emotions", emotions)):
+            print(f"\n=== {name}, {lines} lines ===")
+            print(f"{'encoder':<26}{'ms':>10}{'KB':>10}{'peak MB':>10}")
+            for label, encode in encoders.items():
+                result = measure(encode, content, args.repeat)
+                print(f"{label:<26}{result['ms']:>10.1f}{result['kb']:>10.0f}{result['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
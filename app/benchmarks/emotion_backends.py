@@ -0,0 +1,116 @@
+"""
+emotion_backends.py
+
+Compares the emotion classifier backends (eager PyTorch vs ONNX Runtime fp32 / int8)
+on accuracy and latency.
+
+Usage:
+    python -m app.benchmarks.emotion_backends [--transcript transcript.json] [--lines 500] [--batch-size 32]
+
+`--transcript` accepts the JSON stored by `SessionStorage.store_transcript`; without it a
+synthetic set of utterances is used. The PyTorch pipeline is the reference for accuracy.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+from pathlib import Path
+
+from app.services.emotions.model_registry import EMOTION_BACKENDS, EmotionModelRegistry
+
+SAMPLE_UTTERANCES = [
+    "I can't believe you did that again, this is the third time this week.",
+    "Thank you so much, that really means a lot to me.",
+    "Okay.",
+    "I'm honestly not sure what we should do about the budget next quarter.",
+    "That was hilarious, I haven't laughed like that in ages!",
+    "Please don't leave, I'm scared to be on my own tonight.",
+    "Ugh, the smell in that room was disgusting.",
+    "Wait, what? You got the job? That's amazing!",
+    "We need to ship the release by Friday, no excuses.",
+    "I miss her every single day.",
+]
+
+
+def load_texts(transcript_path: Path | None, lines: int) -> list[str]:
+    if transcript_path:
+        transcript = json.loads(transcript_path.read_text(encoding="utf-8"))
+        texts = [line["text"].strip() for line in transcript if line.get("text", "").strip()]
+        return texts[:lines]
+
+    rng = random.Random(42)
+    return [" ".join(rng.choice(SAMPLE_UTTERANCES) for _ in range(rng.randint(1, 4))) for _ in range(lines)]
+
+
+def top_label(scores: list[dict]) -> str:
+    return max(scores, key=lambda s: s["score"])["label"]
+
+
+def run_backend(backend: str, texts: list[str], batch_size: int) -> tuple[list[list[dict]], dict]:
+    load_start = time.perf_counter()
+    classifier = EmotionModelRegistry(backend=backend, top_k=None).load()
+    load_sec = time.perf_counter() - load_start
+
+    # Warm up kernels and allocator before timing
+    classifier(texts[:batch_size], batch_size=batch_size, truncation=True)
+
+    batch_latencies = []
+    outputs = []
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        t0 = time.perf_counter()
+        result = classifier(batch, batch_size=len(batch), truncation=True)
+        batch_latencies.append(time.perf_counter() - t0)
+        outputs.extend(result)
+
+    total = sum(batch_latencies)
+    stats = {
+        "load_sec": round(load_sec, 2),
+        "total_sec": round(total, 3),
+        "utterances_per_sec": round(len(texts) / total, 1) if total else None,
+        "p50_batch_ms": round(statistics.median(batch_latencies) * 1000, 1),
+        "p95_batch_ms": round(sorted(batch_latencies)[int(0.95 * (len(batch_latencies) - 1))] * 1000, 1),
+    }
+    return outputs, stats
+
+
+def compare(reference: list[list[dict]], candidate: list[list[dict]]) -> dict:
+    agree = sum(top_label(r) == top_label(c) for r, c in zip(reference, candidate))
+    diffs = []
+    for ref_scores, cand_scores in zip(reference, candidate):
+        cand_by_label = {s["label"]: s["score"] for s in cand_scores}
+        diffs.extend(abs(s["score"] - cand_by_label.get(s["label"], 0.0)) for s in ref_scores)
+
+    return {
+        "top1_agreement": round(agree / len(reference), 4) if reference else None,
+        "mean_abs_score_diff": round(statistics.mean(diffs), 5) if diffs else None,
+        "max_abs_score_diff": round(max(diffs), 5) if diffs else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare emotion classifier backends")
+    parser.add_argument("--transcript", type=Path, default=None)
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--backends", nargs="+", default=list(EMOTION_BACKENDS), choices=EMOTION_BACKENDS)
+    args = parser.parse_args()
+
+    texts = load_texts(args.transcript, args.lines)
+    print(f"🧪 Benchmarking {len(texts)} utterances, batch size {args.batch_size}")
+
+    reference = None
+    for backend in args.backends:
+        outputs, stats = run_backend(backend, texts, args.batch_size)
+        if reference is None:
+            reference = outputs
+            stats["reference"] = True
+        else:
+            stats.update(compare(reference, outputs))
+        print(f"📊 {backend}: {json.dumps(stats)}")
+
+
+if __name__ == "__main__":
+    main()
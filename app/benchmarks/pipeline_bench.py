@@ -0,0 +1,448 @@
+"""
+pipeline_bench.py
+
+Offline end-to-end benchmark of `DialogueProcessor.process_audio`.
+
+Every external service is replaced by an in-process fake with configurable latency:
+the Azure Speech batch REST API, Blob Storage, Azure OpenAI and the Supabase table client.
+The real pipeline code runs unchanged on top of them: stage graph, checkpoints, transcription
+poller, alignment, map-reduce summarization, rate limiter and status writes.
+
+Usage:
+    python -m app.benchmarks.pipeline_bench [--lines 100 1000 5000] [--sessions 20] [--concurrency 4]
+        [--speech-job-sec 2] [--blob-ms 30] [--openai-ms 800] [--supabase-ms 40] [--model fake|real]
+
+Reports sessions/min, p50/p95 latency per stage and external call, and peak RSS per transcript length.
+`--model real` runs the configured emotion model instead of a fake classifier (downloads it on first use).
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from app.benchmarks.alignment_bench import WORDS
+from app.core.metrics import timed
+from app.db.session_db import SessionDB
+from app.db.superbase.supabase_db import SupabaseDB
+from app.services.emotions.emotioner import Emotioner
+from app.services.facade import DialogueProcessor
+from app.services.summary.rate_limiter import AzureOpenAIRateLimiter
+from app.services.summary.summarizer import Summarizer
+from app.services.transcript.poller import TranscriptionPoller
+from app.services.transcript.transcriber import Transcriber
+from app.storage.session_storage import SessionStorage
+
+SPEECH_BASE = "https://fake-speech/speechtotext/v3.1/transcriptions"
+
+
+class Latency:
+    """Sleeps for `ms` ± `jitter` (fraction) to stand in for a network round-trip."""
+
+    def __init__(self, ms: float, jitter: float = 0.2, seed: int = 7):
+        self.ms = ms
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sleep(self, scale: float = 1.0):
+        if self.ms <= 0:
+            return
+        with self._lock:
+            factor = self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+        time.sleep(self.ms * scale * factor / 1000)
+
+
+# === Azure Speech batch transcription REST API ===
+
+class FakeResponse:
+    def __init__(self, payload: Any, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+        self.headers: dict[str, str] = {}
+        self.text = json.dumps(payload)
+
+    def json(self) -> Any:
+        return self._payload
+
+
+class FakeSpeechAPI:
+    """Implements the `requests.post/get` calls Transcriber and TranscriptionPoller make against Speech v3.1."""
+
+    def __init__(self, latency: Latency, job_seconds: float, lines_for_audio: dict[str, int]):
+        self.latency = latency
+        self.job_seconds = job_seconds
+        self.lines_for_audio = lines_for_audio  # SAS URL -> transcript lines to synthesize
+        self._jobs: dict[str, dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def post(self, url: str, headers=None, json=None, **kwargs) -> FakeResponse:
+        self.latency.sleep()
+        job_id = str(next(self._ids))
+        with self._lock:
+            self._jobs[job_id] = {"created": time.monotonic(), "audio": json["contentUrls"][0]}
+        return FakeResponse({"self": f"{SPEECH_BASE}/{job_id}", "status": "NotStarted"}, status_code=201)
+
+    def get(self, url: str, headers=None, **kwargs) -> FakeResponse:
+        self.latency.sleep()
+        job_id, _, rest = url[len(SPEECH_BASE) + 1:].partition("/")
+        job = self._jobs[job_id]
+
+        if rest == "":
+            done = time.monotonic() - job["created"] >= self.job_seconds
+            return FakeResponse({
+                "self": url,
+                "status": "Succeeded" if done else "Running",
+                "links": {"files": f"{url}/files"},
+            })
+        if rest == "files":
+            return FakeResponse({"values": [
+                {"kind": "TranscriptionReport", "links": {"contentUrl": f"{SPEECH_BASE}/{job_id}/report"}},
+                {"kind": "Transcription", "links": {"contentUrl": f"{SPEECH_BASE}/{job_id}/content"}},
+            ]})
+        return FakeResponse(self._result(job, seed=int(job_id)))
+
+    def _result(self, job: dict[str, Any], seed: int) -> dict[str, Any]:
+        rng = random.Random(seed)
+        phrases, offset_ms = [], 0
+        for _ in range(self.lines_for_audio.get(job["audio"], 100)):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 18))).capitalize() + "."
+            duration_ms = rng.randint(800, 6000)
+            phrases.append({
+                "speaker": rng.randint(1, 3),
+                "offsetMilliseconds": offset_ms,
+                "durationMilliseconds": duration_ms,
+                "nBest": [{"display": text}],
+            })
+            offset_ms += duration_ms + rng.randint(100, 1500)
+        return {"durationMilliseconds": offset_ms, "locale": "en-US", "recognizedPhrases": phrases}
+
+
+# === Blob Storage ===
+
+class FakeBlobService:
+    """In-memory stand-in for AzureBlobService."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.blobs: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @timed("blob", "upload")
+    def upload_file(self, tmp_path, blob_path: str) -> str:
+        data = tmp_path.read_bytes()
+        self.latency.sleep(1 + len(data) / 4_000_000)  # ~4 MB per round-trip worth of transfer
+        with self._lock:
+            self.blobs[blob_path] = data
+        return blob_path
+
+    @timed("blob", "upload")
+    def upload_bytes(self, data: bytes, blob_path: str, content_type: str = "application/octet-stream") -> str:
+        self.latency.sleep(1 + len(data) / 4_000_000)
+        with self._lock:
+            self.blobs[blob_path] = bytes(data)
+        return blob_path
+
+    def upload_uploadfile(self, file, blob_name: str, convert_to_wav: bool = True):
+        self.latency.sleep()
+        with self._lock:
+            self.blobs[blob_name] = file.file.read()
+        return blob_name
+
+    def generate_sas_url(self, blob_name: str) -> str:
+        return f"https://fake-blob/{blob_name}?sig=bench"
+
+    @timed("blob", "download")
+    def download_blob(self, blob_name: str) -> bytes:
+        self.latency.sleep()
+        return self.blobs[blob_name]
+
+    @timed("blob", "exists")
+    def blob_exists(self, blob_name: str) -> bool:
+        self.latency.sleep()
+        return blob_name in self.blobs
+
+    def delete_blob(self, blob_name: str):
+        self.latency.sleep()
+        with self._lock:
+            self.blobs.pop(blob_name, None)
+
+
+# === Azure OpenAI ===
+
+class FakeOpenAI:
+    """Answers `client.chat.completions.with_raw_response.create(...)` like the openai SDK does."""
+
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=SimpleNamespace(create=self._create)))
+
+    def _create(self, model: str, messages: list[dict[str, str]], max_tokens: int, stream: bool = False, **kwargs):
+        self.calls += 1
+        prompt_chars = sum(len(m["content"]) for m in messages)
+        # Time to first token grows with the prompt, generation with the completion budget
+        self.latency.sleep(0.5 + prompt_chars / 40_000 + max_tokens / 3000)
+
+        content = f"Summary of {prompt_chars} prompt characters."
+        completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+        return SimpleNamespace(headers={}, parse=lambda: completion)
+
+
+# === Supabase ===
+
+class FakeSupabaseQuery:
+    def __init__(self, table: "FakeSupabaseTable", action: str, data: Optional[dict] = None):
+        self.table = table
+        self.action = action
+        self.data = data
+        self.filters: dict[str, Any] = {}
+        self._single = False
+
+    def eq(self, key: str, value: Any) -> "FakeSupabaseQuery":
+        self.filters[key] = value
+        return self
+
+    def in_(self, key: str, values: list) -> "FakeSupabaseQuery":
+        self.filters[key] = set(values)
+        return self
+
+    def single(self) -> "FakeSupabaseQuery":
+        self._single = True
+        return self
+
+    def execute(self) -> SimpleNamespace:
+        return self.table.execute(self)
+
+
+class FakeSupabaseTable:
+    def __init__(self, latency: Latency):
+        self.latency = latency
+        self.rows: dict[str, dict[str, Any]] = {}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def insert(self, data: dict) -> FakeSupabaseQuery:
+        return FakeSupabaseQuery(self, "insert", data)
+
+    def update(self, data: dict) -> FakeSupabaseQuery:
+        return FakeSupabaseQuery(self, "update", data)
+
+    def select(self, _columns: str = "*") -> FakeSupabaseQuery:
+        return FakeSupabaseQuery(self, "select")
+
+    def delete(self) -> FakeSupabaseQuery:
+        return FakeSupabaseQuery(self, "delete")
+
+    def execute(self, query: FakeSupabaseQuery) -> SimpleNamespace:
+        self.latency.sleep()
+        with self._lock:
+            self.requests += 1
+            matches = [row for row in self.rows.values() if self._matches(row, query.filters)]
+
+            if query.action == "insert":
+                self.rows[query.data["id"]] = dict(query.data)
+                return SimpleNamespace(data=[dict(query.data)])
+            if query.action == "update":
+                for row in matches:
+                    row.update(query.data)
+                return SimpleNamespace(data=[dict(row) for row in matches])
+            if query.action == "delete":
+                for row in matches:
+                    del self.rows[row["id"]]
+                return SimpleNamespace(data=matches)
+            if query._single:
+                return SimpleNamespace(data=dict(matches[0]) if matches else None)
+            return SimpleNamespace(data=[dict(row) for row in matches])
+
+    @staticmethod
+    def _matches(row: dict[str, Any], filters: dict[str, Any]) -> bool:
+        return all(row.get(k) in v if isinstance(v, set) else row.get(k) == v for k, v in filters.items())
+
+
+class FakeSupabaseClient:
+    def __init__(self, latency: Latency):
+        self.tables: dict[str, FakeSupabaseTable] = {}
+        self.latency = latency
+
+    def table(self, name: str) -> FakeSupabaseTable:
+        return self.tables.setdefault(name, FakeSupabaseTable(self.latency))
+
+
+# === Emotion model ===
+
+class FakeEmotioner(Emotioner):
+    """Skips the model: a fixed cost per batch of utterances."""
+
+    def __init__(self, ms_per_batch: float, batch_size: int = 32):
+        super().__init__(batch_size=batch_size, use_inference_server=False)
+        self.ms_per_batch = ms_per_batch
+
+    def classify(self, texts: list[str]) -> list[list[dict[str, Any]]]:
+        batches = -(-len(texts) // self.batch_size)
+        time.sleep(batches * self.ms_per_batch / 1000)
+        return [[{"label": "neutral", "score": 0.8}, {"label": "joy", "score": 0.2}] for _ in texts]
+
+
+# === Harness ===
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS bytes
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+
+            info = psutil.Process().memory_info()
+            return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+        except ImportError:
+            return None
+
+
+def build_processor(args, lines_for_audio: dict[str, int]) -> tuple[DialogueProcessor, FakeSupabaseClient, FakeOpenAI]:
+    supabase = FakeSupabaseClient(Latency(args.supabase_ms))
+    blobs = FakeBlobService(Latency(args.blob_ms))
+    openai = FakeOpenAI(Latency(args.openai_ms))
+    speech = FakeSpeechAPI(Latency(args.speech_ms), args.speech_job_sec, lines_for_audio)
+
+    poller = TranscriptionPoller(min_interval=0.2, max_interval=2, http=speech)
+    emotioner = Emotioner() if args.model == "real" else FakeEmotioner(args.model_ms_per_batch)
+
+    processor = DialogueProcessor(
+        session_db=SessionDB(SupabaseDB("sessions", client=supabase)),
+        session_storage=SessionStorage(azure=blobs),
+        transcriber=Transcriber(azure=blobs, http=speech, poller=poller),
+        emotion_analyzer=emotioner,
+        summarizer=Summarizer(
+            client=openai,
+            rate_limiter=AzureOpenAIRateLimiter(args.openai_rpm, args.openai_tpm),
+            use_cache=False,
+        ),
+    )
+    return processor, supabase, openai
+
+
+def run_round(args, lines: int) -> dict[str, Any]:
+    lines_for_audio: dict[str, int] = {}
+    processor, supabase, openai = build_processor(args, lines_for_audio)
+    table = supabase.table("sessions")
+
+    session_ids = [f"bench-{lines}-{i}" for i in range(args.sessions)]
+    for session_id in session_ids:
+        audio_path = f"{session_id}/audio.wav"
+        lines_for_audio[processor.session_storage.generate_sas_url(audio_path)] = lines
+        table.rows[session_id] = {"id": session_id, "audio_file_url": audio_path, "session_status": "processing"}
+
+    stage_times: dict[str, list[float]] = {}
+    call_times: dict[str, list[float]] = {}
+    failed: list[str] = []
+
+    def process(session_id: str):
+        try:
+            ctx = processor.process_audio(session_id, f"{session_id}/audio.wav")
+        except Exception as e:
+            failed.append(session_id)
+            print(f"❌ {session_id}: {e}")
+            return
+
+        timings = ctx.timings.to_dict()
+        for stage, seconds in timings["stages"].items():
+            stage_times.setdefault(stage, []).append(seconds)
+        for span in timings["spans"]:
+            if span["kind"] == "call":
+                call_times.setdefault(span["name"], []).append(span["duration_sec"])
+
+    db_requests_before = table.requests
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(process, session_ids))
+    elapsed = time.perf_counter() - start
+    failures = len(failed)
+
+    return {
+        "lines": lines,
+        "sessions": args.sessions,
+        "failures": failures,
+        "elapsed_sec": round(elapsed, 2),
+        "sessions_per_min": round((args.sessions - failures) / elapsed * 60, 2),
+        "db_requests_per_session": round((table.requests - db_requests_before) / args.sessions, 1),
+        "openai_calls": openai.calls,
+        "stages": {name: _summary(values) for name, values in stage_times.items()},
+        "calls": {name: _summary(values) for name, values in sorted(call_times.items())},
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    return {
+        "p50": round(statistics.median(values), 3),
+        "p95": round(percentile(values, 95), 3),
+        "n": len(values),
+    }
+
+
+def print_round(result: dict[str, Any]):
+    rss = f"{result['peak_rss_mb']:.0f} MB" if result["peak_rss_mb"] is not None else "n/a"
+    print(f"\n=== {result['lines']} lines × {result['sessions']} sessions ===")
+    print(f"throughput: {result['sessions_per_min']} sessions/min  ({result['elapsed_sec']}s, {result['failures']} failed)")
+    print(f"supabase requests/session: {result['db_requests_per_session']}   openai calls: {result['openai_calls']}   peak RSS: {rss}")
+    print(f"{'span':<30}{'p50 s':>10}{'p95 s':>10}{'n':>8}")
+    for name, stats in [*result["stages"].items(), *result["calls"].items()]:
+        print(f"{name:<30}{stats['p50']:>10}{stats['p95']:>10}{stats['n']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs="+", default=[100, 1000, 5000], help="transcript lines per session")
+    parser.add_argument("--sessions", type=int, default=20, help="sessions per transcript length")
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions processed at once")
+    parser.add_argument("--speech-job-sec", type=float, default=2.0, help="time until a Speech job succeeds")
+    parser.add_argument("--speech-ms", type=float, default=60, help="Speech REST round-trip")
+    parser.add_argument("--blob-ms", type=float, default=30, help="Blob Storage round-trip")
+    parser.add_argument("--openai-ms", type=float, default=800, help="base Azure OpenAI completion latency")
+    parser.add_argument("--openai-rpm", type=int, default=600)
+    parser.add_argument("--openai-tpm", type=int, default=600_000)
+    parser.add_argument("--supabase-ms", type=float, default=40, help="Supabase update round-trip")
+    parser.add_argument("--model", choices=["fake", "real"], default="fake")
+    parser.add_argument("--model-ms-per-batch", type=float, default=25, help="fake emotion model cost per batch")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--verbose", action="store_true", help="show the pipeline's own log lines")
+    args = parser.parse_args()
+
+    results = []
+    for lines in args.lines:
+        # The pipeline logs every poll and payload; keep it out of the report unless asked for
+        with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+            results.append(run_round(args, lines))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for result in results:
+            print_round(result)
+
+
+if __name__ == "__main__":
+    main()
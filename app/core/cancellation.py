@@ -0,0 +1,149 @@
+"""
+cancellation.py
+
+Cooperative cancellation and deadlines for session processing.
+
+A `CancellationToken` is cancelled explicitly (the cancel API, a session being deleted) or
+when its deadline passes. Like the timing spans in metrics.py, the token of the session
+being processed travels in a context variable, so the poller wait, the emotion batches and
+the OpenAI calls can check it without every signature in between passing it along.
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import CancelledError, Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+DELETED = "deleted"
+
+
+class Cancelled(Exception):
+    """Processing stopped on request; `reason` is CANCELLED or DELETED."""
+
+    def __init__(self, reason: str = CANCELLED):
+        super().__init__(f"Processing {reason.replace('_', ' ')}")
+        self.reason = reason
+
+
+class DeadlineExceeded(Cancelled):
+    def __init__(self):
+        super().__init__(TIMED_OUT)
+
+
+class CancellationToken:
+    """
+    Thread-safe cancellation flag with an optional deadline.
+
+    A child token (`parent=...`) is cancelled together with its parent, so a worker's
+    job-level token and a session's deadline token can be combined.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, parent: Optional["CancellationToken"] = None):
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+        self._callbacks: list[Callable[[], Any]] = []
+        self._lock = threading.Lock()
+        if parent is not None:
+            if parent.deadline is not None:
+                self.deadline = min(self.deadline or parent.deadline, parent.deadline)
+            parent.on_cancel(lambda: self.cancel(parent.reason or CANCELLED))
+
+    @property
+    def cancelled(self) -> bool:
+        self._check_deadline()
+        return self._event.is_set()
+
+    def cancel(self, reason: str = CANCELLED):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Cancellation callback failed: {e}")
+
+    def on_cancel(self, callback: Callable[[], Any]) -> Callable[[], None]:
+        """Run `callback` once the token is cancelled (now, if it already is). Returns an unregister function."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise DeadlineExceeded() if self.reason == TIMED_OUT else Cancelled(self.reason)
+
+    def result(self, future: Future) -> Any:
+        """`future.result()` that gives up as soon as the token is cancelled or its deadline passes."""
+        unregister = self.on_cancel(future.cancel)
+        try:
+            return future.result(timeout=self.remaining())
+        except FutureTimeout:
+            self.cancel(TIMED_OUT)
+            raise DeadlineExceeded()
+        except CancelledError:
+            self.raise_if_cancelled()
+            raise
+        finally:
+            unregister()
+
+    def _check_deadline(self):
+        if self.deadline is not None and not self._event.is_set() and time.monotonic() >= self.deadline:
+            self.cancel(TIMED_OUT)
+
+    def _discard(self, callback: Callable[[], Any]):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+
+_token: contextvars.ContextVar[Optional[CancellationToken]] = contextvars.ContextVar("cancellation_token", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: Optional[CancellationToken]) -> Iterator[Optional[CancellationToken]]:
+    """Make `token` the current token on this thread (and in contexts copied from it)."""
+    reset = _token.set(token)
+    try:
+        yield token
+    finally:
+        _token.reset(reset)
+
+
+def current_token() -> Optional[CancellationToken]:
+    return _token.get()
+
+
+def check_cancelled():
+    """Raise Cancelled / DeadlineExceeded if the current session's processing should stop."""
+    token = _token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def wait_result(future: Future) -> Any:
+    """Wait for `future`, bounded by the current token if there is one."""
+    token = _token.get()
+    return token.result(future) if token is not None else future.result()
+
+
+def outcome_status(error: BaseException) -> str:
+    """Status to record for a stage or session that stopped with `error`."""
+    return error.reason if isinstance(error, Cancelled) else "failed"
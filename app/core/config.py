@@ -26,13 +26,44 @@ SPEECH_KEY = os.getenv("SPEECH_KEY")
 REGION = os.getenv("REGION")
 AZURE_CONTAINER_URL = os.getenv("AZURE_CONTAINER_URL")
 
+# === Azure Speech job polling ===
+TRANSCRIPTION_POLL_MIN_INTERVAL_SEC = float(os.getenv("TRANSCRIPTION_POLL_MIN_INTERVAL_SEC", "2"))
+TRANSCRIPTION_POLL_MAX_INTERVAL_SEC = float(os.getenv("TRANSCRIPTION_POLL_MAX_INTERVAL_SEC", "30"))
+TRANSCRIPTION_POLL_BACKOFF = float(os.getenv("TRANSCRIPTION_POLL_BACKOFF", "1.5"))
+TRANSCRIPTION_POLL_MAX_CONCURRENT_REQUESTS = int(os.getenv("TRANSCRIPTION_POLL_MAX_CONCURRENT_REQUESTS", "8"))
+
 # === Azure Blob Storage ===
 AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 AZURE_CONTAINER_NAME = os.getenv("AZURE_CONTAINER_NAME")
 
+# === Azure Blob client (one pooled client per process, sync and async) ===
+AZURE_BLOB_POOL_SIZE = int(os.getenv("AZURE_BLOB_POOL_SIZE", "32"))  # HTTP connections kept open
+AZURE_BLOB_CONNECTION_TIMEOUT_SEC = float(os.getenv("AZURE_BLOB_CONNECTION_TIMEOUT_SEC", "10"))
+AZURE_BLOB_READ_TIMEOUT_SEC = float(os.getenv("AZURE_BLOB_READ_TIMEOUT_SEC", "120"))
+AZURE_BLOB_RETRY_TOTAL = int(os.getenv("AZURE_BLOB_RETRY_TOTAL", "3"))
+
+# === SAS URLs (expiries are rounded up to SAS_EXPIRY_BUCKET_MIN so repeated requests get the same URL) ===
+SAS_TTL_MIN = int(os.getenv("SAS_TTL_MIN", "60"))
+SAS_EXPIRY_BUCKET_MIN = int(os.getenv("SAS_EXPIRY_BUCKET_MIN", "10"))
+SAS_REFRESH_MARGIN_MIN = int(os.getenv("SAS_REFRESH_MARGIN_MIN", "15"))  # re-sign when less than this is left
+SAS_CACHE_SIZE = int(os.getenv("SAS_CACHE_SIZE", "10000"))
+SAS_BLOB_CACHE_CONTROL = os.getenv("SAS_BLOB_CACHE_CONTROL", "no-cache")  # revalidate by ETag, since URLs repeat
+
 # === Text-based emotion model ===
 TEXT_EMOTION_MODEL = os.getenv("TEXT_EMOTION_MODEL", "j-hartmann/emotion-english-distilroberta-base")
 TOP_K_EMOTIONS = os.getenv("TOP_K_EMOTIONS")  # can convert to int later if needed
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "32"))  # utterances per forward pass
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "torch")  # torch | onnx | onnx-int8
+EMOTION_ONNX_CACHE_DIR = Path(os.getenv("EMOTION_ONNX_CACHE_DIR", PROJECT_ROOT / ".model_cache" / "onnx"))
+EMOTION_ONNX_THREADS = int(os.getenv("EMOTION_ONNX_THREADS", "0"))  # 0 = let ONNX Runtime decide
+EMOTION_MODEL_PRELOAD = os.getenv("EMOTION_MODEL_PRELOAD", "true").lower() == "true"  # job workers load it before their first job
+
+# === Emotion inference server (cross-session micro-batching) ===
+EMOTION_INFERENCE_SERVER = os.getenv("EMOTION_INFERENCE_SERVER", "false").lower() == "true"
+EMOTION_SERVER_WORKERS = int(os.getenv("EMOTION_SERVER_WORKERS", "1"))
+EMOTION_SERVER_BATCH_WINDOW_MS = float(os.getenv("EMOTION_SERVER_BATCH_WINDOW_MS", "10"))
+EMOTION_SERVER_MAX_BATCH = int(os.getenv("EMOTION_SERVER_MAX_BATCH", "64"))
+EMOTION_SERVER_TORCH_THREADS = int(os.getenv("EMOTION_SERVER_TORCH_THREADS", "0"))  # 0 = cores / workers
 
 # === Azure OpenAI for Summary Generation ===
 AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY")
@@ -40,6 +71,77 @@ AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT")
 AZURE_OPENAI_DEPLOYMENT = os.getenv("AZURE_OPENAI_DEPLOYMENT")
 AZURE_OPENAI_API_VERSION = os.getenv("AZURE_OPENAI_API_VERSION")
 
+# === Summary generation limits ===
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "1500"))  # completion tokens for the final summary
+SUMMARY_TOKEN_BUDGET = int(os.getenv("SUMMARY_TOKEN_BUDGET", "12000"))  # prompt tokens before switching to map-reduce
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "6000"))  # transcript tokens per map chunk
+SUMMARY_MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+SUMMARY_MAP_MAX_TOKENS = int(os.getenv("SUMMARY_MAP_MAX_TOKENS", "600"))  # completion tokens per chunk summary
+SUMMARY_MAX_MAP_ROUNDS = int(os.getenv("SUMMARY_MAX_MAP_ROUNDS", "3"))  # map passes before reducing whatever is left
+SUMMARY_TEMPERATURE = float(os.getenv("SUMMARY_TEMPERATURE", "0.7"))
+SUMMARY_MAX_RETRIES = int(os.getenv("SUMMARY_MAX_RETRIES", "5"))
+SUMMARY_DEFAULT_STYLE = os.getenv("SUMMARY_DEFAULT_STYLE", "emotional_story")  # stored as "<session>/summary"
+SUMMARY_STYLES = [s.strip() for s in os.getenv("SUMMARY_STYLES", SUMMARY_DEFAULT_STYLE).split(",") if s.strip()]  # generated by the pipeline
+
+# === Azure OpenAI deployment quota (client-side rate limiting) ===
+AZURE_OPENAI_RPM = int(os.getenv("AZURE_OPENAI_RPM", "60"))
+AZURE_OPENAI_TPM = int(os.getenv("AZURE_OPENAI_TPM", "60000"))
+# Keep the RPM/TPM buckets in the job queue database so every worker process draws from one quota;
+# with false each process gets the full quota to itself
+AZURE_OPENAI_SHARED_QUOTA = os.getenv("AZURE_OPENAI_SHARED_QUOTA", "true").lower() == "true"
+
+# === Summary cache ===
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+SUMMARY_CACHE_PATH = Path(os.getenv("SUMMARY_CACHE_PATH", PROJECT_ROOT / ".cache" / "summaries.sqlite3"))
+SUMMARY_CACHE_MAX_MB = float(os.getenv("SUMMARY_CACHE_MAX_MB", "256"))
+
+# === Prometheus metrics ===
+# Give each run a metrics directory shared with its job worker processes, so /metrics includes them
+# (ignored when PROMETHEUS_MULTIPROC_DIR is set explicitly)
+PROMETHEUS_MULTIPROCESS = os.getenv("PROMETHEUS_MULTIPROCESS", "true").lower() == "true"
+PROMETHEUS_MULTIPROC_ROOT = Path(os.getenv("PROMETHEUS_MULTIPROC_ROOT", PROJECT_ROOT / ".cache" / "prometheus"))
+
+# === Session pipeline ===
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "4"))  # stages of one session run in parallel
+SESSION_DEADLINE_SEC = float(os.getenv("SESSION_DEADLINE_SEC", "3600"))  # per processing attempt, 0 = no deadline
+
+# === Session status writes ===
+SESSION_STATUS_WRITE_BEHIND = os.getenv("SESSION_STATUS_WRITE_BEHIND", "false").lower() == "true"
+SESSION_STATUS_FLUSH_INTERVAL_SEC = float(os.getenv("SESSION_STATUS_FLUSH_INTERVAL_SEC", "1"))
+
+# === Job queue (session processing workers) ===
+def _parse_caps(value: str) -> dict[str, int]:
+    # "emotions=2,summary=4" -> {"emotions": 2, "summary": 4}
+    caps = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, cap = item.split("=", 1)
+            caps[name.strip()] = int(cap)
+    return caps
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+JOB_QUEUE_PATH = Path(os.getenv("JOB_QUEUE_PATH", PROJECT_ROOT / ".cache" / "jobs.sqlite3"))
+JOB_VISIBILITY_TIMEOUT_SEC = float(os.getenv("JOB_VISIBILITY_TIMEOUT_SEC", "300"))  # lease, renewed while a job runs
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BACKOFF_SEC = float(os.getenv("JOB_RETRY_BACKOFF_SEC", "30"))  # doubled after every failed attempt
+JOB_POLL_INTERVAL_SEC = float(os.getenv("JOB_POLL_INTERVAL_SEC", "1"))
+JOB_WORKER_PROCESSES = int(os.getenv("JOB_WORKER_PROCESSES", "2"))  # default for `python -m app.jobs worker`
+JOB_EMBEDDED_WORKERS = int(os.getenv("JOB_EMBEDDED_WORKERS", "1"))  # workers started by the API; 0 in production
+JOB_KIND_CONCURRENCY = _parse_caps(os.getenv("JOB_KIND_CONCURRENCY", ""))  # e.g. "process_audio=8"
+JOB_STAGE_CONCURRENCY = _parse_caps(os.getenv("JOB_STAGE_CONCURRENCY", ""))  # e.g. "emotions=2,summary=4"
+JOB_CANCEL_POLL_SEC = float(os.getenv("JOB_CANCEL_POLL_SEC", "1"))  # how soon a worker notices a cancel request
+# how long deleting a session waits for its running job to stop before removing the blobs
+JOB_CANCEL_WAIT_SEC = float(os.getenv("JOB_CANCEL_WAIT_SEC", str(max(10.0, 10 * JOB_CANCEL_POLL_SEC))))
+JOB_WORKER_HEARTBEAT_SEC = float(os.getenv("JOB_WORKER_HEARTBEAT_SEC", "5"))  # workers silent for 3x this are gone
+
+# === Upload admission control (0 disables a limit) ===
+JOB_MAX_IN_FLIGHT = int(os.getenv("JOB_MAX_IN_FLIGHT", "8"))  # sessions processed at once, all users
+JOB_USER_MAX_RUNNING = int(os.getenv("JOB_USER_MAX_RUNNING", "2"))  # sessions processed at once per user
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "500"))  # waiting sessions before uploads get a 429
+JOB_USER_MAX_QUEUED = int(os.getenv("JOB_USER_MAX_QUEUED", "10"))  # waiting + running sessions per user
+# jobs each worker process runs at once on threads; processes only add CPU isolation
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", str(JOB_MAX_IN_FLIGHT or 8)))
+
 # === Superbase ===
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -49,4 +151,10 @@ supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 # === Audio settings ===
 SAMPLE_RATE = 16000
 CHUNK_DURATION_SEC = 5
-OVERLAP_DURATION_SEC = 1.5
\ No newline at end of file
+OVERLAP_DURATION_SEC = 1.5
+
+# === Streaming audio ingest (upload → ffmpeg → staged blob blocks) ===
+AUDIO_STREAMING_INGEST = os.getenv("AUDIO_STREAMING_INGEST", "true").lower() == "true"
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+AUDIO_UPLOAD_BLOCK_MB = float(os.getenv("AUDIO_UPLOAD_BLOCK_MB", "4"))  # size of each staged block
+AUDIO_UPLOAD_CONCURRENCY = int(os.getenv("AUDIO_UPLOAD_CONCURRENCY", "4"))  # blocks staged in parallel
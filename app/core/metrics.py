@@ -0,0 +1,242 @@
+"""
+metrics.py
+
+Timing spans for the session pipeline.
+
+Every span feeds a Prometheus histogram (served on `/metrics`) and, when a session is being
+processed on the current thread, that session's `SessionTimings` record, which is stored
+next to the session artifacts. The summary cache and the Azure OpenAI rate limiter report
+their counters here too. prometheus_client is optional; without it only the per-session
+records are kept.
+
+Sessions are processed in job worker processes, so by default every run gets a
+PROMETHEUS_MULTIPROC_DIR (under PROMETHEUS_MULTIPROC_ROOT) before prometheus_client is
+imported. Spawned workers inherit it and write their samples there, and `/metrics` in the
+parent aggregates every process.
+"""
+
+import contextvars
+import functools
+import importlib.util
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator, Optional
+
+from app.core.config import PROMETHEUS_MULTIPROC_ROOT, PROMETHEUS_MULTIPROCESS
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill would terminate the process; leave old directories alone
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _use_multiprocess_dir():
+    # Must run before prometheus_client is imported: it picks its value storage on import
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR") or not PROMETHEUS_MULTIPROCESS:
+        return
+    if importlib.util.find_spec("prometheus_client") is None:
+        return
+
+    PROMETHEUS_MULTIPROC_ROOT.mkdir(parents=True, exist_ok=True)
+    for run_dir in PROMETHEUS_MULTIPROC_ROOT.iterdir():
+        if run_dir.name.isdigit() and not _pid_alive(int(run_dir.name)):
+            shutil.rmtree(run_dir, ignore_errors=True)
+
+    # A fresh directory per run, so counters never carry over from a previous one
+    run_dir = PROMETHEUS_MULTIPROC_ROOT / str(os.getpid())
+    shutil.rmtree(run_dir, ignore_errors=True)
+    run_dir.mkdir()
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = str(run_dir)
+
+
+_use_multiprocess_dir()
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+    from prometheus_client import multiprocess
+except ImportError:  # metrics endpoint disabled, spans still time the session
+    Histogram = None
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+if Histogram is not None:
+    STAGE_SECONDS = Histogram(
+        "dialoguedna_stage_seconds",
+        "Wall time of session pipeline stages",
+        ["stage", "outcome"],
+        buckets=LATENCY_BUCKETS,
+    )
+    CALL_SECONDS = Histogram(
+        "dialoguedna_call_seconds",
+        "Latency of calls to external services (Speech, Blob Storage, OpenAI, Supabase) and the emotion model",
+        ["service", "operation", "outcome"],
+        buckets=LATENCY_BUCKETS,
+    )
+    SUMMARY_CACHE_EVENTS = Counter(
+        "dialoguedna_summary_cache_events",
+        "Summary cache lookups (hit, miss) and evictions",
+        ["event"],
+    )
+    OPENAI_QUEUE_DEPTH = Gauge(
+        "dialoguedna_openai_limiter_queue_depth",
+        "Summary calls waiting for Azure OpenAI rate limit capacity",
+        multiprocess_mode="livesum",
+    )
+    OPENAI_THROTTLED = Counter(
+        "dialoguedna_openai_throttled",
+        "429 responses from Azure OpenAI that paused the rate limiter",
+    )
+
+
+class SessionTimings:
+    """Structured timing record of one pipeline run."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._spans: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add(self, span: dict[str, Any]):
+        with self._lock:
+            self._spans.append(span)
+
+    def to_dict(self) -> dict[str, Any]:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda s: s["start_sec"])
+
+        calls: dict[str, dict[str, float]] = {}
+        for s in spans:
+            if s["kind"] == "call":
+                entry = calls.setdefault(s["name"], {"count": 0, "total_sec": 0.0})
+                entry["count"] += 1
+                entry["total_sec"] = round(entry["total_sec"] + s["duration_sec"], 4)
+
+        return {
+            "session_id": self.session_id,
+            "started_at": self.started_at.isoformat(),
+            "total_sec": round(time.perf_counter() - self._start, 4),
+            "stages": {s["name"]: s["duration_sec"] for s in spans if s["kind"] == "stage"},
+            "calls": calls,
+            "spans": spans,
+        }
+
+    def relative(self, perf_counter: float) -> float:
+        return round(perf_counter - self._start, 4)
+
+
+_timings: contextvars.ContextVar[Optional[SessionTimings]] = contextvars.ContextVar("session_timings", default=None)
+_parent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("parent_span", default=None)
+
+
+@contextmanager
+def record_timings(timings: SessionTimings) -> Iterator[SessionTimings]:
+    """Attribute spans opened on this thread (and in contexts copied from it) to `timings`."""
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+@contextmanager
+def _span(kind: str, name: str, observe: Callable[[str, float], None], **attrs: Any) -> Iterator[None]:
+    start = time.perf_counter()
+    parent = _parent.get()
+    token = _parent.set(name)
+    outcome = "ok"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _parent.reset(token)
+        duration = time.perf_counter() - start
+        observe(outcome, duration)
+
+        timings = _timings.get()
+        if timings is not None:
+            timings.add({
+                "kind": kind,
+                "name": name,
+                "parent": parent,
+                "start_sec": timings.relative(start),
+                "duration_sec": round(duration, 4),
+                "outcome": outcome,
+                **attrs,
+            })
+
+
+def stage_span(stage: str):
+    """Time one pipeline stage."""
+    def observe(outcome: str, duration: float):
+        if Histogram is not None:
+            STAGE_SECONDS.labels(stage=stage, outcome=outcome).observe(duration)
+    return _span("stage", stage, observe)
+
+
+def call_span(service: str, operation: str, **attrs: Any):
+    """Time one call to an external service or model."""
+    def observe(outcome: str, duration: float):
+        if Histogram is not None:
+            CALL_SECONDS.labels(service=service, operation=operation, outcome=outcome).observe(duration)
+    return _span("call", f"{service}.{operation}", observe, **attrs)
+
+
+def timed(service: str, operation: str):
+    """Decorator form of `call_span`."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with call_span(service, operation):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count_summary_cache(event: str, amount: int = 1):
+    """Count a summary cache `hit`, `miss` or `eviction`."""
+    if Histogram is not None:
+        SUMMARY_CACHE_EVENTS.labels(event=event).inc(amount)
+
+
+def set_openai_queue_depth(depth: int):
+    if Histogram is not None:
+        OPENAI_QUEUE_DEPTH.set(depth)
+
+
+def count_openai_throttled():
+    if Histogram is not None:
+        OPENAI_THROTTLED.inc()
+
+
+def mark_process_dead(pid: int):
+    """Drop an exited worker's live gauges (e.g. its rate limiter queue depth) from the aggregate."""
+    if Histogram is not None and os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def metrics_payload() -> tuple[bytes, str]:
+    """Render the Prometheus exposition. With PROMETHEUS_MULTIPROC_DIR set, job worker processes are included."""
+    if Histogram is None:
+        return b"# prometheus_client is not installed\n", "text/plain; charset=utf-8"
+
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
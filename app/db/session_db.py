@@ -1,9 +1,9 @@
-from typing import Optional, Any
+from typing import Optional, Any, Iterator
 from app.db.superbase.supabase_db import SupabaseDB
 
 class SessionDB:
-    def __init__(self):
-        self.db = SupabaseDB("sessions")
+    def __init__(self, db: Optional[SupabaseDB] = None):
+        self.db = db or SupabaseDB("sessions")
 
     def create_session(self, data: dict) -> str:
         response = self.db.insert(data)
@@ -15,7 +15,15 @@ class SessionDB:
         self.db.update({"id": session_id}, updates)
 
     def set_status(self, session_id: str, field: str, value: Any, error: Optional[str] = None):
-        updates = {field: value, "processing_error": error}
+        self.transition(session_id, {field: value}, error=error)
+
+    def transition(self, session_id: str, updates: dict[str, Any], error: Optional[str] = None):
+        """
+        Apply several field changes in a single update.
+        `processing_error` is only written when an error is given; clear it explicitly with None.
+        """
+        if error is not None:
+            updates = {**updates, "processing_error": error}
         self.db.update({"id": session_id}, updates)
 
     def get_session(self, session_id: str) -> dict:
@@ -26,6 +34,16 @@ class SessionDB:
         response = self.db.select_many({"user_id": user_id})
         return response.data
 
+    def iter_sessions(self, filters: dict, page_size: int = 500) -> Iterator[dict]:
+        """Yield every session matching `filters`, paging past PostgREST's row limit in id order."""
+        start = 0
+        while True:
+            rows = self.db.select_page(filters, start, start + page_size - 1).data or []
+            yield from rows
+            if len(rows) < page_size:
+                return
+            start += page_size
+
     def delete_session(self, session_id: str):
         try:
             response = self.db.delete({"id": session_id})
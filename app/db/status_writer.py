@@ -0,0 +1,76 @@
+import threading
+import time
+from typing import Any, Optional
+
+from app.core.config import SESSION_STATUS_FLUSH_INTERVAL_SEC, SESSION_STATUS_WRITE_BEHIND
+from app.db.session_db import SessionDB
+
+
+class SessionStatusWriter:
+    """
+    Records session status transitions, one `update` per transition instead of one per field.
+
+    With `write_behind=True` transitions are merged per session in memory (later values win)
+    and a background thread flushes them every `flush_interval` seconds, so the pipeline never
+    waits on Supabase. Call `flush(session_id)` before reporting a final state.
+    """
+
+    def __init__(
+            self,
+            session_db: SessionDB,
+            write_behind: bool = SESSION_STATUS_WRITE_BEHIND,
+            flush_interval: float = SESSION_STATUS_FLUSH_INTERVAL_SEC,
+    ):
+        self.session_db = session_db
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval
+
+        self._pending: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def update(self, session_id: str, updates: dict[str, Any], error: Optional[str] = None):
+        if error is not None:
+            updates = {**updates, "processing_error": error}
+
+        if not self.write_behind:
+            self.session_db.transition(session_id, updates)
+            return
+
+        with self._lock:
+            self._pending.setdefault(session_id, {}).update(updates)
+        self._ensure_started()
+
+    def flush(self, session_id: Optional[str] = None):
+        """Write pending transitions now, for one session or for all of them."""
+        with self._flush_lock:
+            with self._lock:
+                if session_id is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {session_id: self._pending.pop(session_id)} if session_id in self._pending else {}
+
+            for sid, updates in batch.items():
+                try:
+                    self.session_db.transition(sid, updates)
+                except Exception as e:
+                    # Put the changes back (newer ones win) so the next flush retries them
+                    with self._lock:
+                        self._pending[sid] = {**updates, **self._pending.get(sid, {})}
+                    if session_id is not None:
+                        raise
+                    print(f"⚠️ Failed to flush status for session {sid}: {e}")
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._flush_forever, name="session-status-writer", daemon=True)
+                self._thread.start()
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
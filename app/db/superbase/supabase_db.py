@@ -1,35 +1,49 @@
 from app.core.config import supabase
+from app.core.metrics import timed
 
 class SupabaseDB:
-    def __init__(self, table_name: str):
-        self.table = supabase.table(table_name)
+    def __init__(self, table_name: str, client=None):
+        self.table = (client or supabase).table(table_name)
 
+    @timed("supabase", "insert")
     def insert(self, data: dict):
         return self.table.insert(data).execute()
 
+    @timed("supabase", "update")
     def update(self, filters: dict, updates: dict):
         query = self.table.update(updates)
         for key, value in filters.items():
             query = query.eq(key, value)
         return query.execute()
 
+    @timed("supabase", "select_one")
     def select_one(self, filters: dict):
         query = self.table.select("*")
         for key, value in filters.items():
             query = query.eq(key, value)
         return query.single().execute()
 
+    @timed("supabase", "select_many")
     def select_many(self, filters: dict):
         query = self.table.select("*")
         for key, value in filters.items():
             query = query.eq(key, value)
         return query.execute()
 
+    @timed("supabase", "select_page")
+    def select_page(self, filters: dict, start: int, end: int, order: str = "id"):
+        query = self.table.select("*")
+        for key, value in filters.items():
+            query = query.eq(key, value)
+        return query.order(order).range(start, end).execute()
+
+    @timed("supabase", "delete")
     def delete(self, filters: dict):
         query = self.table.delete()
         for key, value in filters.items():
             query = query.eq(key, value)
         return query.execute()
 
+    @timed("supabase", "delete_in")
     def delete_in(self, key: str, values: list[str]):
         return self.table.delete().in_(key, values).execute()
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""
+Job queue command line.
+
+Usage:
+    python -m app.jobs worker [--processes 2] [--concurrency 8] [--kinds process_session]
+    python -m app.jobs stats [--json]
+    python -m app.jobs purge [--days 7]
+
+Run `worker` on as many hosts as needed; the API only enqueues (set JOB_EMBEDDED_WORKERS=0).
+"""
+
+import argparse
+import json
+
+from app.core.config import JOB_WORKER_CONCURRENCY, JOB_WORKER_PROCESSES
+from app.jobs.job_queue import JOB_STATUSES, get_job_queue
+from app.jobs.worker import WorkerPool
+
+
+def print_stats(stats: dict):
+    print(f"Queue: {stats['backend']} ({stats['path']})")
+    print(f"{'kind':<20}" + "".join(f"{status:>10}" for status in JOB_STATUSES))
+    for kind, counts in sorted(stats["jobs"].items()):
+        print(f"{kind:<20}" + "".join(f"{counts[status]:>10}" for status in JOB_STATUSES))
+    print(f"Retrying: {stats['retrying']}   Oldest ready job: {stats['oldest_ready_age_sec']}s")
+    print(f"Kind caps: {stats['kind_caps'] or 'none'}   Stage slots held: {stats['stage_slots'] or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.jobs")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    worker = commands.add_parser("worker", help="run worker processes until interrupted")
+    worker.add_argument("--processes", type=int, default=JOB_WORKER_PROCESSES)
+    worker.add_argument("--concurrency", type=int, default=JOB_WORKER_CONCURRENCY, help="jobs per process")
+    worker.add_argument("--kinds", type=lambda value: value.split(","), default=None)
+
+    stats = commands.add_parser("stats", help="show queue depth per kind and status")
+    stats.add_argument("--json", action="store_true")
+
+    purge = commands.add_parser("purge", help="delete finished jobs")
+    purge.add_argument("--days", type=float, default=7)
+
+    args = parser.parse_args()
+
+    if args.command == "worker":
+        pool = WorkerPool(args.processes, kinds=args.kinds, concurrency=args.concurrency)
+        pool.start()
+        try:
+            pool.join()
+        except KeyboardInterrupt:
+            print("🛑 Stopping workers after their current job (Ctrl+C again to stop them now)...")
+            try:
+                pool.stop(timeout=None)
+            except KeyboardInterrupt:
+                print("🛑 Terminating workers; their jobs will be retried")
+                pool.terminate()
+
+    elif args.command == "stats":
+        result = get_job_queue().stats()
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_stats(result)
+
+    elif args.command == "purge":
+        print(f"🧹 Purged {get_job_queue().purge(args.days * 86400)} finished jobs")
+
+
+if __name__ == "__main__":
+    main()
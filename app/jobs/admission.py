@@ -0,0 +1,85 @@
+from typing import Any, Optional
+
+from app.core.config import JOB_MAX_IN_FLIGHT, JOB_MAX_QUEUED, JOB_USER_MAX_QUEUED
+from app.jobs.job_queue import JobQueue, QueueLimitReached, get_job_queue
+
+DEFAULT_JOB_SECONDS = 120.0
+MIN_RETRY_AFTER_SEC = 5
+
+
+class AdmissionRejected(Exception):
+    """The queue cannot take another session right now; `retry_after` is a hint in seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Gate in front of the upload endpoint. A user may have at most `user_max_queued` sessions
+    waiting or running, and the queue as a whole at most `max_queued` waiting, so one client
+    cannot flood the workers; which of the admitted sessions runs next is the queue's
+    fair-share order (see SQLiteJobQueue.claim).
+
+    `admit` is an early check (before the upload is accepted); `enqueue` is authoritative: the
+    queue checks the limits and inserts the job in one transaction, so two concurrent uploads
+    cannot both slip past the last free place.
+    """
+
+    def __init__(self, queue: Optional[JobQueue] = None, max_queued: int = JOB_MAX_QUEUED,
+                 user_max_queued: int = JOB_USER_MAX_QUEUED, max_in_flight: int = JOB_MAX_IN_FLIGHT):
+        self._queue = queue
+        self.max_queued = max_queued
+        self.user_max_queued = user_max_queued
+        self.max_in_flight = max_in_flight
+
+    @property
+    def queue(self) -> JobQueue:
+        return self._queue or get_job_queue()
+
+    def admit(self, user_id: str):
+        """Raise AdmissionRejected if `user_id` may not queue another session now."""
+        if self.user_max_queued:
+            mine = self.queue.backlog(owner=user_id)
+            count = mine["queued"] + mine["running"]
+            if count >= self.user_max_queued:
+                raise self._rejected(QueueLimitReached("owner", self.user_max_queued, count))
+
+        if self.max_queued:
+            queued = self.queue.backlog()["queued"]
+            if queued >= self.max_queued:
+                raise self._rejected(QueueLimitReached("queue", self.max_queued, queued))
+
+    def enqueue(self, kind: str, payload: dict[str, Any], owner: str, dedupe_key: Optional[str] = None) -> int:
+        """Queue a job for `owner` under the admission limits; raises AdmissionRejected when over one."""
+        try:
+            return self.queue.enqueue(
+                kind, payload, dedupe_key=dedupe_key, owner=owner,
+                owner_limit=self.user_max_queued or None, max_queued=self.max_queued or None,
+            )
+        except QueueLimitReached as e:
+            raise self._rejected(e) from e
+
+    def position(self, job_id: int) -> Optional[int]:
+        return self.queue.position(job_id)
+
+    def _rejected(self, limit: QueueLimitReached) -> AdmissionRejected:
+        if limit.scope == "owner":
+            # One of the user's own sessions has to finish first
+            return AdmissionRejected(f"You already have {limit.limit} sessions being processed", self._retry_after(1))
+        # Enough of the backlog has to drain to free a place
+        waves = (limit.count - limit.limit + 1) / max(self.max_in_flight, 1)
+        return AdmissionRejected("The processing queue is full", self._retry_after(waves))
+
+    def _retry_after(self, waves: float) -> int:
+        seconds = self.queue.average_duration(DEFAULT_JOB_SECONDS) * waves
+        return max(MIN_RETRY_AFTER_SEC, int(seconds + 0.5))
+
+
+_admission = AdmissionController()
+
+
+def get_admission() -> AdmissionController:
+    return _admission
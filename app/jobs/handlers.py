@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from contextlib import nullcontext
+from typing import Callable, ContextManager, Optional
+
+from app.core.cancellation import CANCELLED
+from app.core.config import (
+    EMOTION_INFERENCE_SERVER,
+    EMOTION_MODEL_PRELOAD,
+    JOB_CANCEL_WAIT_SEC,
+    JOB_STAGE_CONCURRENCY,
+    JOB_VISIBILITY_TIMEOUT_SEC,
+)
+from app.jobs.job_queue import Job, JobQueue, get_job_queue
+
+PROCESS_SESSION = "process_session"
+
+_processor = None
+_processor_lock = threading.Lock()
+
+
+def stage_guard(queue: JobQueue) -> Callable[[str], ContextManager]:
+    """Cap concurrent pipeline stages across every worker process (see JOB_STAGE_CONCURRENCY)."""
+    def guard(stage: str) -> ContextManager:
+        cap = JOB_STAGE_CONCURRENCY.get(stage)
+        return queue.stage_slot(stage, cap, JOB_VISIBILITY_TIMEOUT_SEC) if cap else nullcontext()
+    return guard
+
+
+def get_processor():
+    # Built lazily, once per worker process: it loads the emotion model and API clients
+    global _processor
+    if _processor is None:
+        with _processor_lock:
+            if _processor is None:
+                from app.services.facade import DialogueProcessor
+
+                _processor = DialogueProcessor(stage_guard=stage_guard(get_job_queue()))
+    return _processor
+
+
+def preload():
+    """Build the processor and load the emotion model before the worker claims its first job."""
+    get_processor()
+    if EMOTION_MODEL_PRELOAD and not EMOTION_INFERENCE_SERVER:
+        from app.services.emotions.model_registry import get_emotion_model_registry
+
+        try:
+            get_emotion_model_registry().warmup()
+        except Exception as e:
+            # Jobs still run: the model load is retried (and reported) by the first job that needs it
+            print(f"⚠️ Emotion model preload failed: {e}")
+
+
+def worker_status() -> dict:
+    """What this worker process heartbeats into the queue; `ready` once it can run sessions at full speed."""
+    from app.services.emotions.model_registry import get_emotion_model_registry
+
+    registry = get_emotion_model_registry()
+    if EMOTION_INFERENCE_SERVER:
+        from app.services.emotions.inference_server import connected_inference_client
+
+        client = connected_inference_client()
+        ready = client is not None and client.is_ready()
+    else:
+        ready = registry.is_ready() or not EMOTION_MODEL_PRELOAD
+    error = registry.load_error
+    return {"ready": ready, "emotion_model": registry.model_name, "error": str(error) if error else None}
+
+
+def process_session(job: Job):
+    """
+    Run the session pipeline. Retries resume from the last checkpoint instead of starting over,
+    so a transcription that already succeeded is never paid for twice.
+    """
+    session_id = job.payload["session_id"]
+    if job.attempts > 1 or job.payload.get("resume"):
+        get_processor().resume(session_id)
+    else:
+        get_processor().process_audio(session_id, job.payload["audio_path"])
+
+
+def enqueue_session(session_id: str, audio_path: Optional[str] = None, resume: bool = False,
+                    owner: Optional[str] = None, admit: bool = False) -> int:
+    """
+    Queue processing for a session; a session already waiting or running is not queued twice.
+    `owner` (the user id) is what the queue's per-user quota and fair-share order apply to.
+    With `admit`, the upload admission limits are enforced as the job is inserted
+    (AdmissionRejected when over one).
+    """
+    payload = {"session_id": session_id, "audio_path": audio_path, "resume": resume}
+    if admit:
+        from app.jobs.admission import get_admission
+
+        return get_admission().enqueue(PROCESS_SESSION, payload, owner=owner, dedupe_key=session_id)
+    return get_job_queue().enqueue(PROCESS_SESSION, payload, dedupe_key=session_id, owner=owner)
+
+
+
+def cancel_session(session_id: str, reason: str = CANCELLED) -> Optional[str]:
+    """Stop a session's processing; see JobQueue.cancel for the return values."""
+    return get_job_queue().cancel(session_id, reason)
+
+
+async def cancel_session_and_wait(session_id: str, reason: str = CANCELLED, timeout: float = JOB_CANCEL_WAIT_SEC,
+                                  poll_interval: float = 0.2) -> bool:
+    """
+    Cancel a session's processing and wait until its worker has actually stopped, so nothing
+    is written for the session afterwards. Returns False if it was still running at `timeout`.
+    """
+    if cancel_session(session_id, reason) != "cancelling":
+        return True
+
+    queue = get_job_queue()
+    deadline = time.monotonic() + timeout
+    while queue.is_active(session_id):
+        if time.monotonic() >= deadline:
+            print(f"⚠️ Session {session_id} still processing {timeout}s after it was cancelled")
+            return False
+        await asyncio.sleep(poll_interval)
+    return True
+
+
+HANDLERS: dict[str, Callable[[Job], None]] = {
+    PROCESS_SESSION: process_session,
+}
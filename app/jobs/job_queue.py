@@ -0,0 +1,691 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Iterator, Optional
+
+from app.core.config import (
+    JOB_QUEUE_BACKEND,
+    JOB_QUEUE_PATH,
+    JOB_MAX_ATTEMPTS,
+    JOB_RETRY_BACKOFF_SEC,
+    JOB_KIND_CONCURRENCY,
+    JOB_MAX_IN_FLIGHT,
+    JOB_USER_MAX_RUNNING,
+)
+from app.core.cancellation import CANCELLED, check_cancelled
+
+JOB_STATUSES = ("queued", "running", "done", "dead", "cancelled")
+
+
+class QueueLimitReached(Exception):
+    """`enqueue` refused a job: its owner (`scope="owner"`) or the whole queue (`scope="queue"`) is at its limit."""
+
+    def __init__(self, scope: str, limit: int, count: int):
+        super().__init__(f"{scope} limit of {limit} reached")
+        self.scope = scope
+        self.limit = limit
+        self.count = count
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+    max_attempts: int
+    status: str
+    last_error: Optional[str] = None
+    owner: Optional[str] = None
+
+
+class JobQueue(ABC):
+    """
+    Interface of the durable job queue used by the API (producer) and the workers (consumers).
+
+    Jobs are leased rather than popped: a claimed job stays invisible until its lease expires,
+    so a worker that crashes mid-job simply lets another worker pick it up again. A backend
+    must implement every method; an incomplete one fails when it is instantiated.
+    """
+
+    @abstractmethod
+    def enqueue(self, kind: str, payload: dict[str, Any], dedupe_key: Optional[str] = None,
+                max_attempts: int = JOB_MAX_ATTEMPTS, owner: Optional[str] = None, weight: float = 1.0,
+                owner_limit: Optional[int] = None, max_queued: Optional[int] = None) -> int:
+        ...
+
+    @abstractmethod
+    def position(self, job_id: int) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def backlog(self, owner: Optional[str] = None) -> dict[str, int]:
+        ...
+
+    @abstractmethod
+    def average_duration(self, default: float) -> float:
+        ...
+
+    @abstractmethod
+    def claim(self, worker_id: str, visibility_timeout: float, kinds: Optional[list[str]] = None) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def extend(self, job_id: int, worker_id: str, visibility_timeout: float) -> bool:
+        ...
+
+    @abstractmethod
+    def complete(self, job_id: int, worker_id: str):
+        ...
+
+    @abstractmethod
+    def fail(self, job_id: int, worker_id: str, error: str):
+        ...
+
+    @abstractmethod
+    def cancel(self, dedupe_key: str, reason: str = CANCELLED) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def cancel_requested(self, job_id: int) -> Optional[str]:
+        ...
+
+    @abstractmethod
+    def is_active(self, dedupe_key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def cancelled(self, job_id: int, worker_id: str, reason: str):
+        ...
+
+    @abstractmethod
+    def stage_slot(self, stage: str, cap: int, lease_sec: float) -> ContextManager[None]:
+        ...
+
+    @abstractmethod
+    def take_rate(self, costs: dict[str, tuple[float, float]]) -> float:
+        ...
+
+    @abstractmethod
+    def clamp_rate(self, name: str, remaining: float):
+        ...
+
+    @abstractmethod
+    def block_rate(self, names: list[str], delay_sec: float):
+        ...
+
+    @abstractmethod
+    def rate_state(self, names: list[str]) -> dict[str, dict[str, float]]:
+        ...
+
+    @abstractmethod
+    def heartbeat(self, worker_id: str, state: dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def remove_worker(self, worker_id: str):
+        ...
+
+    @abstractmethod
+    def workers(self, max_age_sec: float) -> list[dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]:
+        ...
+
+    @abstractmethod
+    def purge(self, older_than_sec: float) -> int:
+        ...
+
+
+class SQLiteJobQueue(JobQueue):
+    """
+    Job queue in a local SQLite file, shared by the API process and any number of worker processes.
+
+    - Claims run in `BEGIN IMMEDIATE` transactions, so two workers never lease the same job.
+    - `kind_caps` bounds how many jobs of one kind run at once across all workers.
+    - `max_in_flight` bounds running jobs overall and `user_max_running` per owner. Among the
+      owners below their quota, the one with the fewest running jobs per unit of weight goes
+      next, ties broken by who was served least recently (weighted round-robin).
+    - Failed jobs are retried with exponential backoff until `max_attempts`, then marked dead.
+    - `cancel` drops a queued job at once and flags a running one; its worker polls the flag
+      (`cancel_requested`) and stops the handler. Cancelled jobs are never retried.
+    - `stage_slot` is a cross-process semaphore that caps concurrent pipeline stages.
+    - `take_rate` and friends are token buckets shared by every process (the Azure OpenAI quota).
+    - `heartbeat` records each live worker's state, which the API reports as its readiness.
+    """
+
+    def __init__(self, path: Path = JOB_QUEUE_PATH, kind_caps: Optional[dict[str, int]] = None,
+                 retry_backoff: float = JOB_RETRY_BACKOFF_SEC, max_in_flight: int = JOB_MAX_IN_FLIGHT,
+                 user_max_running: int = JOB_USER_MAX_RUNNING):
+        self.path = Path(path)
+        self.kind_caps = JOB_KIND_CONCURRENCY if kind_caps is None else kind_caps
+        self.retry_backoff = retry_backoff
+        self.max_in_flight = max_in_flight
+        self.user_max_running = user_max_running
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at REAL NOT NULL,
+                lease_expires_at REAL,
+                worker_id TEXT,
+                dedupe_key TEXT,
+                last_error TEXT,
+                owner TEXT,
+                weight REAL NOT NULL DEFAULT 1,
+                started_at REAL,
+                cancel_requested TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, available_at);
+            CREATE UNIQUE INDEX IF NOT EXISTS jobs_active_dedupe ON jobs (dedupe_key)
+                WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running');
+
+            CREATE TABLE IF NOT EXISTS stage_slots (
+                id TEXT PRIMARY KEY,
+                stage TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+
+            CREATE TABLE IF NOT EXISTS rate_buckets (
+                name TEXT PRIMARY KEY,
+                per_minute REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                blocked_until REAL NOT NULL DEFAULT 0
+            );
+
+            CREATE TABLE IF NOT EXISTS workers (
+                id TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                seen_at REAL NOT NULL
+            );
+        """)
+        self._migrate()
+
+    def _migrate(self):
+        # Queue files created by older versions lack the scheduling and cancellation columns
+        conn = self._connection()
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, ddl in (("owner", "TEXT"), ("weight", "REAL NOT NULL DEFAULT 1"), ("started_at", "REAL"),
+                            ("cancel_requested", "TEXT")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {ddl}")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_owner ON jobs (owner, status)")
+
+    # === Producer ===
+
+    def enqueue(self, kind: str, payload: dict[str, Any], dedupe_key: Optional[str] = None,
+                max_attempts: int = JOB_MAX_ATTEMPTS, owner: Optional[str] = None, weight: float = 1.0,
+                owner_limit: Optional[int] = None, max_queued: Optional[int] = None) -> int:
+        """
+        Add a job and return its id. A still-active job with the same `dedupe_key` is returned instead.
+
+        `owner_limit` (queued + running jobs of `owner`) and `max_queued` (queued jobs overall) are
+        checked in the same transaction as the insert, so concurrent producers cannot overshoot
+        them; QueueLimitReached is raised when the job would exceed one.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            if dedupe_key is not None:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                    (dedupe_key,),
+                ).fetchone()
+                if row:
+                    return row["id"]
+
+            if owner_limit and owner is not None:
+                mine = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE owner = ? AND status IN ('queued', 'running')", (owner,)
+                ).fetchone()[0]
+                if mine >= owner_limit:
+                    raise QueueLimitReached("owner", owner_limit, mine)
+            if max_queued:
+                queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+                if queued >= max_queued:
+                    raise QueueLimitReached("queue", max_queued, queued)
+
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, max_attempts, available_at, dedupe_key, owner, weight, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, json.dumps(payload), max_attempts, now, dedupe_key, owner, weight, now, now),
+            )
+            return cursor.lastrowid
+
+    def position(self, job_id: int) -> Optional[int]:
+        """
+        Estimated 1-based place of a queued job under round-robin between owners: the owner's own
+        jobs ahead of it, plus up to that many jobs from every other owner. None once it has started.
+        """
+        with self._transaction() as conn:
+            job = conn.execute("SELECT status, owner FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if job is None or job["status"] != "queued":
+                return None
+
+            own_rank = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND owner IS ? AND id <= ?",
+                (job["owner"], job_id),
+            ).fetchone()[0]
+            others = conn.execute(
+                "SELECT COUNT(*) AS n FROM jobs WHERE status = 'queued' AND owner IS NOT ? GROUP BY owner",
+                (job["owner"],),
+            ).fetchall()
+            return own_rank + sum(min(row["n"], own_rank) for row in others)
+
+    def backlog(self, owner: Optional[str] = None) -> dict[str, int]:
+        """Queued and running job counts, overall or for one owner."""
+        query = "SELECT status, COUNT(*) FROM jobs WHERE status IN ('queued', 'running')"
+        params: tuple = ()
+        if owner is not None:
+            query += " AND owner = ?"
+            params = (owner,)
+        with self._transaction() as conn:
+            counts = dict(conn.execute(query + " GROUP BY status", params).fetchall())
+        return {"queued": counts.get("queued", 0), "running": counts.get("running", 0)}
+
+    def average_duration(self, default: float) -> float:
+        """Mean run time of the jobs finished in the last hour, `default` when there are none."""
+        with self._transaction() as conn:
+            value = conn.execute(
+                "SELECT AVG(updated_at - started_at) FROM jobs "
+                "WHERE status = 'done' AND started_at IS NOT NULL AND updated_at > ?",
+                (time.time() - 3600,),
+            ).fetchone()[0]
+        return value if value is not None else default
+
+    # === Consumer ===
+
+    def claim(self, worker_id: str, visibility_timeout: float, kinds: Optional[list[str]] = None) -> Optional[Job]:
+        """Lease the next ready job under the concurrency caps and fair-share order, or return None."""
+        now = time.time()
+        with self._transaction() as conn:
+            self._expire_leases(conn, now)
+
+            running = dict(conn.execute(
+                "SELECT kind, COUNT(*) FROM jobs WHERE status = 'running' GROUP BY kind"
+            ).fetchall())
+            if self.max_in_flight and sum(running.values()) >= self.max_in_flight:
+                return None
+            blocked = [kind for kind, cap in self.kind_caps.items() if running.get(kind, 0) >= cap]
+
+            query = """
+                WITH owner_running AS (
+                    SELECT owner, COUNT(*) AS n FROM jobs WHERE status = 'running' GROUP BY owner
+                ), owner_served AS (
+                    SELECT owner, MAX(started_at) AS t FROM jobs WHERE started_at IS NOT NULL GROUP BY owner
+                )
+                SELECT jobs.* FROM jobs
+                LEFT JOIN owner_running ON owner_running.owner = jobs.owner
+                LEFT JOIN owner_served ON owner_served.owner = jobs.owner
+                WHERE jobs.status = 'queued' AND jobs.available_at <= ?
+            """
+            params: list[Any] = [now]
+            if self.user_max_running:
+                query += " AND (jobs.owner IS NULL OR COALESCE(owner_running.n, 0) < ?)"
+                params.append(self.user_max_running)
+            if kinds:
+                query += f" AND jobs.kind IN ({','.join('?' * len(kinds))})"
+                params += kinds
+            if blocked:
+                query += f" AND jobs.kind NOT IN ({','.join('?' * len(blocked))})"
+                params += blocked
+            query += """
+                ORDER BY COALESCE(owner_running.n, 0) / jobs.weight, COALESCE(owner_served.t, 0),
+                         jobs.available_at, jobs.id
+                LIMIT 1
+            """
+            row = conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+
+            conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, lease_expires_at = ?, "
+                "worker_id = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                (now + visibility_timeout, worker_id, now, now, row["id"]),
+            )
+            return Job(
+                id=row["id"],
+                kind=row["kind"],
+                payload=json.loads(row["payload"]),
+                attempts=row["attempts"] + 1,
+                max_attempts=row["max_attempts"],
+                status="running",
+                last_error=row["last_error"],
+                owner=row["owner"],
+            )
+
+    def extend(self, job_id: int, worker_id: str, visibility_timeout: float) -> bool:
+        """Renew a lease. Returns False if the job is no longer leased by this worker."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (now + visibility_timeout, now, job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: int, worker_id: str):
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'done', lease_expires_at = NULL, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time(), job_id, worker_id),
+            )
+
+    def fail(self, job_id: int, worker_id: str, error: str):
+        """Record a failed attempt: retry later with exponential backoff, or mark the job dead."""
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (job_id, worker_id),
+            ).fetchone()
+            if row is None:
+                return
+            self._retry_or_bury(conn, job_id, row["attempts"], row["max_attempts"], error, now)
+
+    def cancel(self, dedupe_key: str, reason: str = CANCELLED) -> Optional[str]:
+        """
+        Cancel the active job for `dedupe_key`. Returns "cancelled" if it had not started yet,
+        "cancelling" if its worker still has to stop it, or None if there was no active job.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, status FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                (dedupe_key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["status"] == "queued":
+                conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', last_error = ?, updated_at = ? WHERE id = ?",
+                    (reason, now, row["id"]),
+                )
+                return "cancelled"
+            conn.execute("UPDATE jobs SET cancel_requested = ? WHERE id = ?", (reason, row["id"]))
+            return "cancelling"
+
+    def cancel_requested(self, job_id: int) -> Optional[str]:
+        """The reason a running job was asked to stop, or None."""
+        with self._transaction() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row["cancel_requested"] if row else None
+
+    def is_active(self, dedupe_key: str) -> bool:
+        """Whether a job for `dedupe_key` is still queued or running (e.g. not yet stopped after `cancel`)."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')", (dedupe_key,)
+            ).fetchone()
+        return row is not None
+
+    def cancelled(self, job_id: int, worker_id: str, reason: str):
+        """Record that a running job stopped early (cancelled, deleted or timed out)."""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', lease_expires_at = NULL, last_error = ?, updated_at = ? "
+                "WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (reason, time.time(), job_id, worker_id),
+            )
+
+    def _expire_leases(self, conn: sqlite3.Connection, now: float):
+        # Jobs whose worker stopped renewing the lease (crash, kill -9) become visible again,
+        # unless they were being cancelled anyway
+        expired = conn.execute(
+            "SELECT id, attempts, max_attempts, cancel_requested FROM jobs "
+            "WHERE status = 'running' AND lease_expires_at < ?",
+            (now,),
+        ).fetchall()
+        for row in expired:
+            if row["cancel_requested"]:
+                conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', lease_expires_at = NULL, last_error = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (row["cancel_requested"], now, row["id"]),
+                )
+                continue
+            self._retry_or_bury(conn, row["id"], row["attempts"], row["max_attempts"], "Visibility timeout expired", now)
+
+    def _retry_or_bury(self, conn: sqlite3.Connection, job_id: int, attempts: int, max_attempts: int,
+                       error: str, now: float):
+        if attempts >= max_attempts:
+            conn.execute(
+                "UPDATE jobs SET status = 'dead', lease_expires_at = NULL, last_error = ?, updated_at = ? WHERE id = ?",
+                (error, now, job_id),
+            )
+        else:
+            delay = self.retry_backoff * 2 ** (attempts - 1)
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', lease_expires_at = NULL, worker_id = NULL, available_at = ?, "
+                "last_error = ?, updated_at = ? WHERE id = ?",
+                (now + delay, error, now, job_id),
+            )
+
+    # === Stage concurrency ===
+
+    @contextmanager
+    def stage_slot(self, stage: str, cap: int, lease_sec: float, poll_interval: float = 0.5) -> Iterator[None]:
+        """
+        Hold one of `cap` slots for `stage`, shared by every worker process.
+        Slots expire after `lease_sec` so a crashed worker cannot leak them.
+        """
+        slot_id = uuid.uuid4().hex
+        while True:
+            now = time.time()
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM stage_slots WHERE expires_at < ?", (now,))
+                held = conn.execute("SELECT COUNT(*) FROM stage_slots WHERE stage = ?", (stage,)).fetchone()[0]
+                if held < cap:
+                    conn.execute(
+                        "INSERT INTO stage_slots (id, stage, expires_at) VALUES (?, ?, ?)",
+                        (slot_id, stage, now + lease_sec),
+                    )
+                    break
+            check_cancelled()  # don't keep a cancelled session waiting for a slot
+            time.sleep(poll_interval)
+
+        try:
+            yield
+        finally:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM stage_slots WHERE id = ?", (slot_id,))
+
+    # === Shared rate limits ===
+
+    def take_rate(self, costs: dict[str, tuple[float, float]]) -> float:
+        """
+        Take `amount` from each bucket in `costs` ({name: (amount, per_minute)}), all or none.
+        Returns 0 when taken, otherwise how many seconds to wait before the amounts are there.
+        Buckets refill continuously at `per_minute` and start full.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            buckets = {}
+            for name, (amount, per_minute) in costs.items():
+                row = conn.execute(
+                    "SELECT tokens, updated_at, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                if row is None:
+                    tokens, blocked_until = per_minute, 0.0
+                else:
+                    tokens = min(per_minute, row["tokens"] + (now - row["updated_at"]) * per_minute / 60)
+                    blocked_until = row["blocked_until"]
+                buckets[name] = (tokens, blocked_until)
+
+            wait = 0.0
+            for name, (amount, per_minute) in costs.items():
+                tokens, blocked_until = buckets[name]
+                missing = amount - tokens
+                wait = max(wait, blocked_until - now, missing * 60 / per_minute if missing > 0 else 0.0)
+
+            for name, (amount, per_minute) in costs.items():
+                tokens, blocked_until = buckets[name]
+                conn.execute(
+                    "INSERT INTO rate_buckets (name, per_minute, tokens, updated_at, blocked_until) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT (name) DO UPDATE SET per_minute = excluded.per_minute, "
+                    "tokens = excluded.tokens, updated_at = excluded.updated_at",
+                    (name, per_minute, tokens - amount if wait <= 0 else tokens, now, blocked_until),
+                )
+        return wait
+
+    def clamp_rate(self, name: str, remaining: float):
+        """Lower a bucket to what the server says is left, if that is less than ours."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE rate_buckets SET tokens = MIN(?, per_minute, tokens + (? - updated_at) * per_minute / 60), "
+                "updated_at = ? WHERE name = ?",
+                (remaining, now, now, name),
+            )
+
+    def block_rate(self, names: list[str], delay_sec: float):
+        """Hold every taker of these buckets back for `delay_sec` (a 429's Retry-After)."""
+        with self._transaction() as conn:
+            conn.execute(
+                f"UPDATE rate_buckets SET blocked_until = MAX(blocked_until, ?) "
+                f"WHERE name IN ({','.join('?' * len(names))})",
+                (time.time() + delay_sec, *names),
+            )
+
+    def rate_state(self, names: list[str]) -> dict[str, dict[str, float]]:
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f"SELECT * FROM rate_buckets WHERE name IN ({','.join('?' * len(names))})", names
+            ).fetchall()
+        return {
+            row["name"]: {
+                "available": min(row["per_minute"], row["tokens"] + (now - row["updated_at"]) * row["per_minute"] / 60),
+                "blocked_for_sec": max(0.0, row["blocked_until"] - now),
+            }
+            for row in rows
+        }
+
+    # === Worker registry ===
+
+    def heartbeat(self, worker_id: str, state: dict[str, Any]):
+        """Record that a worker is alive, with whatever it reports (ready, running jobs, ...)."""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO workers (id, state, seen_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET state = excluded.state, seen_at = excluded.seen_at",
+                (worker_id, json.dumps(state), time.time()),
+            )
+
+    def remove_worker(self, worker_id: str):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM workers WHERE id = ?", (worker_id,))
+
+    def workers(self, max_age_sec: float) -> list[dict[str, Any]]:
+        """Workers heard from in the last `max_age_sec`; older entries (killed workers) are dropped."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM workers WHERE seen_at < ?", (now - max_age_sec,))
+            rows = conn.execute("SELECT id, state, seen_at FROM workers ORDER BY id").fetchall()
+        return [
+            {**json.loads(row["state"]), "id": row["id"], "age_sec": round(now - row["seen_at"], 1)}
+            for row in rows
+        ]
+
+    # === Maintenance ===
+
+    def stats(self) -> dict[str, Any]:
+        now = time.time()
+        with self._transaction() as conn:
+            counts = {
+                kind: {status: 0 for status in JOB_STATUSES}
+                for (kind,) in conn.execute("SELECT DISTINCT kind FROM jobs").fetchall()
+            }
+            for row in conn.execute("SELECT kind, status, COUNT(*) AS n FROM jobs GROUP BY kind, status"):
+                counts[row["kind"]][row["status"]] = row["n"]
+
+            oldest = conn.execute(
+                "SELECT MIN(available_at) FROM jobs WHERE status = 'queued' AND available_at <= ?", (now,)
+            ).fetchone()[0]
+            slots = dict(conn.execute(
+                "SELECT stage, COUNT(*) FROM stage_slots WHERE expires_at >= ? GROUP BY stage", (now,)
+            ).fetchall())
+            retrying = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND attempts > 0"
+            ).fetchone()[0]
+
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "jobs": counts,
+            "retrying": retrying,
+            "oldest_ready_age_sec": round(now - oldest, 1) if oldest else 0.0,
+            "kind_caps": self.kind_caps,
+            "max_in_flight": self.max_in_flight,
+            "user_max_running": self.user_max_running,
+            "stage_slots": slots,
+        }
+
+    def purge(self, older_than_sec: float) -> int:
+        """Delete finished (done, dead or cancelled) jobs last updated more than `older_than_sec` ago."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM jobs WHERE status IN ('done', 'dead', 'cancelled') AND updated_at < ?",
+                (time.time() - older_than_sec,),
+            )
+            return cursor.rowcount
+
+    # === Internals ===
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread; SQLite connections must not be shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue for the configured backend."""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                if JOB_QUEUE_BACKEND != "sqlite":
+                    raise ValueError(f"Unsupported JOB_QUEUE_BACKEND: {JOB_QUEUE_BACKEND}")
+                _queue = SQLiteJobQueue()
+    return _queue
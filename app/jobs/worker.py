@@ -0,0 +1,238 @@
+import multiprocessing as mp
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.core.cancellation import Cancelled, CancellationToken, cancellation_scope
+from app.core.metrics import mark_process_dead
+from app.core.config import (
+    EMOTION_INFERENCE_SERVER,
+    JOB_CANCEL_POLL_SEC,
+    JOB_POLL_INTERVAL_SEC,
+    JOB_VISIBILITY_TIMEOUT_SEC,
+    JOB_WORKER_CONCURRENCY,
+    JOB_WORKER_HEARTBEAT_SEC,
+)
+from app.jobs.job_queue import Job, JobQueue, get_job_queue
+
+
+class Worker:
+    """
+    Pulls jobs from the queue and runs their handler, up to `concurrency` jobs at once on a
+    thread pool. Jobs spend most of their time waiting on Azure and OpenAI, so threads are
+    enough; the queue's in-flight and per-kind caps still apply across every worker.
+
+    While a handler runs, its own heartbeat thread renews the job's lease every third of the
+    visibility timeout; if the process dies the lease lapses and the job is retried elsewhere.
+    The same thread watches for cancel requests and cancels the handler's token (the current
+    `CancellationToken` while it runs), so the worker is free for the next job right away.
+
+    While `run` is going, the worker also heartbeats its own state (`status()` plus its load)
+    into the queue every `heartbeat_interval`; the API reports readiness from those entries.
+    """
+
+    def __init__(
+            self,
+            queue: JobQueue,
+            handlers: dict[str, Callable[[Job], None]],
+            kinds: Optional[list[str]] = None,
+            visibility_timeout: float = JOB_VISIBILITY_TIMEOUT_SEC,
+            poll_interval: float = JOB_POLL_INTERVAL_SEC,
+            cancel_poll_interval: float = JOB_CANCEL_POLL_SEC,
+            concurrency: int = JOB_WORKER_CONCURRENCY,
+            heartbeat_interval: float = JOB_WORKER_HEARTBEAT_SEC,
+            status: Callable[[], dict] = lambda: {"ready": True},
+    ):
+        self.queue = queue
+        self.handlers = handlers
+        self.kinds = kinds
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+        self.cancel_poll_interval = cancel_poll_interval
+        self.concurrency = max(1, concurrency)
+        self.heartbeat_interval = heartbeat_interval
+        self.status = status
+        self.running = 0
+        self._running_lock = threading.Lock()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def run(self, stop: threading.Event):
+        """Claim jobs while a thread is free; on stop, claim nothing more and finish the running ones."""
+        print(f"👷 Job worker {self.worker_id} started ({self.concurrency} jobs at once)")
+        slots = threading.BoundedSemaphore(self.concurrency)
+        stopped = threading.Event()
+        beat = threading.Thread(target=self._announce, args=(stopped,), name="worker-heartbeat", daemon=True)
+        beat.start()
+        try:
+            with ThreadPoolExecutor(self.concurrency, thread_name_prefix="job") as executor:
+                while not stop.is_set():
+                    if not slots.acquire(timeout=self.poll_interval):
+                        continue
+                    job = self.queue.claim(self.worker_id, self.visibility_timeout, self.kinds)
+                    if job is None:
+                        slots.release()
+                        stop.wait(self.poll_interval)
+                        continue
+                    executor.submit(self._run, job).add_done_callback(lambda _: slots.release())
+        finally:
+            stopped.set()
+            beat.join()
+            self.queue.remove_worker(self.worker_id)
+        print(f"👷 Job worker {self.worker_id} stopped")
+
+    def _announce(self, stopped: threading.Event):
+        while True:
+            try:
+                state = {**self.status(), "running": self.running, "concurrency": self.concurrency, "kinds": self.kinds}
+                self.queue.heartbeat(self.worker_id, state)
+            except Exception as e:
+                print(f"⚠️ Worker heartbeat failed: {e}")
+            if stopped.wait(self.heartbeat_interval):
+                return
+
+    def run_once(self) -> bool:
+        """Claim and run one job on the calling thread. Returns False when nothing was ready."""
+        job = self.queue.claim(self.worker_id, self.visibility_timeout, self.kinds)
+        if job is None:
+            return False
+        self._run(job)
+        return True
+
+    def _run(self, job: Job):
+        print(f"▶️ Job {job.id} ({job.kind}) attempt {job.attempts}/{job.max_attempts}")
+        finished = threading.Event()
+        token = CancellationToken()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job, finished, token), daemon=True)
+        heartbeat.start()
+        with self._running_lock:
+            self.running += 1
+
+        try:
+            handler = self.handlers.get(job.kind)
+            if handler is None:
+                raise ValueError(f"No handler for job kind '{job.kind}'")
+            with cancellation_scope(token):
+                handler(job)
+        except Cancelled as e:
+            # Not retried: the user asked for it, or the session ran past its deadline
+            self.queue.cancelled(job.id, self.worker_id, e.reason)
+            print(f"⏹️ Job {job.id} stopped: {e.reason}")
+        except Exception as e:
+            self.queue.fail(job.id, self.worker_id, str(e))
+            print(f"❌ Job {job.id} failed: {e}")
+        else:
+            self.queue.complete(job.id, self.worker_id)
+            print(f"✅ Job {job.id} done")
+        finally:
+            with self._running_lock:
+                self.running -= 1
+            finished.set()
+            heartbeat.join()
+
+    def _heartbeat(self, job: Job, finished: threading.Event, token: CancellationToken):
+        renew_every = self.visibility_timeout / 3
+        next_renewal = time.monotonic() + renew_every
+        while not finished.wait(min(self.cancel_poll_interval, renew_every)):
+            if not token.cancelled:
+                reason = self.queue.cancel_requested(job.id)
+                if reason:
+                    print(f"⏹️ Cancelling job {job.id}: {reason}")
+                    token.cancel(reason)
+
+            if time.monotonic() >= next_renewal:
+                if not self.queue.extend(job.id, self.worker_id, self.visibility_timeout):
+                    print(f"⚠️ Lost the lease on job {job.id}")
+                    return
+                next_renewal += renew_every
+
+
+def _worker_main(stop, kinds: Optional[list[str]], concurrency: int, inference=None):
+    # Ctrl+C in a terminal reaches the whole process group; only the pool's stop event ends a worker
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    from app.jobs.handlers import HANDLERS, preload, worker_status
+
+    if inference is not None:
+        from app.services.emotions.inference_server import connect_inference_server
+
+        connect_inference_server(inference)
+
+    # A job claimed before the model is resident would sit on its lease while the model loads
+    preload()
+    Worker(get_job_queue(), HANDLERS, kinds=kinds, concurrency=concurrency, status=worker_status).run(stop)
+
+
+class WorkerPool:
+    """
+    Runs `processes` workers in separate (spawned) processes, independent of the API's threadpool.
+
+    Each process runs JOB_WORKER_CONCURRENCY jobs at once; more processes only buy CPU
+    isolation (e.g. diarization or CPU inference not blocking the others), not throughput.
+    Workers inherit this process's PROMETHEUS_MULTIPROC_DIR (see app.core.metrics), so the
+    `/metrics` endpoint of the process that owns the pool reports theirs as well.
+    With EMOTION_INFERENCE_SERVER the pool also hosts the host's inference workers and every
+    worker process connects to them, so the model is loaded once per host.
+    """
+
+    def __init__(self, processes: int, kinds: Optional[list[str]] = None, concurrency: int = JOB_WORKER_CONCURRENCY):
+        self.processes = processes
+        self.kinds = kinds
+        self.concurrency = concurrency
+        self._ctx = mp.get_context("spawn")
+        self._stop = None
+        self._procs: list[mp.Process] = []
+
+    def start(self):
+        self._stop = self._ctx.Event()
+        connections = [None] * self.processes
+        if EMOTION_INFERENCE_SERVER:
+            from app.services.emotions.inference_server import host_inference_server
+
+            # One client per worker process, plus this process
+            server = host_inference_server(clients=self.processes + 1)
+            connections = [server.connection(i) for i in range(self.processes)]
+
+        for i in range(self.processes):
+            # Not daemonic: stopped through the stop event so running jobs can finish
+            proc = self._ctx.Process(
+                target=_worker_main,
+                args=(self._stop, self.kinds, self.concurrency, connections[i]),
+                name=f"job-worker-{i}",
+            )
+            proc.start()
+            self._procs.append(proc)
+
+    def join(self):
+        for proc in self._procs:
+            proc.join()
+            mark_process_dead(proc.pid)
+
+    def stop(self, timeout: Optional[float] = 30):
+        """
+        Let every worker finish its current job (waiting indefinitely with `timeout=None`);
+        stragglers are terminated and their job is retried.
+        """
+        if self._stop is None:
+            return
+        self._stop.set()
+        for proc in self._procs:
+            proc.join(timeout)
+        self.terminate()
+
+    def terminate(self):
+        """Kill the workers now; their jobs' leases lapse and the jobs are retried."""
+        for proc in self._procs:
+            if proc.is_alive():
+                proc.terminate()
+                proc.join()
+            mark_process_dead(proc.pid)
+        self._procs = []
+        if EMOTION_INFERENCE_SERVER:
+            from app.services.emotions.inference_server import stop_inference_server
+
+            stop_inference_server()
@@ -5,16 +5,23 @@ Entry point of the DialogueDNA backend service.
 Initializes FastAPI, loads environment, adds middleware, and registers routers.
 """
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 from app.api.endpoints import router as api_router
+from app.core.config import JOB_EMBEDDED_WORKERS
+from app.core.metrics import metrics_payload
+from app.jobs.worker import WorkerPool
+from app.storage.azure.blob_client import close_async_blob_service_client
 
 load_dotenv()
 
 app = FastAPI(title="DialogueDNA Backend")
 
+# Session processing runs in job worker processes; in production run `python -m app.jobs worker` instead
+job_workers = WorkerPool(JOB_EMBEDDED_WORKERS)
+
 
 # CORS middleware (customize origins in production)
 app.add_middleware(
@@ -29,4 +36,27 @@ app.add_middleware(
 app.include_router(api_router)
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape target: stage and external call latency histograms
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
+
+@app.on_event("startup")
+def start_job_workers():
+    if JOB_EMBEDDED_WORKERS > 0:
+        job_workers.start()
+
+
+@app.on_event("shutdown")
+def stop_job_workers():
+    job_workers.stop()
+
+
+@app.on_event("shutdown")
+async def close_blob_clients():
+    await close_async_blob_service_client()
+
+
 print("✅ main.py loaded")
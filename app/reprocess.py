@@ -0,0 +1,158 @@
+"""
+reprocess.py
+
+Bulk re-run of pipeline stages for stored sessions, e.g. after changing the emotion model
+or the prompt presets. Audio is not re-uploaded or re-transcribed: each session's stored
+transcript (and, for summary-only runs, its stored emotions) is the input.
+
+Usage:
+    python -m app.reprocess --stages emotions summary [--status completed] [--user-id ID]
+        [--session-ids ID ...] [--limit N] [--workers 4] [--per-minute 30] [--run-id NAME] [--restart]
+
+Progress is appended to .cache/reprocess/<run-id>.jsonl as sessions finish. Running the same
+command again (or with the same --run-id) after a crash skips the sessions already done.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import PROJECT_ROOT
+from app.db.session_db import SessionDB
+from app.services.facade import DialogueProcessor
+
+REPROCESSABLE_STAGES = ("emotions", "summary")
+PROGRESS_DIR = PROJECT_ROOT / ".cache" / "reprocess"
+
+
+class Throttle:
+    """Spaces session starts evenly so the run never exceeds `per_minute` sessions."""
+
+    def __init__(self, per_minute: Optional[float]):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        time.sleep(max(0.0, start - now))
+
+
+class ProgressLog:
+    """Append-only record of finished sessions; the source of truth for resuming a run."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def completed(self) -> set[str]:
+        if not self.path.exists():
+            return set()
+        done = set()
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by a crash
+                if entry.get("status") == "ok":
+                    done.add(entry["session_id"])
+        return done
+
+    def record(self, session_id: str, status: str, seconds: float, error: Optional[str] = None):
+        entry = {"session_id": session_id, "status": status, "seconds": round(seconds, 2), "error": error}
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+
+
+def select_session_ids(session_db: SessionDB, args) -> list[str]:
+    if args.session_ids:
+        return list(dict.fromkeys(args.session_ids))
+
+    filters = {}
+    if args.status:
+        filters["session_status"] = args.status
+    if args.user_id:
+        filters["user_id"] = args.user_id
+
+    session_ids = []
+    for session in session_db.iter_sessions(filters):
+        session_ids.append(session["id"])
+        if args.limit and len(session_ids) >= args.limit:
+            break
+    return session_ids
+
+
+def default_run_id(args) -> str:
+    selection = json.dumps([args.stages, args.status, args.user_id, args.session_ids, args.limit])
+    return f"{'-'.join(args.stages)}-{hashlib.sha1(selection.encode()).hexdigest()[:10]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", nargs="+", choices=REPROCESSABLE_STAGES, required=True)
+    parser.add_argument("--status", default="completed", help="session_status to select ('' for any)")
+    parser.add_argument("--user-id", default=None)
+    parser.add_argument("--session-ids", nargs="+", default=None)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=4, help="sessions processed in parallel")
+    parser.add_argument("--per-minute", type=float, default=None, help="cap on sessions started per minute")
+    parser.add_argument("--run-id", default=None, help="name of the progress log to resume")
+    parser.add_argument("--restart", action="store_true", help="ignore the progress of a previous run")
+    args = parser.parse_args()
+
+    stages = [stage for stage in REPROCESSABLE_STAGES if stage in args.stages]
+    processor = DialogueProcessor()
+    progress = ProgressLog(PROGRESS_DIR / f"{args.run_id or default_run_id(args)}.jsonl")
+
+    session_ids = select_session_ids(processor.session_db, args)
+    already_done = set() if args.restart else progress.completed()
+    todo = [session_id for session_id in session_ids if session_id not in already_done]
+
+    print(f"🔁 Re-running {stages} for {len(todo)} session(s) "
+          f"({len(session_ids) - len(todo)} already done) → {progress.path}")
+
+    throttle = Throttle(args.per_minute)
+    counter = {"ok": 0, "failed": 0}
+    counter_lock = threading.Lock()
+    started = time.monotonic()
+
+    def reprocess(session_id: str):
+        throttle.wait()
+        t0 = time.monotonic()
+        try:
+            processor.reprocess(session_id, stages)
+            status, error = "ok", None
+        except Exception as e:
+            status, error = "failed", str(e)
+        progress.record(session_id, status, time.monotonic() - t0, error)
+
+        with counter_lock:
+            counter[status] += 1
+            finished = counter["ok"] + counter["failed"]
+            rate = finished / max(time.monotonic() - started, 1e-9) * 60
+            eta_min = (len(todo) - finished) / rate if rate else 0
+        suffix = f" — {error}" if error else ""
+        print(f"[{finished}/{len(todo)}] {'✅' if status == 'ok' else '❌'} {session_id} "
+              f"({time.monotonic() - t0:.1f}s) {rate:.1f}/min, ETA {eta_min:.1f} min{suffix}")
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        list(pool.map(reprocess, todo))
+
+    print(f"🏁 Done: {counter['ok']} ok, {counter['failed']} failed in {time.monotonic() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,43 +1,81 @@
 from typing import Any
-from collections import defaultdict
-from transformers import pipeline
 
-from app.core.config import TEXT_EMOTION_MODEL, TOP_K_EMOTIONS
+from app.core.cancellation import check_cancelled
+from app.core.config import EMOTION_BATCH_SIZE, EMOTION_INFERENCE_SERVER
+from app.core.metrics import call_span
+from app.services.emotions.model_registry import get_emotion_model_registry
 
 class Emotioner:
-    def __init__(self):
-        self.overall_emotions = None
-        self.speaker_emotions = None
+    """Text-based emotion classifier. Holds no per-session state, so one instance can serve concurrent sessions."""
+
+    def __init__(self, batch_size: int = EMOTION_BATCH_SIZE, use_inference_server: bool = EMOTION_INFERENCE_SERVER):
+        self.batch_size = batch_size
+        self.use_inference_server = use_inference_server
 
     def get_emotions(self, transcript: list[dict[str, Any]]) -> list[dict[str, Any]]:
         print("🔍 Running text-based emotion analysis...")
 
-        classifier = pipeline("text-classification", model=TEXT_EMOTION_MODEL, top_k=TOP_K_EMOTIONS)
+        entries = []
+        for entry in transcript:
+            text = entry.get("text", "").strip()
+            if not text:
+                continue
+
+            entries.append({
+                "speaker": str(entry.get("speaker", "?")).strip(),
+                "text": text,
+                "start_time": entry.get("start_time", 0),
+                "end_time": entry.get("end_time", 0),
+            })
+
+        with call_span("model", "emotion_inference", utterances=len(entries)):
+            emotions = self.classify([entry["text"] for entry in entries])
 
         results = []
+        for entry, entry_emotions in zip(entries, emotions):
+            entry["emotions"] = entry_emotions
+            results.append(entry)
 
-        self.speaker_emotions = defaultdict(lambda: defaultdict(float))
-        self.overall_emotions = defaultdict(float)
+        return results
 
-        for entry in transcript:
-            speaker = str(entry.get("speaker", "?")).strip()
-            text = entry.get("text", "").strip()
+    def classify(self, texts: list[str]) -> list[list[dict[str, Any]]]:
+        """Classify utterances, either through the shared inference workers or in this process."""
+        if self.use_inference_server:
+            from app.services.emotions.inference_server import get_emotion_inference_client
 
-            if not text:
-                continue
+            return get_emotion_inference_client().classify(texts)
 
-            start_sec = entry.get("start_time", 0)
-            end_sec = entry.get("end_time", 0)
+        return self.classify_local(texts)
 
-            emotions = classifier(text)
+    def classify_local(self, texts: list[str]) -> list[list[dict[str, Any]]]:
+        """
+        Classify many utterances in padded batches with the in-process model.
 
-            result_entry = {
-                "speaker": speaker,
-                "text": text,
-                "start_time": start_sec,
-                "end_time": end_sec,
-                "emotions": emotions[0],
-            }
-            results.append(result_entry)
+        Utterances are sorted by token length so each batch pads to a similar size,
+        and the scores are mapped back to the original order of `texts`.
+        """
+        if not texts:
+            return []
+
+        classifier = get_emotion_model_registry().get_classifier()
+
+        lengths = [len(ids) for ids in classifier.tokenizer(texts, truncation=True)["input_ids"]]
+        order = sorted(range(len(texts)), key=lambda i: lengths[i])
+
+        results: list[Any] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            check_cancelled()
+            batch_indices = order[start:start + self.batch_size]
+            batch = [texts[i] for i in batch_indices]
+
+            outputs = classifier(batch, batch_size=len(batch), truncation=True)
+
+            for i, output in zip(batch_indices, outputs):
+                results[i] = self._as_label_scores(output)
+
+        return results
 
-        return results
\ No newline at end of file
+    @staticmethod
+    def _as_label_scores(output: Any) -> list[dict[str, Any]]:
+        # With top_k == 1 the pipeline returns a bare {label, score} per input
+        return [output] if isinstance(output, dict) else list(output)
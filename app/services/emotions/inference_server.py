@@ -0,0 +1,394 @@
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from app.core.cancellation import Cancelled, wait_result
+from app.core.config import (
+    EMOTION_SERVER_WORKERS,
+    EMOTION_SERVER_BATCH_WINDOW_MS,
+    EMOTION_SERVER_MAX_BATCH,
+    EMOTION_SERVER_TORCH_THREADS,
+)
+
+_READY = "__ready__"
+_STOP = "__stop__"
+_DEAD = "__dead__"
+CANCELLED_IDS_KEPT = 10_000
+
+
+def _serve(
+        requests_q: mp.Queue,
+        responses_qs: list[mp.Queue],
+        cancel_q: mp.Queue,
+        window_sec: float,
+        max_batch: int,
+        torch_threads: int,
+):
+    """
+    Worker process loop: coalesce requests from every in-flight session into micro-batches.
+
+    Requests are `(client_id, request_id, texts)`; each answer goes back on the queue of the
+    client (job worker process) that asked. The first request opens a batching window of
+    `window_sec`; anything that arrives before the window closes (up to `max_batch`
+    utterances) is classified in the same forward passes. Requests whose callers gave up
+    (keys received on `cancel_q`) are dropped before batching.
+    """
+    # Stopped by the host through `requests_q`, never by a Ctrl+C meant for the job workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    import torch
+
+    torch.set_num_threads(torch_threads)
+    torch.set_num_interop_threads(1)
+
+    from app.services.emotions.emotioner import Emotioner
+    from app.services.emotions.model_registry import get_emotion_model_registry
+
+    get_emotion_model_registry().warmup()
+    emotioner = Emotioner(batch_size=max_batch, use_inference_server=False)
+    for responses_q in responses_qs:
+        responses_q.put((_READY, os.getpid(), None))
+    cancelled: dict[tuple[int, int], None] = {}
+
+    while True:
+        request = requests_q.get()
+        if request is None:
+            return
+
+        pending = [request]
+        size = len(request[2])
+        deadline = time.monotonic() + window_sec
+
+        while size < max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = requests_q.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is None:
+                requests_q.put(None)  # let the outer loop shut down after this batch
+                break
+            pending.append(request)
+            size += len(request[2])
+
+        pending = _drop_cancelled(pending, cancel_q, cancelled)
+        if not pending:
+            continue
+
+        texts = [text for _, _, request_texts in pending for text in request_texts]
+        try:
+            results = emotioner.classify_local(texts)
+        except Exception as e:
+            for client_id, request_id, _ in pending:
+                responses_qs[client_id].put((request_id, None, f"{type(e).__name__}: {e}"))
+            continue
+
+        offset = 0
+        for client_id, request_id, request_texts in pending:
+            responses_qs[client_id].put((request_id, results[offset:offset + len(request_texts)], None))
+            offset += len(request_texts)
+
+
+def _drop_cancelled(pending: list, cancel_q: mp.Queue, cancelled: dict[tuple[int, int], None]) -> list:
+    while True:
+        try:
+            cancelled[cancel_q.get_nowait()] = None
+        except queue.Empty:
+            break
+
+    kept = []
+    for request in pending:
+        key = (request[0], request[1])
+        if key in cancelled:
+            del cancelled[key]
+        else:
+            kept.append(request)
+
+    # Keys of requests another worker already answered never show up here; forget the oldest
+    while len(cancelled) > CANCELLED_IDS_KEPT:
+        del cancelled[next(iter(cancelled))]
+    return kept
+
+
+@dataclass
+class InferenceConnection:
+    """What a job worker process needs to use the host's inference workers; picklable into a spawned process."""
+    client_id: int
+    requests_q: mp.Queue
+    responses_q: mp.Queue
+    cancel_qs: list[mp.Queue]
+    max_batch: int
+    workers: int
+
+
+class EmotionInferenceServer:
+    """
+    Host side of the cross-session emotion inference workers: one per host, owned by the
+    process that runs the job worker pool.
+
+    It starts the inference processes and hands out one `InferenceConnection` per client
+    (each job worker process, plus the host process itself). Clients share the request queue,
+    so utterances from every session on the host are coalesced into the same batches, and the
+    model is loaded once per host instead of once per worker process.
+    """
+
+    def __init__(
+            self,
+            workers: int = EMOTION_SERVER_WORKERS,
+            window_ms: float = EMOTION_SERVER_BATCH_WINDOW_MS,
+            max_batch: int = EMOTION_SERVER_MAX_BATCH,
+            torch_threads: int = EMOTION_SERVER_TORCH_THREADS,
+            clients: int = 1,
+    ):
+        self.workers = workers
+        self.window_sec = window_ms / 1000
+        self.max_batch = max_batch
+        # Split the cores between workers so they don't oversubscribe each other
+        self.torch_threads = torch_threads or max(1, (os.cpu_count() or 1) // workers)
+        self.clients = clients
+
+        self._ctx = mp.get_context("spawn")
+        self._processes: list[mp.Process] = []
+        self._requests_q: Optional[mp.Queue] = None
+        self._responses_qs: list[mp.Queue] = []
+        self._cancel_qs: list[mp.Queue] = []
+        self._monitor: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._processes:
+                return
+
+            self._requests_q = self._ctx.Queue()
+            self._responses_qs = [self._ctx.Queue() for _ in range(self.clients)]
+            # One cancel queue per worker: every worker must hear about every cancelled request
+            self._cancel_qs = [self._ctx.Queue() for _ in range(self.workers)]
+            self._stopped.clear()
+
+            for i in range(self.workers):
+                process = self._ctx.Process(
+                    target=_serve,
+                    args=(
+                        self._requests_q, self._responses_qs, self._cancel_qs[i],
+                        self.window_sec, self.max_batch, self.torch_threads,
+                    ),
+                    name=f"emotion-inference-{i}",
+                    daemon=True,
+                )
+                process.start()
+                self._processes.append(process)
+
+            self._monitor = threading.Thread(target=self._watch, name="emotion-inference-monitor", daemon=True)
+            self._monitor.start()
+            print(
+                f"🚀 Started {self.workers} emotion inference worker(s), {self.torch_threads} torch thread(s) each, "
+                f"for {self.clients} client(s)"
+            )
+
+    def stop(self):
+        with self._lock:
+            self._stopped.set()
+            for _ in self._processes:
+                self._requests_q.put(None)
+            for process in self._processes:
+                process.join(timeout=5)
+            self._processes = []
+            if self._monitor is not None:
+                self._monitor.join()
+                self._monitor = None
+            self._broadcast(_DEAD, "Emotion inference server stopped")
+
+    def connection(self, client_id: int) -> InferenceConnection:
+        return InferenceConnection(
+            client_id=client_id,
+            requests_q=self._requests_q,
+            responses_q=self._responses_qs[client_id],
+            cancel_qs=self._cancel_qs,
+            max_batch=self.max_batch,
+            workers=self.workers,
+        )
+
+    def _watch(self):
+        # Clients only see their own queue: tell every one of them when the workers are gone
+        while not self._stopped.wait(1):
+            if not any(process.is_alive() for process in self._processes):
+                self._broadcast(_DEAD, "Emotion inference workers exited unexpectedly")
+                return
+
+    def _broadcast(self, kind: str, message: str):
+        for responses_q in self._responses_qs:
+            responses_q.put((kind, None, message))
+
+
+class EmotionInferenceClient:
+    """
+    A process's handle on the host's inference workers.
+
+    Sessions call `classify(texts)`; utterances are split into chunks of at most
+    `max_batch`, queued to the worker processes and coalesced there with chunks from
+    other sessions and other job worker processes. A dispatcher thread resolves the
+    per-chunk futures from this client's response queue.
+    """
+
+    def __init__(self, connection: InferenceConnection):
+        self.connection = connection
+        self.client_id = connection.client_id
+        self.max_batch = connection.max_batch
+        self.workers = connection.workers
+
+        self._dispatcher: Optional[threading.Thread] = None
+        self._futures: dict[int, Future] = {}
+        self._ids = itertools.count()
+        self._ready_workers = 0
+        self._error: Optional[str] = None
+        self._lock = threading.Lock()
+
+    # === Lifecycle ===
+
+    def start(self):
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="emotion-inference-dispatcher", daemon=True
+                )
+                self._dispatcher.start()
+
+    def close(self):
+        with self._lock:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            if dispatcher is not None and dispatcher.is_alive():
+                self.connection.responses_q.put((_STOP, None, None))
+                dispatcher.join()
+            self._fail_pending(RuntimeError("Emotion inference client closed"))
+
+    def is_ready(self) -> bool:
+        return self._ready_workers > 0 and self._error is None
+
+    # === Requests ===
+
+    def submit(self, texts: list[str]) -> Future:
+        """Queue one chunk of utterances and return a future for its label scores."""
+        self.start()
+        if self._error:
+            raise RuntimeError(self._error)
+        request_id = next(self._ids)
+        future = Future()
+        self._futures[request_id] = future
+        future.add_done_callback(lambda f: f.cancelled() and self._cancel(request_id))
+        self.connection.requests_q.put((self.client_id, request_id, texts))
+        return future
+
+    def classify(self, texts: list[str]) -> list[list[dict[str, Any]]]:
+        futures = [self.submit(texts[i:i + self.max_batch]) for i in range(0, len(texts), self.max_batch)]
+
+        results = []
+        try:
+            for future in futures:
+                results.extend(wait_result(future))
+        except Cancelled:
+            # Chunks no worker has picked up yet are skipped; answers already on the way are ignored
+            for future in futures:
+                future.cancel()
+            raise
+        return results
+
+    def _cancel(self, request_id: int):
+        self._futures.pop(request_id, None)
+        for cancel_q in self.connection.cancel_qs:
+            cancel_q.put((self.client_id, request_id))
+
+    def _dispatch(self):
+        while True:
+            request_id, payload, error = self.connection.responses_q.get()
+
+            if request_id == _STOP:
+                return
+            if request_id == _READY:
+                self._ready_workers += 1
+                print(f"✅ Emotion inference worker {payload} ready.")
+                continue
+            if request_id == _DEAD:
+                self._error = error
+                self._fail_pending(RuntimeError(error))
+                return
+
+            future = self._futures.pop(request_id, None)
+            if future is None or future.done():
+                continue
+            if error:
+                future.set_exception(RuntimeError(f"Emotion inference failed: {error}"))
+            else:
+                future.set_result(payload)
+
+    def _fail_pending(self, error: Exception):
+        futures, self._futures = self._futures, {}
+        for future in futures.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+_server: Optional[EmotionInferenceServer] = None
+_client: Optional[EmotionInferenceClient] = None
+_client_lock = threading.Lock()
+
+
+def host_inference_server(clients: int) -> EmotionInferenceServer:
+    """
+    Start this host's inference workers for `clients` clients and connect this process as
+    the last one; the others go to the job worker processes (see `connect_inference_server`).
+    """
+    global _server
+    with _client_lock:
+        if _server is None:
+            _server = EmotionInferenceServer(clients=clients)
+            _server.start()
+    connect_inference_server(_server.connection(clients - 1))
+    return _server
+
+
+def connect_inference_server(connection: InferenceConnection) -> EmotionInferenceClient:
+    """Use the host's inference workers from this process (called once in each job worker process)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EmotionInferenceClient(connection)
+            _client.start()
+    return _client
+
+
+def stop_inference_server():
+    """Disconnect this process and stop the inference workers it hosts, if any."""
+    global _server, _client
+    with _client_lock:
+        client, _client = _client, None
+        server, _server = _server, None
+    if client is not None:
+        client.close()
+    if server is not None:
+        server.stop()
+
+
+def connected_inference_client() -> Optional[EmotionInferenceClient]:
+    """This process's client, or None if it is not connected to an inference server."""
+    return _client
+
+
+def get_emotion_inference_client() -> EmotionInferenceClient:
+    """
+    Return this process's inference client. A process outside a worker pool (a script, a
+    test, an API with no embedded workers) hosts a private server on first use.
+    """
+    if _client is None:
+        host_inference_server(clients=1)
+    return _client
@@ -0,0 +1,94 @@
+import threading
+from typing import Any, Optional
+
+from transformers import pipeline
+
+from app.core.config import TEXT_EMOTION_MODEL, TOP_K_EMOTIONS, EMOTION_BACKEND
+
+EMOTION_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+class EmotionModelRegistry:
+    """
+    Process-wide holder for the text emotion classifier.
+
+    The classifier is built once (lazily on first use, or eagerly via `load()` at startup)
+    and then shared by every session handled by this process. `backend` selects eager
+    PyTorch (`torch`) or ONNX Runtime, optionally int8-quantized (`onnx`, `onnx-int8`).
+    """
+
+    def __init__(
+            self,
+            model_name: str = TEXT_EMOTION_MODEL,
+            top_k: Optional[str] = TOP_K_EMOTIONS,
+            backend: str = EMOTION_BACKEND,
+    ):
+        if backend not in EMOTION_BACKENDS:
+            raise ValueError(f"Invalid emotion backend: {backend}")
+
+        self.model_name = model_name
+        self.top_k = top_k
+        self.backend = backend
+        self._classifier = None
+        self._load_error: Optional[Exception] = None
+        self._lock = threading.Lock()
+
+    @property
+    def load_error(self) -> Optional[Exception]:
+        return self._load_error
+
+    def is_ready(self) -> bool:
+        return self._classifier is not None
+
+    def load(self) -> Any:
+        """Load the classifier if needed and return it. Safe to call from several threads."""
+        if self._classifier is not None:
+            return self._classifier
+
+        with self._lock:
+            if self._classifier is None:
+                print(f"🧠 Loading emotion model '{self.model_name}' ({self.backend})...")
+                try:
+                    self._classifier = self._build_classifier()
+                    self._load_error = None
+                except Exception as e:
+                    self._load_error = e
+                    print(f"❌ Failed to load emotion model: {e}")
+                    raise
+                print("✅ Emotion model ready.")
+
+        return self._classifier
+
+    def _build_classifier(self) -> Any:
+        if self.backend == "torch":
+            return pipeline("text-classification", model=self.model_name, top_k=self.top_k)
+
+        from app.services.emotions.onnx_backend import OnnxEmotionClassifier
+
+        return OnnxEmotionClassifier(
+            self.model_name,
+            quantize=self.backend == "onnx-int8",
+            top_k=int(self.top_k) if self.top_k else None,
+        )
+
+    def get_classifier(self) -> Any:
+        return self.load()
+
+    def warmup(self):
+        """Load the model and run one dummy inference so the first real request doesn't pay for lazy init."""
+        classifier = self.load()
+        classifier("warmup")
+
+
+_registry: Optional[EmotionModelRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_emotion_model_registry() -> EmotionModelRegistry:
+    """Return the process-wide emotion model registry."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EmotionModelRegistry()
+    return _registry
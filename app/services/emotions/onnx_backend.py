@@ -0,0 +1,170 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from transformers import AutoTokenizer
+
+from app.core.config import EMOTION_ONNX_CACHE_DIR, EMOTION_ONNX_THREADS
+
+
+class OnnxEmotionClassifier:
+    """
+    ONNX Runtime drop-in for the `text-classification` pipeline used by `Emotioner`.
+
+    On first use the Hugging Face model is exported to ONNX (and optionally dynamically
+    quantized to int8); the artifact is cached under `cache_dir` and reused on later starts.
+    Calling the classifier returns the same `[{label, score}]` structure as the pipeline.
+    """
+
+    def __init__(
+            self,
+            model_name: str,
+            quantize: bool = False,
+            top_k: Optional[int] = None,
+            cache_dir: Path = EMOTION_ONNX_CACHE_DIR,
+            num_threads: int = EMOTION_ONNX_THREADS,
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("The ONNX emotion backend requires the 'onnxruntime' package.") from e
+
+        self.model_name = model_name
+        self.quantize = quantize
+        self.top_k = top_k
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        model_path = self._ensure_exported(Path(cache_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.session = ort.InferenceSession(str(model_path), sess_options=options, providers=["CPUExecutionProvider"])
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        self._labels = self._load_labels(model_path.parent)
+
+    def __call__(self, inputs: str | list[str], batch_size: Optional[int] = None, truncation: bool = True) -> list:
+        single = isinstance(inputs, str)
+        texts = [inputs] if single else list(inputs)
+        batch_size = batch_size or len(texts) or 1
+
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            outputs.extend(self._run(texts[start:start + batch_size], truncation))
+
+        # Mirror the pipeline: a single string still comes back wrapped in a list
+        return [outputs[0]] if single else outputs
+
+    # === Inference ===
+
+    def _run(self, texts: list[str], truncation: bool) -> list:
+        encoded = self.tokenizer(texts, padding=True, truncation=truncation, return_tensors="np")
+        feed = {name: encoded[name].astype(np.int64) for name in self._input_names if name in encoded}
+
+        logits = self.session.run(None, feed)[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        probs = probs / probs.sum(axis=-1, keepdims=True)
+
+        return [self._format_scores(row) for row in probs]
+
+    def _format_scores(self, row: np.ndarray) -> Any:
+        scores = [{"label": self._labels[i], "score": float(score)} for i, score in enumerate(row)]
+        # The pipeline sorts by score even with top_k=None; stored artifacts must not depend on the backend
+        scores.sort(key=lambda s: s["score"], reverse=True)
+
+        if self.top_k is None:
+            return scores
+        if self.top_k == 1:
+            return scores[0]
+        return scores[:self.top_k]
+
+    # === Export & cache ===
+
+    def _ensure_exported(self, cache_dir: Path) -> Path:
+        model_dir = cache_dir / re.sub(r"[^A-Za-z0-9_.-]+", "__", self.model_name)
+        fp32_path = model_dir / "model.onnx"
+        int8_path = model_dir / "model.int8.onnx"
+        target = int8_path if self.quantize else fp32_path
+
+        if target.exists():
+            return target
+
+        # The lock only saves duplicate work inside a process; worker processes exporting at the
+        # same time each write their own temp file and atomically replace the target
+        with _export_lock:
+            if target.exists():
+                return target
+
+            model_dir.mkdir(parents=True, exist_ok=True)
+
+            if not fp32_path.exists():
+                self._export_fp32(model_dir, fp32_path)
+
+            if self.quantize and not int8_path.exists():
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+
+                print(f"🗜️ Quantizing ONNX emotion model to int8: {int8_path}")
+                tmp_path = _tmp_path(int8_path)
+                quantize_dynamic(str(fp32_path), str(tmp_path), weight_type=QuantType.QInt8)
+                tmp_path.replace(int8_path)
+
+        return target
+
+    def _export_fp32(self, model_dir: Path, fp32_path: Path):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        print(f"📦 Exporting emotion model '{self.model_name}' to ONNX: {fp32_path}")
+
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_name)
+        model.eval()
+
+        sample = self.tokenizer(["export sample"], return_tensors="pt")
+        input_names = list(sample.keys())
+        dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+        dynamic_axes["logits"] = {0: "batch"}
+
+        # Export to a temp name first so a crash never leaves a half-written artifact in the cache
+        tmp_path = _tmp_path(fp32_path)
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                tuple(sample[name] for name in input_names),
+                str(tmp_path),
+                input_names=input_names,
+                output_names=["logits"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+            )
+
+        # Labels first: a process that sees model.onnx also finds its labels
+        labels = [model.config.id2label[i] for i in range(model.config.num_labels)]
+        labels_path = model_dir / "labels.txt"
+        labels_tmp = _tmp_path(labels_path)
+        labels_tmp.write_text("\n".join(labels), encoding="utf-8")
+        labels_tmp.replace(labels_path)
+        tmp_path.replace(fp32_path)
+
+    def _load_labels(self, model_dir: Path) -> list[str]:
+        labels_path = model_dir / "labels.txt"
+        if labels_path.exists():
+            return labels_path.read_text(encoding="utf-8").splitlines()
+
+        from transformers import AutoConfig
+
+        config = AutoConfig.from_pretrained(self.model_name)
+        return [config.id2label[i] for i in range(config.num_labels)]
+
+
+_export_lock = threading.Lock()
+
+
+def _tmp_path(path: Path) -> Path:
+    # Unique per process and thread, so concurrent exports never write the same file
+    return path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
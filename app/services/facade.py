@@ -1,25 +1,55 @@
+import contextvars
 import uuid
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, ContextManager, Optional
 from fastapi import UploadFile
 
 from app.db.session_db import SessionDB
-from app.storage.session_storage import SessionStorage
+from app.db.status_writer import SessionStatusWriter
+from app.storage.session_storage import SessionStorage, get_session_storage
 
 from app.services.transcript.transcriber import Transcriber
 from app.services.emotions.emotioner import Emotioner
 from app.services.summary.summarizer import Summarizer
 from app.services.summary.prompts import PromptStyle
+from app.core.cancellation import DELETED, Cancelled, CancellationToken, current_token, outcome_status
+from app.core.config import PIPELINE_MAX_WORKERS, SESSION_DEADLINE_SEC, SUMMARY_DEFAULT_STYLE, SUMMARY_STYLES
+from app.services.session_context import SessionContext
+from app.services.pipeline import BlobCheckpointStore, PipelineExecutor, Stage, StageFailed
+
 class DialogueProcessor:
-    def __init__(self):
-        self.session_db = SessionDB()
-        self.session_storage = SessionStorage()
+    """
+    Orchestrates the session pipeline. The processor itself is stateless;
+    everything that belongs to one run lives on its `SessionContext`.
+
+    Processing runs as a stage graph (transcribe → metadata / emotions → summary) on a
+    `PipelineExecutor`, which checkpoints every completed stage so a failed or interrupted
+    session can be resumed without repeating the work that already succeeded.
+
+    Each run gets a cancellation token with a SESSION_DEADLINE_SEC deadline, linked to the
+    caller's current token (a job worker's), so a cancel request or a deleted session stops it.
+    """
+
+    def __init__(
+            self,
+            stage_guard: Optional[Callable[[str], ContextManager]] = None,
+            session_db: Optional[SessionDB] = None,
+            session_storage: Optional[SessionStorage] = None,
+            transcriber: Optional[Transcriber] = None,
+            emotion_analyzer: Optional[Emotioner] = None,
+            summarizer: Optional[Summarizer] = None,
+    ):
+        # Every collaborator can be swapped, e.g. for the offline fakes in app.benchmarks.pipeline_bench
+        self.session_db = session_db or SessionDB()
+        self.status = SessionStatusWriter(self.session_db)
+        self.session_storage = session_storage or get_session_storage()
 
-        self.transcriber = Transcriber()
-        self.emotion_analyzer = Emotioner()
-        self.summarizer = Summarizer()
+        self.transcriber = transcriber or Transcriber()
+        self.emotion_analyzer = emotion_analyzer or Emotioner()
+        self.summarizer = summarizer or Summarizer()
 
-        self._saved_audio_path = None
-        self.session_id = None
+        self.styles = [PromptStyle(style) for style in dict.fromkeys([SUMMARY_DEFAULT_STYLE, *SUMMARY_STYLES])]
+        self.pipeline = self._build_pipeline(stage_guard)
 
     def upload_audio_file(self, file: UploadFile) -> tuple[str, str]:
         if not file:
@@ -31,87 +61,198 @@ class DialogueProcessor:
         # ☁️ Upload audio and return blob path
         blob_path = self.session_storage.store_audio(session_id, file)
 
-        # 🔐 Store for later use (e.g., in process_audio)
-        self.session_id = session_id
-        self._saved_audio_path = blob_path
-
         return session_id, blob_path
 
-    def process_audio(self, session_id: str, audio_path: Optional[str] = None):
-        audio_blob_path = audio_path or self._saved_audio_path
+    def process_audio(self, session_id: str, audio_path: str) -> SessionContext:
+        if not audio_path:
+            raise ValueError("No audio path provided for processing.")
+
+        print(f"📥 Processing audio: {audio_path}")
+
+        ctx = self._new_context(session_id, audio_path)
+        self._run_pipeline(ctx)
+        return ctx
+
+    def resume(self, session_id: str) -> SessionContext:
+        """Re-run a session from its first incomplete stage, reusing every stored artifact."""
+        session = self.session_db.get_session(session_id)
+        if not session:
+            raise ValueError(f"Session {session_id} not found.")
+
+        print(f"🔁 Resuming session: {session_id}")
+
+        ctx = self._new_context(session_id, session["audio_file_url"])
+        if session.get("duration"):
+            ctx.duration_ms = session["duration"] * 1000
+        self._run_pipeline(ctx, resume=True)
+        return ctx
+
+    def reprocess(self, session_id: str, stages: list[str]) -> SessionContext:
+        """Re-run only `stages` (e.g. emotions, summary) from the stored transcript and other artifacts."""
+        session = self.session_db.get_session(session_id)
+        if not session:
+            raise ValueError(f"Session {session_id} not found.")
+
+        ctx = self._new_context(session_id, session["audio_file_url"])
+        if session.get("duration"):
+            ctx.duration_ms = session["duration"] * 1000
+        try:
+            self.pipeline.run(ctx, only=set(stages))
+        except StageFailed as e:
+            if ctx.cancellation.reason != DELETED:
+                self.status.update(session_id, {"session_status": outcome_status(e.error)}, error=str(e.error))
+            print(f"❌ {e}")
+            raise
+        finally:
+            # With write-behind the stage statuses are still buffered; a CLI run exits right after this
+            self.status.flush(session_id)
+        return ctx
+
+    def _new_context(self, session_id: str, audio_path: str) -> SessionContext:
+        token = CancellationToken(timeout=SESSION_DEADLINE_SEC or None, parent=current_token())
+        return SessionContext(session_id=session_id, audio_path=audio_path, cancellation=token)
+
+    def _run_pipeline(self, ctx: SessionContext, resume: bool = False):
+        session_id = ctx.session_id
+        self.status.update(session_id, {"session_status": "processing", "processing_error": None})
 
-        if not audio_blob_path:
-            raise ValueError("No audio path provided or saved for processing.")
+        try:
+            self.pipeline.run(ctx, resume=resume)
+        except StageFailed as e:
+            if ctx.cancellation.reason != DELETED:
+                # "cancelled" and "timed_out" are kept apart from real failures
+                self.status.update(session_id, {"session_status": outcome_status(e.error)}, error=str(e.error))
+                self.status.flush(session_id)
+            print(f"❌ {e}")
+            if isinstance(e.error, Cancelled):
+                raise e.error from e  # not retried by the job queue
+            raise  # lets the job queue retry; the retry resumes from the checkpoint
+        finally:
+            if ctx.cancellation.reason != DELETED:
+                self._store_timings(ctx)
+            else:
+                # The delete endpoint gives up waiting eventually; whatever this run wrote since goes too
+                self.session_storage.delete_all(session_id)
+
+        try:
+            self.status.update(session_id, {"session_status": "completed"})
+            self.status.flush(session_id)
+            print("✅ Processing complete and saved to DB.")
+        except Exception as e:
+            self.session_db.set_status(session_id, "session_status", "failed", error=str(e))
+            print(f"❌ Failed to save session data: {e}")
+
+    def _store_timings(self, ctx: SessionContext):
+        # ⏱️ Where the minutes went, next to the artifacts they produced
+        try:
+            timings = ctx.timings.to_dict()
+            self.session_storage.store_timings(ctx.session_id, timings)
+            print(f"⏱️ Stage timings: {timings['stages']}")
+        except Exception as e:
+            print(f"⚠️ Failed to store session timings: {e}")
 
-        print(f"📥 Processing audio: {audio_blob_path}")
+    # ----------------------------- Pipeline Stages -----------------------------
 
-        # ----------------------------- Session Initialization -----------------------------
-        self.session_db.set_status(session_id, "summary_status", "processing")
+    def _build_pipeline(self, stage_guard: Optional[Callable[[str], ContextManager]] = None) -> PipelineExecutor:
+        stages = [
+            Stage(
+                "transcribe",
+                run=self._transcribe,
+                restore=self._restore_transcript,
+                artifacts_exist=lambda ctx: self.session_storage.blob_exists(f"{ctx.session_id}/transcript"),
+            ),
+            Stage("metadata", run=self._store_metadata, depends_on=("transcribe",)),
+            Stage(
+                "emotions",
+                run=self._analyze_emotions,
+                depends_on=("transcribe",),
+                restore=lambda ctx, _: setattr(ctx, "emotions", self.session_storage.load_emotions(ctx.session_id)),
+                artifacts_exist=lambda ctx: self.session_storage.blob_exists(f"{ctx.session_id}/emotions"),
+            ),
+            Stage(
+                "summary",
+                run=self._summarize,
+                depends_on=("transcribe", "emotions"),
+                artifacts_exist=lambda ctx: all(
+                    self.session_storage.blob_exists(self.session_storage.summary_blob_path(ctx.session_id, style.value))
+                    for style in self.styles
+                ),
+            ),
+        ]
+        return PipelineExecutor(
+            stages,
+            BlobCheckpointStore(self.session_storage),
+            max_workers=PIPELINE_MAX_WORKERS,
+            stage_guard=stage_guard,
+        )
 
-        # ----------------------------- Transcription -----------------------------
-        self.session_db.set_status(session_id, "transcript_status", "processing")
+    def _transcribe(self, ctx: SessionContext) -> dict:
+        session_id = ctx.session_id
+        self.status.update(session_id, {"transcript_status": "processing"})
 
         try:
-            transcript_json = self.transcriber.transcribe(audio_blob_path)
+            transcript_json = self.transcriber.transcribe(ctx.audio_path, ctx)
+            ctx.cancellation.raise_if_cancelled()  # a deleted session must not get new blobs
             transcript_blob_path = self.session_storage.store_transcript(session_id, transcript_json)
-            self.session_db.set_status(session_id, "transcript_url", transcript_blob_path)
-            self.session_db.set_status(session_id, "transcript_status", "completed")
+            self.status.update(session_id, {"transcript_url": transcript_blob_path, "transcript_status": "completed"})
             print("✅ Transcription complete.")
         except Exception as e:
-            self.session_db.set_status(session_id, "transcript_status", "failed")
-            self.session_db.set_status(session_id, "session_status", "failed")
-            self.session_db.set_status(session_id, "processing_error", str(e))
+            self.status.update(session_id, {"transcript_status": outcome_status(e)})
             print(f"❌ Transcription failed: {e}")
-            return
+            raise
 
-        # ----------------------------- More Metadata Identification -----------------------------
+        # Kept in the checkpoint, the stored transcript lines don't carry them
+        return {"duration_ms": ctx.duration_ms, "language": ctx.language}
 
+    def _restore_transcript(self, ctx: SessionContext, outputs: dict):
+        ctx.transcript = self.session_storage.load_transcript(ctx.session_id)
+        ctx.duration_ms = outputs.get("duration_ms", ctx.duration_ms)
+        ctx.language = outputs.get("language", ctx.language)
+
+    def _store_metadata(self, ctx: SessionContext):
         try:
-            self.session_db.set_status(session_id, "participants", self.transcriber.participants)
-            self.session_db.set_status(session_id, "duration", self.transcriber.duration_seconds)
+            self.status.update(ctx.session_id, {"participants": ctx.participants, "duration": ctx.duration_seconds})
         except Exception as e:
-            self.session_db.set_status(session_id, "session_status", "failed")
-            self.session_db.set_status(session_id, "processing_error", str(e))
             print(f"Set participants in sessions DB failed: {e}")
-            return
+            raise
 
-        # ----------------------------- Emotion Analysis -----------------------------
-        self.session_db.set_status(session_id, "emotion_breakdown_status", "processing")
+    def _analyze_emotions(self, ctx: SessionContext):
+        session_id = ctx.session_id
+        self.status.update(session_id, {"emotion_breakdown_status": "processing"})
 
         try:
-            emotion_json = self.emotion_analyzer.get_emotions(transcript_json)
-            emotion_blob = self.session_storage.store_emotions(session_id, emotion_json)
-            self.session_db.set_status(session_id, "emotion_breakdown_url", emotion_blob)
-            self.session_db.set_status(session_id, "emotion_breakdown_status", "completed")
+            ctx.emotions = self.emotion_analyzer.get_emotions(ctx.transcript)
+            ctx.cancellation.raise_if_cancelled()
+            emotion_blob = self.session_storage.store_emotions(session_id, ctx.emotions)
+            self.status.update(session_id, {"emotion_breakdown_url": emotion_blob, "emotion_breakdown_status": "completed"})
             print("✅ Emotion complete.")
         except Exception as e:
-            self.session_db.set_status(session_id, "emotion_breakdown_status", "failed")
-            self.session_db.set_status(session_id, "session_status", "failed")
-            self.session_db.set_status(session_id, "processing_error", str(e))
+            self.status.update(session_id, {"emotion_breakdown_status": outcome_status(e)})
             print(f"❌ Emotion failed: {e}")
-            return
+            raise
 
-        # ----------------------------- Summarization -----------------------------
-        self.session_db.set_status(session_id, "summary_status", "processing")
+    def _summarize(self, ctx: SessionContext):
+        session_id = ctx.session_id
+        self.status.update(session_id, {"summary_status": "processing"})
 
         try:
-            summary_text = self.summarizer.summarize(transcript_json, emotion_json, PromptStyle.EMOTIONAL_STORY)
-            summary_blob = self.session_storage.store_summary(session_id, summary_text)
-            self.session_db.set_status(session_id, "summary_url", summary_blob)
-            self.session_db.set_status(session_id, "summary_status", "completed")
+            # 🎨 Annotate once, then generate every configured style concurrently
+            summaries = self.summarizer.summarize_many(ctx.transcript, ctx.emotions, self.styles)
+            ctx.summaries = {style.value: text for style, text in summaries.items()}
+            ctx.summary = ctx.summaries[SUMMARY_DEFAULT_STYLE]
+            ctx.cancellation.raise_if_cancelled()
+
+            # ☁️ Upload the style blobs side by side
+            with ThreadPoolExecutor(max_workers=len(ctx.summaries)) as pool:
+                uploads = {
+                    style: pool.submit(contextvars.copy_context().run, self.session_storage.store_summary, session_id, text, style)
+                    for style, text in ctx.summaries.items()
+                }
+                summary_blobs = {style: upload.result() for style, upload in uploads.items()}
+
+            self.status.update(session_id, {"summary_url": summary_blobs[SUMMARY_DEFAULT_STYLE], "summary_status": "completed"})
             print("✅ Summarization complete.")
         except Exception as e:
-            self.session_db.set_status(session_id, "summary_status", "failed")
-            self.session_db.set_status(session_id, "session_status", "failed")
-            self.session_db.set_status(session_id, "processing_error", str(e))
+            self.status.update(session_id, {"summary_status": outcome_status(e)})
             print(f"❌ Summarization failed: {e}")
-            return
-
-        # ----------------------------- Saving Session Status -----------------------------
-        try:
-            self.session_db.set_status(session_id, "session_status", "completed")
-            print("✅ Processing complete and saved to DB.")
-        except Exception as e:
-            self.session_db.set_status(session_id, "session_status", "failed")
-            self.session_db.set_status(session_id, "processing_error", str(e))
-            print(f"❌ Failed to save session data: {e}")
\ No newline at end of file
+            raise
@@ -0,0 +1,218 @@
+import threading
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, ContextManager, Optional
+
+from app.core.cancellation import DELETED, cancellation_scope
+from app.core.metrics import record_timings, stage_span
+from app.services.session_context import SessionContext
+
+if TYPE_CHECKING:
+    from app.storage.session_storage import SessionStorage
+
+
+@dataclass
+class Stage:
+    """
+    One node of the session pipeline.
+
+    - `run` does the work and may return small outputs (e.g. duration) to keep in the checkpoint.
+    - `restore` rebuilds the context from stored artifacts when a completed stage is skipped
+      but a later stage still needs its results.
+    - `artifacts_exist` lets a resumed run skip the stage when its artifacts are already stored,
+      even if no checkpoint was recorded for it.
+    """
+    name: str
+    run: Callable[[SessionContext], Optional[dict[str, Any]]]
+    depends_on: tuple[str, ...] = ()
+    restore: Optional[Callable[[SessionContext, dict[str, Any]], None]] = None
+    artifacts_exist: Optional[Callable[[SessionContext], bool]] = None
+
+
+class StageFailed(Exception):
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+class BlobCheckpointStore:
+    """Keeps the per-session checkpoint as a small JSON blob next to the session artifacts."""
+
+    def __init__(self, storage: "SessionStorage"):
+        self.storage = storage
+
+    def load(self, session_id: str) -> dict[str, Any]:
+        return self.storage.load_checkpoint(session_id)
+
+    def save(self, session_id: str, checkpoint: dict[str, Any]):
+        self.storage.store_checkpoint(session_id, checkpoint)
+
+
+class PipelineExecutor:
+    """
+    Runs a DAG of stages for one session, in parallel where dependencies allow.
+
+    Every completed stage is recorded in the session checkpoint together with its outputs.
+    With `resume=True`, stages that are already checkpointed (or whose artifacts exist) are
+    skipped and execution continues from the first incomplete stage.
+
+    Stages run under the session's cancellation token: once it is cancelled (or its deadline
+    passes) no further stage starts, and the running ones stop at their next check.
+    """
+
+    def __init__(
+            self,
+            stages: list[Stage],
+            checkpoints: BlobCheckpointStore,
+            max_workers: int = 4,
+            stage_guard: Optional[Callable[[str], ContextManager]] = None,
+    ):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+
+        self.order = self._topological_order(stages)
+        self.checkpoints = checkpoints
+        self.max_workers = max_workers
+        self.stage_guard = stage_guard
+
+    def run(self, ctx: SessionContext, resume: bool = False, only: Optional[set[str]] = None) -> dict[str, str]:
+        """
+        Run all incomplete stages. Returns the outcome per stage: completed, skipped or failed.
+        `only` re-runs just those stages on top of the stored results of all the others; if a
+        result they depend on cannot be restored, the run fails (StageFailed for that stage)
+        instead of quietly re-running stages that were not asked for.
+        """
+        checkpoint = self.checkpoints.load(ctx.session_id) if resume or only else {}
+        records: dict[str, dict[str, Any]] = checkpoint.setdefault("stages", {})
+        lock = threading.Lock()
+
+        if only:
+            unknown = set(only) - set(self.stages)
+            if unknown:
+                raise ValueError(f"Unknown stages: {sorted(unknown)}")
+            done = set(self.stages) - set(only)
+        elif resume:
+            done = self._completed_stages(ctx, records)
+        else:
+            done = set()
+        done = self._restore_dependencies(ctx, done, records, rerun_missing=not only)
+        outcome = {name: "skipped" for name in done}
+
+        pending = [name for name in self.order if name not in done]
+        if done and not only:
+            print(f"⏩ Resuming session {ctx.session_id}: skipping {sorted(done)}")
+
+        def save(name: str, outputs: dict[str, Any]):
+            if ctx.cancellation.reason == DELETED:
+                return  # nothing left to resume
+            with lock:
+                records[name] = {"status": "completed", "outputs": outputs}
+                self.checkpoints.save(ctx.session_id, checkpoint)
+
+        failure: Optional[StageFailed] = None
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running: dict[Future, str] = {}
+
+            while True:
+                if failure is None:
+                    for name in list(pending):
+                        if all(dep in done for dep in self.stages[name].depends_on):
+                            pending.remove(name)
+                            running[pool.submit(self._run_stage, name, ctx)] = name
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    try:
+                        outputs = future.result() or {}
+                    except Exception as e:
+                        outcome[name] = "failed"
+                        failure = failure or StageFailed(name, e)
+                        continue
+
+                    save(name, outputs)
+                    done.add(name)
+                    outcome[name] = "completed"
+
+        if failure is not None:
+            raise failure
+
+        return outcome
+
+    # === Internals ===
+
+    def _run_stage(self, name: str, ctx: SessionContext) -> Optional[dict[str, Any]]:
+        # The guard (e.g. a cross-process concurrency cap) is held for the duration of the stage
+        with cancellation_scope(ctx.cancellation):
+            ctx.cancellation.raise_if_cancelled()
+            with self.stage_guard(name) if self.stage_guard else nullcontext():
+                ctx.cancellation.raise_if_cancelled()
+                with record_timings(ctx.timings), stage_span(name):
+                    return self.stages[name].run(ctx)
+
+    def _completed_stages(self, ctx: SessionContext, records: dict[str, dict[str, Any]]) -> set[str]:
+        done = set()
+        for name in self.order:
+            stage = self.stages[name]
+            if records.get(name, {}).get("status") == "completed":
+                done.add(name)
+            elif stage.artifacts_exist is not None and stage.artifacts_exist(ctx):
+                records[name] = {"status": "completed", "outputs": {}}
+                done.add(name)
+        return done
+
+    def _restore_dependencies(self, ctx: SessionContext, done: set[str], records: dict[str, dict[str, Any]],
+                              rerun_missing: bool = True) -> set[str]:
+        # Restore the results of skipped stages that a stage still to run depends on.
+        # If an artifact turns out to be missing, that stage is run again (or, with
+        # `rerun_missing=False`, the run fails).
+        restored: set[str] = set()
+        while True:
+            needed = {
+                dep
+                for name in self.order if name not in done
+                for dep in self.stages[name].depends_on
+                if dep in done and dep not in restored
+            }
+            if not needed:
+                return done
+
+            for dep in needed:
+                stage = self.stages[dep]
+                try:
+                    if stage.restore is not None:
+                        stage.restore(ctx, records.get(dep, {}).get("outputs", {}))
+                    restored.add(dep)
+                except Exception as e:
+                    if not rerun_missing:
+                        print(f"❌ Could not restore stage '{dep}' for the selected stages: {e}")
+                        raise StageFailed(dep, e) from e
+                    print(f"⚠️ Could not restore stage '{dep}', it will run again: {e}")
+                    done.discard(dep)
+                    records.pop(dep, None)
+
+    @staticmethod
+    def _topological_order(stages: list[Stage]) -> list[str]:
+        names = {stage.name for stage in stages}
+        remaining = {stage.name: set(stage.depends_on) for stage in stages}
+
+        for stage in stages:
+            unknown = set(stage.depends_on) - names
+            if unknown:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {sorted(unknown)}")
+
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps - set(order)]
+            if not ready:
+                raise ValueError(f"Pipeline has a dependency cycle among: {sorted(remaining)}")
+            for name in ready:
+                order.append(name)
+                del remaining[name]
+        return order
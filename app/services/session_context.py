@@ -0,0 +1,52 @@
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from app.core.cancellation import CancellationToken
+from app.core.metrics import SessionTimings
+
+
+@dataclass
+class SessionContext:
+    """
+    Per-session state threaded through `DialogueProcessor.process_audio`.
+
+    Every pipeline run owns its own context, so the shared service objects
+    (Transcriber, Emotioner, Summarizer) stay stateless and several sessions
+    can be processed in parallel on the same worker.
+    """
+    session_id: str
+    audio_path: str
+
+    # Transcription results
+    phrases: list[dict[str, Any]] = field(default_factory=list)
+    duration_ms: Optional[float] = None
+    language: Optional[str] = None
+    transcript: Optional[list[dict[str, Any]]] = None
+
+    # Downstream artifacts
+    emotions: Optional[list[dict[str, Any]]] = None
+    summary: Optional[str] = None
+    summaries: dict[str, str] = field(default_factory=dict)  # style value -> text
+
+    # Stage and external call timings of this run
+    timings: SessionTimings = field(init=False, repr=False)
+
+    # Cancel request and deadline of this run, checked by the stages and the services they call
+    cancellation: CancellationToken = field(default_factory=CancellationToken, repr=False)
+
+    def __post_init__(self):
+        self.timings = SessionTimings(self.session_id)
+
+    @property
+    def duration_seconds(self) -> float | None:
+        return round(self.duration_ms / 1000, 2) if self.duration_ms else None
+
+    @property
+    def participants(self) -> list:
+        # A resumed run only has the stored transcript lines, which carry the same speaker labels
+        source = self.phrases or self.transcript or []
+        return sorted({f"Speaker {p.get('speaker', '?')}" for p in source})
+
+    @property
+    def number_of_participants(self) -> int:
+        return len(self.participants)
@@ -0,0 +1,96 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from difflib import SequenceMatcher
+from typing import Any, Optional
+
+# Absorbs float rounding when turning |a - b| <= threshold into a bisect window
+_EPSILON = 1e-9
+
+
+class EmotionAligner:
+    """
+    Matches transcript lines to emotion entries by start time and text.
+
+    A line matches an entry when their start times differ by at most `time_threshold`
+    seconds and their stripped texts have a `SequenceMatcher` ratio of at least
+    `similarity_threshold`. Instead of comparing every line with every entry, entries
+    are indexed once:
+
+    - exact texts are looked up in a hash index, then filtered by a bisect time window;
+    - lines without an exact match fall back to fuzzy matching, but only against the
+      few entries whose start time falls inside the window.
+
+    When several entries qualify, the one that appears first in `emotions` wins, and
+    an exact-text match is preferred over a fuzzy one.
+    """
+
+    def __init__(self, emotions: list[dict[str, Any]], time_threshold: float = 0.05, similarity_threshold: float = 0.95):
+        self.emotions = emotions
+        self.time_threshold = time_threshold
+        self.similarity_threshold = similarity_threshold
+
+        self._texts = [str(e.get("text", "")).strip() for e in emotions]
+        self._starts = [float(e["start_time"]) for e in emotions]
+
+        # All entries sorted by start time, for the fuzzy fallback window
+        self._by_time = sorted(range(len(emotions)), key=lambda i: self._starts[i])
+        self._sorted_starts = [self._starts[i] for i in self._by_time]
+
+        # Exact text -> entries sorted by start time
+        by_text: dict[str, list[int]] = defaultdict(list)
+        for i in self._by_time:
+            by_text[self._texts[i]].append(i)
+        self._by_text = {text: (indices, [self._starts[i] for i in indices]) for text, indices in by_text.items()}
+
+    def match(self, start_time: Any, text: str) -> Optional[dict[str, Any]]:
+        start = float(start_time)
+        text = text.strip()
+
+        exact = self._match_exact(start, text)
+        if exact is not None:
+            return self.emotions[exact]
+
+        fuzzy = self._match_fuzzy(start, text)
+        return self.emotions[fuzzy] if fuzzy is not None else None
+
+    def align(self, transcript: list[dict[str, Any]]) -> list[Optional[dict[str, Any]]]:
+        """Return the matching emotion entry (or None) for every transcript line, in order."""
+        return [self.match(t["start_time"], t["text"]) for t in transcript]
+
+    # === Internals ===
+
+    def _window(self, starts: list[float], start: float) -> tuple[int, int]:
+        lo = bisect_left(starts, start - self.time_threshold - _EPSILON)
+        hi = bisect_right(starts, start + self.time_threshold + _EPSILON)
+        return lo, hi
+
+    def _within_time(self, start: float, i: int) -> bool:
+        return abs(start - self._starts[i]) <= self.time_threshold
+
+    def _match_exact(self, start: float, text: str) -> Optional[int]:
+        # An identical text always has ratio 1.0, unless both sides are empty (ratio is then 1.0 as well)
+        entry = self._by_text.get(text)
+        if entry is None:
+            return None
+
+        indices, starts = entry
+        lo, hi = self._window(starts, start)
+        candidates = [i for i in indices[lo:hi] if self._within_time(start, i)]
+        return min(candidates) if candidates else None
+
+    def _match_fuzzy(self, start: float, text: str) -> Optional[int]:
+        lo, hi = self._window(self._sorted_starts, start)
+        candidates = sorted(i for i in self._by_time[lo:hi] if self._within_time(start, i))
+
+        matcher = SequenceMatcher(None, text, "")
+        for i in candidates:
+            matcher.set_seq2(self._texts[i])
+            # Cheap upper bounds first; ratio() is the expensive part
+            if matcher.real_quick_ratio() < self.similarity_threshold:
+                continue
+            if matcher.quick_ratio() < self.similarity_threshold:
+                continue
+            if matcher.ratio() >= self.similarity_threshold:
+                return i
+
+        return None
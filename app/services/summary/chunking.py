@@ -0,0 +1,48 @@
+from typing import Optional
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+# Rough chars-per-token ratio for English text when tiktoken is unavailable
+_CHARS_PER_TOKEN = 4
+
+_encoding = None
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate how many model tokens `text` uses."""
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+def chunk_lines(lines: list[str], max_tokens: int, token_counts: Optional[list[int]] = None) -> list[list[str]]:
+    """
+    Greedily pack consecutive lines into chunks of at most `max_tokens` tokens.
+
+    Order is preserved. A single line longer than `max_tokens` becomes its own chunk.
+    """
+    if token_counts is None:
+        token_counts = [estimate_tokens(line) for line in lines]
+
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for line, tokens in zip(lines, token_counts):
+        # +1 for the newline joining lines inside a chunk
+        if current and current_tokens + tokens + 1 > max_tokens:
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(line)
+        current_tokens += tokens + 1
+
+    if current:
+        chunks.append(current)
+
+    return chunks
@@ -190,3 +190,24 @@ PROMPT_PRESETS = {
         )
     }
 }
+
+
+# Used by map-reduce summarization of long sessions: each chunk is condensed with this
+# prompt, then the chunk notes are fed to the selected preset in place of the transcript.
+CHUNK_SUMMARY_PROMPT = {
+    "system": "You are a meticulous note-taker who condenses parts of long conversations without losing their emotional texture.",
+    "format": (
+        "Below is part {part} of {total} of a longer multi-speaker conversation, with speaker labels and emotional annotations.\n\n"
+        "{lines}\n\n"
+        "Write compact chronological notes for this part only:\n"
+        "- Keep speaker labels exactly as written.\n"
+        "- Capture topics, facts, numbers, decisions, action items with owners and dates.\n"
+        "- Capture emotional shifts and who felt what, quoting the most significant lines verbatim.\n"
+        "- Do not add interpretation, introductions or conclusions. Do not invent facts."
+    )
+}
+
+REDUCE_NOTES_HEADER = (
+    "(This conversation was long, so it is given as chronological notes from consecutive parts. "
+    "The notes keep speaker labels, key quotes and emotional cues.)"
+)
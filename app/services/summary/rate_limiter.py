@@ -0,0 +1,248 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Mapping, Optional
+
+from app.core.cancellation import current_token
+from app.core.config import AZURE_OPENAI_RPM, AZURE_OPENAI_SHARED_QUOTA, AZURE_OPENAI_TPM
+from app.core.metrics import count_openai_throttled, set_openai_queue_depth
+from app.utils.utils import parse_retry_after
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `capacity` per minute."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_per_sec = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        missing = amount - self.tokens
+        return missing / self.refill_per_sec if missing > 0 else 0.0
+
+    def clamp(self, remaining: float):
+        # The server's view of our quota wins when it is lower than ours (e.g. other hosts)
+        self.tokens = min(self.tokens, remaining)
+
+
+class LocalQuota:
+    """Requests/minute and tokens/minute buckets held in this process."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.blocked_until = 0.0
+
+    def take(self, tokens: float) -> float:
+        """Take one request and `tokens` tokens, or return how long to wait for them."""
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        wait = max(self.blocked_until - now, self.requests.wait_time(1), self.tokens.wait_time(tokens))
+        if wait <= 0:
+            self.requests.tokens -= 1
+            self.tokens.tokens -= tokens
+        return wait
+
+    def clamp(self, requests: Optional[float], tokens: Optional[float]):
+        if requests is not None:
+            self.requests.clamp(requests)
+        if tokens is not None:
+            self.tokens.clamp(tokens)
+
+    def block(self, delay: float):
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    def state(self) -> dict[str, float]:
+        return {
+            "requests_available": self.requests.tokens,
+            "tokens_available": self.tokens.tokens,
+            "blocked_for_sec": max(0.0, self.blocked_until - time.monotonic()),
+        }
+
+
+class SharedQuota:
+    """The same buckets kept in the job queue's database, drawn from by every worker process."""
+
+    def __init__(self, queue, requests_per_minute: int, tokens_per_minute: int, name: str = "azure_openai"):
+        self.queue = queue
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.names = {"requests": f"{name}:requests", "tokens": f"{name}:tokens"}
+
+    def take(self, tokens: float) -> float:
+        return self.queue.take_rate({
+            self.names["requests"]: (1, self.requests_per_minute),
+            self.names["tokens"]: (tokens, self.tokens_per_minute),
+        })
+
+    def clamp(self, requests: Optional[float], tokens: Optional[float]):
+        for kind, remaining in (("requests", requests), ("tokens", tokens)):
+            if remaining is not None:
+                self.queue.clamp_rate(self.names[kind], remaining)
+
+    def block(self, delay: float):
+        self.queue.block_rate(list(self.names.values()), delay)
+
+    def state(self) -> dict[str, float]:
+        buckets = self.queue.rate_state(list(self.names.values()))
+        requests = buckets.get(self.names["requests"], {})
+        tokens = buckets.get(self.names["tokens"], {})
+        return {
+            "requests_available": requests.get("available", self.requests_per_minute),
+            "tokens_available": tokens.get("available", self.tokens_per_minute),
+            "blocked_for_sec": max(requests.get("blocked_for_sec", 0.0), tokens.get("blocked_for_sec", 0.0)),
+        }
+
+
+class AzureOpenAIRateLimiter:
+    """
+    Client-side requests/minute and tokens/minute limiter shared by every summary call in the process.
+
+    Callers are served strictly in arrival order, so a burst of large map-reduce prompts cannot
+    starve a small one queued earlier. `x-ratelimit-remaining-*` response headers keep the buckets
+    in sync with the server, and a `Retry-After` pauses the whole queue instead of each caller.
+    A caller whose session is cancelled (or runs out of time) leaves the queue right away.
+
+    The buckets themselves live in `quota`: in this process by default, or in the job queue's
+    database (`SharedQuota`) so that all worker processes together stay under the deployment's quota.
+    """
+
+    def __init__(self, requests_per_minute: int = AZURE_OPENAI_RPM, tokens_per_minute: int = AZURE_OPENAI_TPM,
+                 quota=None):
+        self.tokens_per_minute = tokens_per_minute
+        self.quota = quota or LocalQuota(requests_per_minute, tokens_per_minute)
+        self.throttled = 0
+
+        self._tickets = itertools.count()
+        self._queue: deque[int] = deque()
+        self._cond = threading.Condition()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def acquire(self, tokens: int, timeout: Optional[float] = None):
+        """Block until one request of roughly `tokens` tokens may be sent."""
+        tokens = min(float(tokens), float(self.tokens_per_minute))
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        cancellation = current_token()
+        unregister = cancellation.on_cancel(self._wake_all) if cancellation is not None else None
+        try:
+            self._acquire(tokens, deadline, cancellation)
+        finally:
+            if unregister is not None:
+                unregister()
+
+    def _acquire(self, tokens: float, deadline: Optional[float], cancellation):
+        with self._cond:
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            set_openai_queue_depth(len(self._queue))
+            try:
+                while True:
+                    if cancellation is not None:
+                        cancellation.raise_if_cancelled()
+                    now = time.monotonic()
+
+                    if self._queue[0] == ticket:
+                        wait = self.quota.take(tokens)
+                        if wait <= 0:
+                            return
+                    else:
+                        wait = None  # woken up when the head of the queue is served
+
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise TimeoutError("Timed out waiting for Azure OpenAI rate limit capacity")
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    # Wake up at the session deadline; explicit cancels notify through _wake_all
+                    session_remaining = cancellation.remaining() if cancellation is not None else None
+                    if session_remaining is not None:
+                        wait = session_remaining if wait is None else min(wait, session_remaining)
+
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._queue.remove(ticket)
+                set_openai_queue_depth(len(self._queue))
+                self._cond.notify_all()
+
+    def _wake_all(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """Sync the buckets with the `x-ratelimit-remaining-*` headers of a response."""
+        remaining_requests = _header_float(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = _header_float(headers, "x-ratelimit-remaining-tokens")
+
+        with self._cond:
+            self.quota.clamp(remaining_requests, remaining_tokens)
+
+    def penalize(self, headers: Optional[Mapping[str, str]], fallback_sec: float) -> float:
+        """Pause all callers after a 429, for `Retry-After` seconds if the server sent one. Returns the pause."""
+        delay = retry_after_from_headers(headers) if headers is not None else None
+        if delay is None:
+            delay = fallback_sec
+
+        with self._cond:
+            self.throttled += 1
+            count_openai_throttled()
+            self.quota.block(delay)
+            self._cond.notify_all()
+        return delay
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            state = self.quota.state()
+        return {
+            "queue_depth": self.queue_depth,
+            "requests_available": round(state["requests_available"], 1),
+            "tokens_available": round(state["tokens_available"]),
+            "blocked_for_sec": round(state["blocked_for_sec"], 2),
+            "throttled": self.throttled,
+        }
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def retry_after_from_headers(headers: Mapping[str, str]) -> Optional[float]:
+    retry_after_ms = _header_float(headers, "retry-after-ms")
+    if retry_after_ms is not None:
+        return retry_after_ms / 1000
+    return parse_retry_after(headers.get("retry-after"))
+
+
+_limiter: Optional[AzureOpenAIRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AzureOpenAIRateLimiter:
+    """Return the process-wide limiter for the configured Azure OpenAI deployment."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                quota = None
+                if AZURE_OPENAI_SHARED_QUOTA:
+                    from app.jobs.job_queue import get_job_queue
+
+                    quota = SharedQuota(get_job_queue(), AZURE_OPENAI_RPM, AZURE_OPENAI_TPM)
+                _limiter = AzureOpenAIRateLimiter(quota=quota)
+    return _limiter
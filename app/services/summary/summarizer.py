@@ -1,28 +1,196 @@
-from typing import Any
-from openai import AzureOpenAI, RateLimitError
-from difflib import SequenceMatcher
-from app.services.summary.prompts import PROMPT_PRESETS, PromptStyle
+import contextvars
+import threading
+from typing import Any, Callable, Iterator, Optional
+from concurrent.futures import ThreadPoolExecutor
+from openai import APITimeoutError, AzureOpenAI, RateLimitError
+from app.core.cancellation import check_cancelled, current_token
+from app.core.metrics import call_span
+from app.services.summary.aligner import EmotionAligner
+from app.services.summary.chunking import chunk_lines, estimate_tokens
+from app.services.summary.rate_limiter import AzureOpenAIRateLimiter, get_rate_limiter
+from app.services.summary.summary_cache import get_summary_cache, make_cache_key
+from app.services.summary.prompts import PROMPT_PRESETS, PromptStyle, CHUNK_SUMMARY_PROMPT, REDUCE_NOTES_HEADER
 from app.services.summary.prompts import PROMPT_LABELS  # new
 from app.core.config import (
     AZURE_OPENAI_API_KEY,
     AZURE_OPENAI_API_VERSION,
     AZURE_OPENAI_ENDPOINT,
     AZURE_OPENAI_DEPLOYMENT,
+    SUMMARY_MAX_TOKENS,
+    SUMMARY_TOKEN_BUDGET,
+    SUMMARY_CHUNK_TOKENS,
+    SUMMARY_MAP_CONCURRENCY,
+    SUMMARY_MAP_MAX_TOKENS,
+    SUMMARY_MAX_MAP_ROUNDS,
+    SUMMARY_TEMPERATURE,
+    SUMMARY_MAX_RETRIES,
 )
-import time
+
+# Map notes are shared by every style of a session, so they are written from the most detailed line format
+MAP_LINE_STYLE = PromptStyle.ANALYTICAL
 
 class Summarizer:
-    def __init__(self, emotion_threshold: float = 0.7):
+    def __init__(
+            self,
+            emotion_threshold: float = 0.7,
+            token_budget: int = SUMMARY_TOKEN_BUDGET,
+            chunk_tokens: int = SUMMARY_CHUNK_TOKENS,
+            map_concurrency: int = SUMMARY_MAP_CONCURRENCY,
+            temperature: float = SUMMARY_TEMPERATURE,
+            client: Optional[AzureOpenAI] = None,
+            rate_limiter: Optional[AzureOpenAIRateLimiter] = None,
+            use_cache: bool = True,
+    ):
         self.emotion_threshold = emotion_threshold
-        self.client = AzureOpenAI(
+        self.token_budget = token_budget
+        self.chunk_tokens = chunk_tokens
+        self.map_concurrency = map_concurrency
+        self.temperature = temperature
+        self.client = client or AzureOpenAI(
             api_key=AZURE_OPENAI_API_KEY,
             api_version=AZURE_OPENAI_API_VERSION,
             azure_endpoint=AZURE_OPENAI_ENDPOINT,
         )
+        self.rate_limiter = rate_limiter
+        self.use_cache = use_cache
 
     def summarize(self, transcript: list[dict[str, Any]], emotions: list[dict[str, Any]], preset_key: PromptStyle) -> str:
         annotated_sentences = self.annotate_by_matching(transcript, emotions)
+        return self.summarize_annotated(annotated_sentences, preset_key)
+
+    def summarize_many(
+            self,
+            transcript: list[dict[str, Any]],
+            emotions: list[dict[str, Any]],
+            preset_keys: list[PromptStyle],
+    ) -> dict[PromptStyle, str]:
+        """
+        Summarize one session in several styles. The transcript is annotated once, the map step
+        of a long session runs once for all styles, and the per-style requests run concurrently;
+        the shared rate limiter keeps them within quota.
+        """
+        annotated_sentences = self.annotate_by_matching(transcript, emotions)
+        preset_keys = list(dict.fromkeys(preset_keys))
+
+        # Computed by the first style that needs it (styles served from the cache never do)
+        notes_lock = threading.Lock()
+        shared_notes: list[list[str]] = []
+
+        def map_notes() -> list[str]:
+            with notes_lock:
+                if not shared_notes:
+                    shared_notes.append(self._map_notes(annotated_sentences))
+                return shared_notes[0]
+
+        with ThreadPoolExecutor(max_workers=max(1, len(preset_keys))) as executor:
+            futures = {
+                key: executor.submit(
+                    contextvars.copy_context().run, self.summarize_annotated, annotated_sentences, key, map_notes
+                )
+                for key in preset_keys
+            }
+            return {key: future.result() for key, future in futures.items()}
+
+    def summarize_annotated(
+            self,
+            annotated_sentences: list[dict[str, Any]],
+            preset_key: PromptStyle,
+            map_notes: Optional[Callable[[], list[str]]] = None,
+    ) -> str:
+        descriptive_lines = self.build_lines(annotated_sentences, preset_key)
+        system_prompt, user_prompt = self.build_prompts(preset_key, descriptive_lines)
+
+        cache = self._cache()
+        cache_key = self._cache_key(preset_key, system_prompt, user_prompt)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                print(f"♻️ Summary cache hit ({preset_key.value}).")
+                return cached
+
+        # ✂️ Long sessions don't fit one prompt: summarize chunks, then reduce with the preset
+        if estimate_tokens(system_prompt) + estimate_tokens(user_prompt) > self.token_budget:
+            notes = map_notes() if map_notes is not None else self._map_notes(annotated_sentences)
+            system_prompt, user_prompt = self._reduce_prompts(notes, preset_key)
+
+        summary = self._complete(system_prompt, user_prompt, max_tokens=SUMMARY_MAX_TOKENS)
+
+        if cache is not None:
+            cache.put(cache_key, summary)
+
+        return summary
+
+    def stream_summary(
+            self,
+            transcript: list[dict[str, Any]],
+            emotions: list[dict[str, Any]],
+            preset_key: PromptStyle,
+    ) -> Iterator[str]:
+        """
+        Same as `summarize`, but yields the final summary text piece by piece as the model generates it.
+        For long sessions the map step still runs first; only the final (reduce) call is streamed.
+        """
+        annotated_sentences, system_prompt, user_prompt = self._prepare(transcript, emotions, preset_key)
+
+        cache = self._cache()
+        cache_key = self._cache_key(preset_key, system_prompt, user_prompt)
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                print(f"♻️ Summary cache hit ({preset_key.value}).")
+                yield cached
+                return
+
+        if estimate_tokens(system_prompt) + estimate_tokens(user_prompt) > self.token_budget:
+            system_prompt, user_prompt = self._reduce_prompts(self._map_notes(annotated_sentences), preset_key)
+
+        parts = []
+        stream = self._create(system_prompt, user_prompt, max_tokens=SUMMARY_MAX_TOKENS, stream=True)
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                parts.append(delta)
+                yield delta
+
+        summary = "".join(parts).strip()
+        if not summary:
+            raise ValueError("❌ GPT returned an empty summary.")
+
+        if cache is not None:
+            cache.put(cache_key, summary)
+
+    def _prepare(
+            self,
+            transcript: list[dict[str, Any]],
+            emotions: list[dict[str, Any]],
+            preset_key: PromptStyle,
+    ) -> tuple[list[dict[str, Any]], str, str]:
+        annotated_sentences = self.annotate_by_matching(transcript, emotions)
+        descriptive_lines = self.build_lines(annotated_sentences, preset_key)
+        system_prompt, user_prompt = self.build_prompts(preset_key, descriptive_lines)
+        return annotated_sentences, system_prompt, user_prompt
+
+    def _cache(self):
+        return get_summary_cache() if self.use_cache else None
+
+    def _cache_key(self, preset_key: PromptStyle, system_prompt: str, user_prompt: str) -> str:
+        return make_cache_key(
+            preset=preset_key.value,
+            system=system_prompt,
+            prompt=user_prompt,
+            deployment=AZURE_OPENAI_DEPLOYMENT,
+            temperature=self.temperature,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            # Map-reduce output also depends on how the transcript is split
+            token_budget=self.token_budget,
+            chunk_tokens=self.chunk_tokens,
+            map_max_tokens=SUMMARY_MAP_MAX_TOKENS,
+        )
 
+    def build_lines(self, annotated_sentences: list[dict[str, Any]], preset_key: PromptStyle) -> list[str]:
+        """Turn annotated transcript lines into the per-style prompt lines, keeping only strong emotions."""
         descriptive_lines = []
         for entry in annotated_sentences:
             emotion_list = entry.get("emotions", [])
@@ -45,7 +213,10 @@ class Summarizer:
             else:
                 descriptive_lines.append(f'{entry["speaker"]} said: "{entry["text"]}" — emotion detected: **{top["label"].lower()}** ({round(top["score"]*100, 2)}%)')
 
-        prompt_text = "\n".join(descriptive_lines)
+        return descriptive_lines
+
+    def build_prompts(self, preset_key: PromptStyle, lines: list[str]) -> tuple[str, str]:
+        prompt_text = "\n".join(lines)
         prompt_data = PROMPT_PRESETS.get(preset_key.value)
 
         if prompt_data is None:
@@ -59,25 +230,68 @@ class Summarizer:
             system_prompt = prompt_data
             user_prompt = prompt_text
 
-        retries = 3
-        for attempt in range(retries):
-            try:
-                response = self.client.chat.completions.create(
-                    model=AZURE_OPENAI_DEPLOYMENT,
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.7,
-                    max_tokens=1500
-                )
-                break
-            except RateLimitError:
-                print(f"⚠️ Rate limit hit (attempt {attempt+1}/{retries}). Waiting 60 seconds...")
-                time.sleep(60)
-        else:
-            raise RuntimeError("❌ Failed after 3 retries due to rate limiting.")
+        return system_prompt, user_prompt
+
+    def _map_notes(self, annotated_sentences: list[dict[str, Any]]) -> list[str]:
+        """
+        Condense a long session chunk by chunk until the notes fit the token budget next to
+        any preset's prompt. The notes do not depend on the style, so every style reduces them.
+        """
+        notes = self.build_lines(annotated_sentences, MAP_LINE_STYLE)
+        # Leave room in each map prompt for the instructions around the lines
+        chunk_budget = min(self.chunk_tokens, self.token_budget - estimate_tokens(CHUNK_SUMMARY_PROMPT["format"]))
+        notes_budget = self.token_budget - self._preset_overhead()
+        notes_tokens = estimate_tokens("\n".join(notes))
+
+        # Each round should shrink the material; repeat until the notes fit
+        for round_number in range(1, max(1, SUMMARY_MAX_MAP_ROUNDS) + 1):
+            chunks = chunk_lines(notes, chunk_budget)
+            print(f"✂️ Map-reduce summarization: {len(notes)} lines → {len(chunks)} chunk(s)")
+            previous_notes, notes = notes, self._map_chunks(chunks)
+
+            previous_tokens, notes_tokens = notes_tokens, estimate_tokens("\n".join([REDUCE_NOTES_HEADER] + notes))
+            # A chunk budget close to SUMMARY_MAP_MAX_TOKENS yields notes as long as their input;
+            # the round added nothing, so reduce the shorter notes it started from
+            if notes_tokens >= previous_tokens:
+                print(f"⚠️ Map round {round_number} did not shrink the notes ({notes_tokens} tokens); "
+                      f"reducing the previous ones ({previous_tokens} tokens)")
+                return previous_notes
 
+            if notes_tokens <= notes_budget or len(chunks) == 1:
+                return notes
+
+        print(f"⚠️ Notes still exceed the token budget after {SUMMARY_MAX_MAP_ROUNDS} map round(s); reducing them as they are")
+        return notes
+
+    def _reduce_prompts(self, notes: list[str], preset_key: PromptStyle) -> tuple[str, str]:
+        return self.build_prompts(preset_key, [REDUCE_NOTES_HEADER] + notes)
+
+    def _preset_overhead(self) -> int:
+        """Tokens the largest preset adds around the lines it is given."""
+        overheads = []
+        for style in PromptStyle:
+            if style.value in PROMPT_PRESETS:
+                system_prompt, user_prompt = self.build_prompts(style, [])
+                overheads.append(estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+        return max(overheads, default=0)
+
+    def _map_chunks(self, chunks: list[list[str]]) -> list[str]:
+        def summarize_chunk(index: int, chunk: list[str]) -> str:
+            user_prompt = CHUNK_SUMMARY_PROMPT["format"].format(
+                part=index + 1, total=len(chunks), lines="\n".join(chunk)
+            )
+            partial = self._complete(CHUNK_SUMMARY_PROMPT["system"], user_prompt, max_tokens=SUMMARY_MAP_MAX_TOKENS)
+            return f"Part {index + 1}/{len(chunks)}:\n{partial}"
+
+        with ThreadPoolExecutor(max_workers=self.map_concurrency) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, summarize_chunk, index, chunk)
+                for index, chunk in enumerate(chunks)
+            ]
+            return [future.result() for future in futures]
+
+    def _complete(self, system_prompt: str, user_prompt: str, max_tokens: int) -> str:
+        response = self._create(system_prompt, user_prompt, max_tokens=max_tokens)
         summary = response.choices[0].message.content.strip()
 
         if not summary:
@@ -85,6 +299,47 @@ class Summarizer:
 
         return summary
 
+    def _create(self, system_prompt: str, user_prompt: str, max_tokens: int, stream: bool = False) -> Any:
+        limiter = self.rate_limiter or get_rate_limiter()
+        # Azure counts max_tokens against the TPM quota up front
+        request_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens
+
+        token = current_token()
+
+        retries = SUMMARY_MAX_RETRIES
+        for attempt in range(retries):
+            check_cancelled()
+            with call_span("openai", "rate_limit_wait"):
+                limiter.acquire(request_tokens)
+            check_cancelled()
+
+            # The request may not outlive the session's deadline
+            remaining = token.remaining() if token is not None else None
+            request_options = {"timeout": max(remaining, 1.0)} if remaining is not None else {}
+            try:
+                with call_span("openai", "chat_completion", max_tokens=max_tokens):
+                    raw_response = self.client.chat.completions.with_raw_response.create(
+                        model=AZURE_OPENAI_DEPLOYMENT,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_prompt}
+                        ],
+                        temperature=self.temperature,
+                        max_tokens=max_tokens,
+                        stream=stream,
+                        **request_options
+                    )
+                limiter.update_from_headers(raw_response.headers)
+                return raw_response.parse()
+            except APITimeoutError:
+                check_cancelled()  # report a deadline as such, not as an API error
+                raise
+            except RateLimitError as e:
+                delay = limiter.penalize(e.response.headers if e.response is not None else None, fallback_sec=min(60, 5 * 2 ** attempt))
+                print(f"⚠️ Rate limit hit (attempt {attempt+1}/{retries}). Pausing summary requests for {delay:.1f}s...")
+
+        raise RuntimeError(f"❌ Failed after {retries} retries due to rate limiting.")
+
     def annotate_by_matching(
             self,
             transcript: list[dict[str, Any]],
@@ -92,18 +347,10 @@ class Summarizer:
             time_threshold: float = 0.05,
             similarity_threshold: float = 0.95
     ) -> list[dict[str, Any]]:
+        aligner = EmotionAligner(emotions, time_threshold=time_threshold, similarity_threshold=similarity_threshold)
         annotated = []
 
-        for t in transcript:
-            match = None
-            for e in emotions:
-                time_match = abs(float(t["start_time"]) - float(e["start_time"])) <= time_threshold
-                text_match = SequenceMatcher(None, t["text"].strip(), e["text"].strip()).ratio() >= similarity_threshold
-
-                if time_match and text_match:
-                    match = e
-                    break
-
+        for t, match in zip(transcript, aligner.align(transcript)):
             annotated.append({
                 "speaker": t.get("speaker", "?"),
                 "text": t.get("text", ""),
@@ -0,0 +1,214 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+from app.core.config import (
+    SPEECH_KEY,
+    TRANSCRIPTION_POLL_MIN_INTERVAL_SEC,
+    TRANSCRIPTION_POLL_MAX_INTERVAL_SEC,
+    TRANSCRIPTION_POLL_BACKOFF,
+    TRANSCRIPTION_POLL_MAX_CONCURRENT_REQUESTS,
+)
+from app.core.metrics import call_span
+from app.utils.utils import parse_retry_after
+
+TERMINAL_STATUSES = {"Succeeded", "Failed"}
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class TranscriptionPollError(RuntimeError):
+    pass
+
+
+@dataclass
+class _PollJob:
+    url: str
+    future: Future
+    interval: float
+    next_poll_at: float
+    in_flight: bool = False
+
+
+class TranscriptionPoller:
+    """
+    Tracks every in-flight Azure Speech transcription job on a single asyncio loop.
+
+    Each job is polled with an adaptive interval that starts at `min_interval` and grows by
+    `backoff` up to `max_interval`; a `Retry-After` header from the Speech API always wins.
+    Callers get a `concurrent.futures.Future` that resolves with the final job payload;
+    cancelling that future stops the polling of its job.
+    """
+
+    def __init__(
+            self,
+            min_interval: float = TRANSCRIPTION_POLL_MIN_INTERVAL_SEC,
+            max_interval: float = TRANSCRIPTION_POLL_MAX_INTERVAL_SEC,
+            backoff: float = TRANSCRIPTION_POLL_BACKOFF,
+            max_concurrent_requests: int = TRANSCRIPTION_POLL_MAX_CONCURRENT_REQUESTS,
+            http=requests,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_concurrent_requests = max_concurrent_requests
+        self.http = http  # anything with a requests-style get(); the benchmark passes a fake
+
+        self._jobs: list[_PollJob] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._started = threading.Event()
+        self._start_lock = threading.Lock()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._jobs)
+
+    # === Public API ===
+
+    def submit(self, transcription_url: str) -> Future:
+        """Start tracking a transcription job and return a future for its final payload."""
+        self._ensure_started()
+        future = Future()
+        self._loop.call_soon_threadsafe(self._add_job, transcription_url, future)
+        return future
+
+    async def wait(self, transcription_url: str) -> dict:
+        """Async variant of `submit(...).result()` for use inside async code."""
+        return await asyncio.wrap_future(self.submit(transcription_url))
+
+    # === Event loop ===
+
+    def _ensure_started(self):
+        if self._started.is_set():
+            return
+        with self._start_lock:
+            if self._started.is_set():
+                return
+            thread = threading.Thread(target=self._run_loop, name="transcription-poller", daemon=True)
+            thread.start()
+            self._started.wait()
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wakeup = asyncio.Event()
+        self._started.set()
+        self._loop.run_until_complete(self._poll_forever())
+
+    def _add_job(self, url: str, future: Future):
+        now = time.monotonic()
+        self._jobs.append(_PollJob(url=url, future=future, interval=self.min_interval, next_poll_at=now))
+        # A caller giving up (cancel, deadline) drops the job on the next loop pass
+        future.add_done_callback(lambda _: self._loop.call_soon_threadsafe(self._wakeup.set))
+        self._wakeup.set()
+
+    async def _poll_forever(self):
+        semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+
+        while True:
+            # Drop jobs whose callers gave up on them
+            self._jobs = [job for job in self._jobs if not job.future.done()]
+
+            now = time.monotonic()
+            for job in self._jobs:
+                if not job.in_flight and job.next_poll_at <= now:
+                    job.in_flight = True
+                    asyncio.ensure_future(self._poll_job(job, semaphore))
+
+            pending = [job.next_poll_at for job in self._jobs if not job.in_flight]
+            timeout = max(0.0, min(pending) - time.monotonic()) if pending else None
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _poll_job(self, job: _PollJob, semaphore: asyncio.Semaphore):
+        headers = {"Ocp-Apim-Subscription-Key": SPEECH_KEY}
+        retry_after = None
+
+        try:
+            async with semaphore:
+                with call_span("speech", "poll_status"):
+                    response = await self._loop.run_in_executor(
+                        None, lambda: self.http.get(job.url, headers=headers, timeout=30)
+                    )
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            if response.status_code in RETRYABLE_STATUS_CODES:
+                print(f"⚠️ Speech API throttled polling ({response.status_code}), retrying in {retry_after or job.interval}s")
+            elif 400 <= response.status_code < 500:
+                # Bad key, expired or deleted job: polling again cannot help
+                self._resolve(job, error=TranscriptionPollError(
+                    f"Polling {job.url} failed with {response.status_code}: {response.text[:200]}"
+                ))
+                return
+            else:
+                try:
+                    data = response.json()
+                except Exception as e:
+                    print("❌ Failed to parse JSON:", response.text)
+                    self._resolve(job, error=e)
+                    return
+
+                status = data.get("status")
+                print("⏳ Status:", status)
+
+                if status in TERMINAL_STATUSES:
+                    print("📦 Final status data:", data)
+                    self._resolve(job, result=data)
+                    return
+
+        except requests.RequestException as e:
+            print(f"⚠️ Polling request failed, will retry: {e}")
+
+        except Exception as e:
+            print(f"❌ Polling failed: {e}")
+            self._resolve(job, error=e)
+            return
+
+        finally:
+            job.in_flight = False
+
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            # Small jitter keeps sessions that started together from polling in lockstep
+            delay = job.interval * random.uniform(0.9, 1.1)
+            job.interval = min(job.interval * self.backoff, self.max_interval)
+
+        job.next_poll_at = time.monotonic() + delay
+        self._wakeup.set()
+
+    def _resolve(self, job: _PollJob, result: Optional[dict] = None, error: Optional[BaseException] = None):
+        if job in self._jobs:
+            self._jobs.remove(job)
+        if job.future.done():
+            return
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(result)
+        self._wakeup.set()
+
+
+_poller: Optional[TranscriptionPoller] = None
+_poller_lock = threading.Lock()
+
+
+def get_transcription_poller() -> TranscriptionPoller:
+    """Return the process-wide poller, creating it on first use."""
+    global _poller
+    if _poller is None:
+        with _poller_lock:
+            if _poller is None:
+                _poller = TranscriptionPoller()
+    return _poller
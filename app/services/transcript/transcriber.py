@@ -1,47 +1,35 @@
 from typing import Any, Optional
 
 import requests
-import time
+from app.core.cancellation import Cancelled, check_cancelled, wait_result
 from app.core.config import SPEECH_KEY, REGION
-from app.storage.azure.blob.azure_blob_service import AzureBlobService
+from app.core.metrics import call_span, timed
+from app.services.session_context import SessionContext
+from app.services.transcript.poller import TranscriptionPoller, get_transcription_poller
+from app.storage.azure.blob.azure_blob_service import AzureBlobService, get_azure_blob_service
 
 class Transcriber:
-    def __init__(self):
-        self._number_of_participants = None
-        self._participants = None
-        self._language = None
-        self._duration_sec = None
-        self._duration_ms = None
-        self._phrases = None
-        self._azure = AzureBlobService()
-
-    @property
-    def transcript_language(self) -> str | None:
-        return self._language
-
-    @property
-    def duration_seconds(self) -> float | None:
-        return self._duration_sec
-
-    @property
-    def duration_milliseconds(self) -> float | None:
-        return self._duration_ms
-
-    @property
-    def recognized_phrases(self) -> list[dict] | None:
-        return self._phrases
-
-    @property
-    def participants(self) -> list:
-        return sorted({f"Speaker {p.get('speaker', '?')}" for p in self._phrases})
-
-    @property
-    def number_of_participants(self) -> int:
-        return len(self.participants)
-
-    def transcribe(self, audio_path: str) -> list[dict[str, Any]]:
+    """
+    Stateless wrapper around the Azure Speech batch transcription API.
+
+    Per-session results (phrases, duration, language) are written to the
+    `SessionContext` passed to `transcribe`, never kept on the instance.
+    """
+
+    def __init__(
+            self,
+            azure: Optional[AzureBlobService] = None,
+            http=requests,
+            poller: Optional[TranscriptionPoller] = None,
+    ):
+        self._azure = azure or get_azure_blob_service()
+        self._http = http
+        self._poller = poller
+
+    def transcribe(self, audio_path: str, ctx: Optional[SessionContext] = None) -> list[dict[str, Any]]:
         """
-        Transcribes the given blob audio file and returns the new transcript blob path.
+        Transcribes the given blob audio file and returns the structured transcript lines.
+        When a session context is given, the raw phrases, duration and language are stored on it.
         """
         # 🔑 Generate a secure SAS URL for the Azure Speech API
         sas_url = self._azure.generate_sas_url(audio_path)
@@ -50,22 +38,33 @@ class Transcriber:
         job_data = self.create_transcription_job(sas_url)
         print("📦 job_data:", job_data)
 
-        result_data = self.poll_until_complete(job_data)
+        try:
+            result_data = self.poll_until_complete(job_data)
+        except Cancelled:
+            # Stop paying for a transcription nobody will read
+            self.delete_transcription_job(job_data.get("self"))
+            raise
         if result_data.get("status") != "Succeeded":
             raise Exception("Transcription job failed.")
 
         # 📥 Fetch result
+        check_cancelled()
         files_url = result_data["links"]["files"]
         transcription_json = self.fetch_transcription_file(files_url)
         print("📥 Result JSON:", transcription_json)
         if not transcription_json:
             raise Exception("No transcription result returned.")
 
-        self._phrases = transcription_json.get("recognizedPhrases", [])
-        self._duration_ms = transcription_json.get("durationMilliseconds")
-        self._duration_sec = round(self._duration_ms / 1000, 2) if self._duration_ms else None
-        self._language = transcription_json.get("locale")
-        return self.format_transcript_as_json()
+        phrases = transcription_json.get("recognizedPhrases", [])
+        transcript = self.format_transcript_as_json(phrases)
+
+        if ctx is not None:
+            ctx.phrases = phrases
+            ctx.duration_ms = transcription_json.get("durationMilliseconds")
+            ctx.language = transcription_json.get("locale")
+            ctx.transcript = transcript
+
+        return transcript
 
     def create_transcription_job(self, sas_url: str, name="MyTranscription"):
         url = f"https://{REGION}.api.cognitive.microsoft.com/speechtotext/v3.1/transcriptions"
@@ -89,53 +88,51 @@ class Transcriber:
             }
         }
 
-        response = requests.post(url, headers=headers, json=body)
+        with call_span("speech", "create_job"):
+            response = self._http.post(url, headers=headers, json=body)
         return response.json()
 
     def poll_until_complete(self, job_data: dict):
-        headers = {"Ocp-Apim-Subscription-Key": SPEECH_KEY}
         transcription_url = job_data.get("self")
 
         if not transcription_url:
             raise ValueError("❌ No transcription URL returned in job_data")
 
-        while True:
-            response = requests.get(transcription_url, headers=headers)
-
-            try:
-                data = response.json()
-            except Exception:
-                print("❌ Failed to parse JSON:", response.text)
-                raise
-
-            status = data.get("status")
-            print("⏳ Status:", status)
-
-            if status in ["Succeeded", "Failed"]:
-                print("📦 Final status data:", data)
-                return data
-
-            time.sleep(5)
+        # ⏳ Shared poller tracks all in-flight jobs with adaptive backoff; the wait ends early
+        # when the session is cancelled or reaches its deadline
+        with call_span("speech", "wait_for_job"):
+            return wait_result((self._poller or get_transcription_poller()).submit(transcription_url))
 
+    def delete_transcription_job(self, transcription_url: Optional[str]):
+        if not transcription_url:
+            return
+        try:
+            with call_span("speech", "delete_job"):
+                self._http.delete(transcription_url, headers={"Ocp-Apim-Subscription-Key": SPEECH_KEY}, timeout=30)
+            print("🗑️ Deleted cancelled transcription job.")
+        except Exception as e:
+            print(f"⚠️ Failed to delete transcription job: {e}")
+
+    @timed("speech", "fetch_result")
     def fetch_transcription_file(self, files_url: str):
         headers = {"Ocp-Apim-Subscription-Key": SPEECH_KEY}
-        response = requests.get(files_url, headers=headers)
+        response = self._http.get(files_url, headers=headers)
         files = response.json().get("values", [])
         for file in files:
             if file["kind"] == "Transcription":
                 content_url = file["links"]["contentUrl"]
-                return requests.get(content_url).json()
+                return self._http.get(content_url).json()
         return None
 
-    def format_transcript_as_text(self) -> str:
+    def format_transcript_as_text(self, phrases: list[dict]) -> str:
         lines = []
-        for phrase in self._phrases:
+        for phrase in phrases:
             speaker = phrase.get("speaker", "?")
             text = phrase.get("nBest", [{}])[0].get("display", "")
             lines.append(f"Speaker {speaker}: {text}")
         return "\n".join(lines)
 
-    def format_transcript_as_json(self) -> list[dict]:
+    def format_transcript_as_json(self, phrases: list[dict]) -> list[dict]:
         """
         Convert Azure transcription result into a list of structured transcript lines.
 
@@ -147,7 +144,7 @@ class Transcriber:
         """
         lines = []
 
-        for phrase in self._phrases:
+        for phrase in phrases:
             speaker = phrase.get("speaker", "?")
             text = phrase.get("nBest", [{}])[0].get("display", "")
 
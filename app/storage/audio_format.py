@@ -0,0 +1,88 @@
+"""
+audio_format.py
+
+Identifies an uploaded audio file from its first bytes, without decoding it.
+
+Only the container header is read: the RIFF chunks up to `fmt ` for WAV, the magic bytes
+for everything else. A 16-bit PCM mono WAV at SAMPLE_RATE is what the Speech API is given
+anyway, so such uploads are stored as they are instead of being transcoded.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import IO, Optional
+
+from app.core.config import SAMPLE_RATE
+
+HEADER_BYTES = 64 * 1024  # enough for the fmt chunk behind the odd LIST/JUNK chunk
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+@dataclass(frozen=True)
+class AudioFormat:
+    container: str  # wav, mp3, ogg, flac, mp4, webm or unknown
+    codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[int] = None
+    bits_per_sample: Optional[int] = None
+
+    @property
+    def speech_ready(self) -> bool:
+        """16-bit PCM mono WAV at SAMPLE_RATE: nothing to convert."""
+        return (
+            self.container == "wav"
+            and self.codec == "pcm"
+            and self.sample_rate == SAMPLE_RATE
+            and self.channels == 1
+            and self.bits_per_sample == 16
+        )
+
+    def describe(self) -> str:
+        if self.sample_rate is None:
+            return self.container
+        return f"{self.container}/{self.codec} {self.sample_rate} Hz, {self.channels} ch, {self.bits_per_sample}-bit"
+
+
+def sniff(stream: IO[bytes]) -> AudioFormat:
+    """Identify the audio in a seekable stream; the stream is left at its start position."""
+    start = stream.tell()
+    try:
+        return sniff_bytes(stream.read(HEADER_BYTES))
+    finally:
+        stream.seek(start)
+
+
+def sniff_bytes(header: bytes) -> AudioFormat:
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return _sniff_wav(header)
+    if header[:4] == b"fLaC":
+        return AudioFormat("flac", "flac")
+    if header[:4] == b"OggS":
+        return AudioFormat("ogg")
+    if header[4:8] == b"ftyp":
+        return AudioFormat("mp4")
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return AudioFormat("webm")
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return AudioFormat("mp3", "mp3")
+    return AudioFormat("unknown")
+
+
+def _sniff_wav(header: bytes) -> AudioFormat:
+    offset = 12
+    while offset + 8 <= len(header):
+        chunk_id, size = struct.unpack_from("<4sI", header, offset)
+        body = offset + 8
+        if chunk_id == b"fmt ":
+            if size < 16 or body + 16 > len(header):
+                break
+            tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", header, body)
+            if tag == WAVE_FORMAT_EXTENSIBLE and size >= 40 and body + 26 <= len(header):
+                # The real format code leads the SubFormat GUID
+                tag = struct.unpack_from("<H", header, body + 24)[0]
+            codec = "pcm" if tag == WAVE_FORMAT_PCM else f"0x{tag:04x}"
+            return AudioFormat("wav", codec, sample_rate, channels, bits)
+        offset = body + size + (size & 1)  # chunks are word-aligned
+    return AudioFormat("wav")
@@ -1,13 +1,14 @@
-from azure.storage.blob import BlobClient, BlobServiceClient
+from azure.storage.blob import BlobClient
 
 from app.core.config import AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from app.storage.azure.blob_client import get_blob_service_client
 
 class AzureDeleter:
 
     def __init__(self):
         self.connection_string = AZURE_STORAGE_CONNECTION_STRING
         self.container_name = AZURE_CONTAINER_NAME
-        self.client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
+        self.client = get_blob_service_client()
         self.container = self.client.get_container_client(AZURE_CONTAINER_NAME)
 
     def delete_blob_from_url(self, url: str):
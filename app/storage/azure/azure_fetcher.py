@@ -1,28 +1,35 @@
-from datetime import datetime, timedelta
+from datetime import datetime
 from azure.storage.blob import (
-    BlobServiceClient,
     generate_blob_sas,
     BlobSasPermissions,
 )
-from app.core.config import AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from app.core.config import AZURE_CONTAINER_NAME, SAS_TTL_MIN
+from app.storage.azure.blob_client import get_account_key, get_blob_service_client
+from app.storage.azure.sas_cache import SasUrlCache
 
 
 class AzureFetcher:
     def __init__(self):
-        self.client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
+        self.client = get_blob_service_client()
         self.container_name = AZURE_CONTAINER_NAME
         self.container = self.client.get_container_client(self.container_name)
+        self.sas_urls = SasUrlCache(
+            sign=self._sign,
+            base_url=f"https://{self.client.account_name}.blob.core.windows.net/{self.container_name}",
+        )
+
+    def generate_sas_url(self, blob_name: str, expiry_minutes: int = SAS_TTL_MIN) -> str:
+        return self.sas_urls.get(blob_name, "r", expiry_minutes)
 
-    def generate_sas_url(self, blob_name: str, expiry_minutes: int = 60) -> str:
-        sas_token = generate_blob_sas(
+    def _sign(self, blob_name: str, permission: str, expiry: datetime) -> str:
+        return generate_blob_sas(
             account_name=self.client.account_name,
             container_name=self.container_name,
             blob_name=blob_name,
-            account_key=self._get_account_key(),
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(minutes=expiry_minutes)
+            account_key=get_account_key(),
+            permission=BlobSasPermissions.from_string(permission),
+            expiry=expiry
         )
-        return f"https://{self.client.account_name}.blob.core.windows.net/{self.container_name}/{blob_name}?{sas_token}"
 
     def blob_exists(self, blob_name: str) -> bool:
         blob_client = self.container.get_blob_client(blob_name)
@@ -32,10 +39,3 @@ class AzureFetcher:
         except Exception as e:
             print(f"⚠️ Unexpected error checking blob existence: {e}")
             return False
-
-    def _get_account_key(self) -> str:
-        # Internal method to extract account key from the connection string
-        for segment in AZURE_STORAGE_CONNECTION_STRING.split(";"):
-            if segment.startswith("AccountKey="):
-                return segment.replace("AccountKey=", "")
-        raise ValueError("AccountKey not found in AZURE_STORAGE_CONNECTION_STRING")
\ No newline at end of file
@@ -0,0 +1,161 @@
+import base64
+import struct
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO
+
+from azure.storage.blob import BlobBlock, ContentSettings
+
+from app.core.config import (
+    AUDIO_UPLOAD_BLOCK_MB,
+    AUDIO_UPLOAD_CONCURRENCY,
+    FFMPEG_BINARY,
+    SAMPLE_RATE,
+)
+from app.core.metrics import timed
+
+READ_CHUNK_BYTES = 256 * 1024
+BYTES_PER_SAMPLE = 2  # 16-bit PCM
+
+
+def wav_header(data_bytes: int, sample_rate: int = SAMPLE_RATE, channels: int = 1) -> bytes:
+    """44-byte RIFF header for `data_bytes` of 16-bit little-endian PCM."""
+    byte_rate = sample_rate * channels * BYTES_PER_SAMPLE
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_bytes, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, byte_rate, channels * BYTES_PER_SAMPLE, 8 * BYTES_PER_SAMPLE,
+        b"data", data_bytes,
+    )
+
+
+class TranscodeError(RuntimeError):
+    pass
+
+
+class AzureStreamingUploader:
+    """
+    Streams an audio upload through ffmpeg into a 16 kHz mono PCM WAV block blob.
+
+    The source is piped into ffmpeg's stdin by a feeder thread, while the raw PCM coming out
+    of stdout is cut into fixed-size blocks that are staged to the blob concurrently. At most
+    `concurrency` blocks are in flight, so memory stays around (concurrency + 1) blocks
+    whatever the length of the recording. The WAV header is staged last (its sizes are only
+    known then) and committed as the first block.
+    """
+
+    def __init__(
+            self,
+            container,
+            ffmpeg: str = FFMPEG_BINARY,
+            block_bytes: int = int(AUDIO_UPLOAD_BLOCK_MB * 2**20),
+            concurrency: int = AUDIO_UPLOAD_CONCURRENCY,
+            sample_rate: int = SAMPLE_RATE,
+    ):
+        self.container = container
+        self.ffmpeg = ffmpeg
+        # Whole samples per block, so no sample straddles two blocks
+        self.block_bytes = max(BYTES_PER_SAMPLE, block_bytes - block_bytes % BYTES_PER_SAMPLE)
+        self.concurrency = max(1, concurrency)
+        self.sample_rate = sample_rate
+
+    def transcode_command(self) -> list[str]:
+        return [
+            self.ffmpeg, "-hide_banner", "-loglevel", "error",
+            "-i", "pipe:0",
+            "-vn", "-ac", "1", "-ar", str(self.sample_rate), "-acodec", "pcm_s16le", "-f", "s16le",
+            "pipe:1",
+        ]
+
+    @timed("audio", "stream_ingest")
+    def upload_wav(self, source: IO[bytes], blob_name: str) -> int:
+        """Transcode `source` and upload it as `blob_name`. Returns the number of PCM bytes stored."""
+        blob = self.container.get_blob_client(blob_name)
+        process = subprocess.Popen(
+            self.transcode_command(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        stderr_tail: deque[bytes] = deque(maxlen=20)
+        feeder_error: list[BaseException] = []
+        threads = [
+            threading.Thread(target=self._feed, args=(source, process.stdin, feeder_error), daemon=True),
+            threading.Thread(target=self._drain, args=(process.stderr, stderr_tail), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+
+        block_ids: list[str] = []
+        data_bytes = 0
+        in_flight: deque[Future] = deque()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="audio-block") as pool:
+                while True:
+                    block = process.stdout.read(self.block_bytes)
+                    if not block:
+                        break
+                    # Backpressure: wait for the oldest upload before reading further
+                    if len(in_flight) >= self.concurrency:
+                        in_flight.popleft().result()
+
+                    block_id = self._block_id(len(block_ids) + 1)
+                    block_ids.append(block_id)
+                    data_bytes += len(block)
+                    in_flight.append(pool.submit(blob.stage_block, block_id, block, length=len(block)))
+
+                while in_flight:
+                    in_flight.popleft().result()
+
+            returncode = process.wait()
+            for thread in threads:
+                thread.join()
+            if feeder_error:
+                raise TranscodeError(f"Reading the upload failed: {feeder_error[0]}")
+            if returncode != 0 or not data_bytes:
+                detail = b"".join(stderr_tail).decode("utf-8", "replace").strip()
+                raise TranscodeError(f"ffmpeg exited with {returncode}: {detail or 'no audio decoded'}")
+
+            header_id = self._block_id(0)
+            blob.stage_block(header_id, wav_header(data_bytes, self.sample_rate))
+            blob.commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in [header_id, *block_ids]],
+                content_settings=ContentSettings(content_type="audio/wav"),
+            )
+            print(f"🎧 Streamed {data_bytes / 2**20:.1f} MB of PCM to {blob_name} in {len(block_ids)} block(s)")
+            return data_bytes
+        finally:
+            # Uncommitted blocks of a failed ingest are discarded by the service
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+    @staticmethod
+    def _block_id(index: int) -> str:
+        # Every block id of a blob must have the same length
+        return base64.b64encode(f"{index:010d}".encode()).decode()
+
+    @staticmethod
+    def _feed(source: IO[bytes], stdin: IO[bytes], errors: list[BaseException]):
+        try:
+            while True:
+                chunk = source.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                stdin.write(chunk)
+        except BrokenPipeError:
+            pass  # ffmpeg stopped reading; its exit code tells why
+        except Exception as e:
+            errors.append(e)
+        finally:
+            try:
+                stdin.close()
+            except BrokenPipeError:
+                pass
+
+    @staticmethod
+    def _drain(stream: IO[bytes], tail: deque):
+        for line in iter(stream.readline, b""):
+            tail.append(line)
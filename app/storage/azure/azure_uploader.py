@@ -1,14 +1,23 @@
 from pathlib import Path
-from azure.storage.blob import BlobServiceClient, ContentSettings
+from typing import IO, Optional
+from azure.storage.blob import ContainerClient, ContentSettings
 from pydub import AudioSegment
 
-from app.core.config import AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from app.core.config import SAMPLE_RATE, SAS_BLOB_CACHE_CONTROL
+from app.core.metrics import timed
+from app.storage.azure.azure_streaming_uploader import AzureStreamingUploader
+from app.storage.azure.blob_client import get_container_client
 
 class AzureUploader:
-    def __init__(self):
-        self.client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-        self.container = self.client.get_container_client(AZURE_CONTAINER_NAME)
+    def __init__(self, container: Optional[ContainerClient] = None):
+        self._container = container
 
+    @property
+    def container(self) -> ContainerClient:
+        # The shared, pooled client is only created when the first request needs it
+        return self._container or get_container_client()
+
+    @timed("blob", "upload")
     def upload_file(self, file_path: Path, blob_name: str):
         """Uploads a local file to Azure Blob Storage."""
         with open(file_path, "rb") as file:
@@ -19,10 +28,30 @@ class AzureUploader:
                 content_settings=ContentSettings(content_type=self._guess_mime(file_path))
             )
 
+    @timed("blob", "upload")
+    def upload_bytes(self, data: bytes | IO[bytes], blob_name: str, content_type: str = "application/octet-stream"):
+        """Uploads in-memory content (bytes or a readable stream) to Azure Blob Storage."""
+        self.container.upload_blob(
+            name=blob_name,
+            data=data,
+            overwrite=True,
+            # An overwritten artifact keeps its (cached) SAS URL, so clients must revalidate
+            content_settings=ContentSettings(content_type=content_type, cache_control=SAS_BLOB_CACHE_CONTROL)
+        )
+
+    def upload_stream_as_wav(self, source: IO[bytes], blob_name: str) -> int:
+        """Transcodes a stream to 16 kHz mono WAV with ffmpeg while uploading it block by block."""
+        return AzureStreamingUploader(self.container).upload_wav(source, blob_name)
+
+    @timed("audio", "convert_to_wav")
     def convert_to_wav(self, file_path: Path) -> Path:
-        """Converts an audio file to .wav format using pydub and returns the new path."""
+        """
+        Converts an audio file to 16 kHz mono 16-bit WAV (what the Speech API needs, nothing more)
+        using pydub and returns the new path.
+        """
         wav_path = file_path.with_suffix(".wav")
         audio = AudioSegment.from_file(file_path)
+        audio = audio.set_channels(1).set_frame_rate(SAMPLE_RATE).set_sample_width(2)
         audio.export(wav_path, format="wav")
         return wav_path
 
@@ -0,0 +1,63 @@
+import asyncio
+from typing import Iterable
+
+from azure.core.exceptions import ResourceNotFoundError
+from azure.storage.blob import ContentSettings
+
+from app.core.config import SAS_BLOB_CACHE_CONTROL
+from app.core.metrics import call_span
+from app.storage.azure.blob_client import get_async_container_client
+
+
+class AsyncAzureBlobService:
+    """
+    `AzureBlobService` counterpart for async routes, on the shared `azure.storage.blob.aio`
+    client: blob I/O awaits instead of blocking the event loop.
+    """
+
+    @property
+    def container(self):
+        return get_async_container_client()
+
+    async def upload_bytes(self, data: bytes, blob_path: str, content_type: str = "application/octet-stream") -> str:
+        with call_span("blob", "upload"):
+            await self.container.upload_blob(
+                name=blob_path,
+                data=data,
+                overwrite=True,
+                content_settings=ContentSettings(content_type=content_type, cache_control=SAS_BLOB_CACHE_CONTROL),
+            )
+        return blob_path
+
+    async def download_blob(self, blob_name: str) -> bytes:
+        with call_span("blob", "download"):
+            stream = await self.container.get_blob_client(blob_name).download_blob()
+            return await stream.readall()
+
+    async def blob_exists(self, blob_name: str) -> bool:
+        with call_span("blob", "exists"):
+            return await self.container.get_blob_client(blob_name).exists()
+
+    async def list_blob_names(self, prefix: str) -> list[str]:
+        with call_span("blob", "list"):
+            return [blob.name async for blob in self.container.list_blobs(name_starts_with=prefix)]
+
+    async def delete_blob(self, blob_name: str):
+        try:
+            with call_span("blob", "delete"):
+                await self.container.get_blob_client(blob_name).delete_blob()
+        except ResourceNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Failed to delete blob '{blob_name}': {e}")
+
+    async def delete_blobs(self, blob_names: Iterable[str]):
+        """Delete several blobs concurrently over the shared connection pool."""
+        await asyncio.gather(*(self.delete_blob(name) for name in blob_names))
+
+
+_async_service = AsyncAzureBlobService()
+
+
+def get_async_azure_blob_service() -> AsyncAzureBlobService:
+    return _async_service
@@ -1,12 +1,21 @@
+from typing import Optional
 from urllib.parse import urlparse
-from azure.storage.blob import BlobServiceClient
-from app.core.config import AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from azure.storage.blob import BlobServiceClient, ContainerClient
+from app.core.config import AZURE_CONTAINER_NAME
+from app.storage.azure.blob_client import get_blob_service_client
 
 
 class AzureBlobDeleter:
-    def __init__(self):
-        self.client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
-        self.container = self.client.get_container_client(AZURE_CONTAINER_NAME)
+    def __init__(self, client: Optional[BlobServiceClient] = None):
+        self._client = client
+
+    @property
+    def client(self) -> BlobServiceClient:
+        return self._client or get_blob_service_client()
+
+    @property
+    def container(self) -> ContainerClient:
+        return self.client.get_container_client(AZURE_CONTAINER_NAME)
 
     def delete_blob(self, blob_name: str):
         """Delete a blob by name."""
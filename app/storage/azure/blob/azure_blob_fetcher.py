@@ -1,30 +1,64 @@
-from datetime import datetime, timedelta
+from datetime import datetime
+from typing import Optional
 from azure.storage.blob import (
     BlobServiceClient,
+    ContainerClient,
     generate_blob_sas,
     BlobSasPermissions,
 )
-from app.core.config import AZURE_STORAGE_CONNECTION_STRING, AZURE_CONTAINER_NAME
+from app.core.config import AZURE_CONTAINER_NAME, SAS_TTL_MIN
+from app.core.metrics import timed
+from app.storage.azure.blob_client import get_account_key, get_blob_service_client
+from app.storage.azure.sas_cache import SasUrlCache
 
 
 class AzureBlobFetcher:
-    def __init__(self):
-        self.client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
+    def __init__(self, client: Optional[BlobServiceClient] = None):
+        self._client = client
         self.container_name = AZURE_CONTAINER_NAME
-        self.container = self.client.get_container_client(self.container_name)
+        self._sas_urls: Optional[SasUrlCache] = None
 
-    def generate_sas_url(self, blob_name: str, expiry_minutes: int = 60) -> str:
-        """Generate a time-limited SAS URL for a blob."""
-        sas_token = generate_blob_sas(
+    @property
+    def client(self) -> BlobServiceClient:
+        return self._client or get_blob_service_client()
+
+    @property
+    def container(self) -> ContainerClient:
+        return self.client.get_container_client(self.container_name)
+
+    @property
+    def sas_urls(self) -> SasUrlCache:
+        if self._sas_urls is None:
+            base_url = f"https://{self.client.account_name}.blob.core.windows.net/{self.container_name}"
+            self._sas_urls = SasUrlCache(sign=self._sign, base_url=base_url)
+        return self._sas_urls
+
+    def generate_sas_url(self, blob_name: str, expiry_minutes: int = SAS_TTL_MIN, permission: str = "r") -> str:
+        """Time-limited SAS URL for a blob; the same URL is returned until it nears expiry."""
+        return self.sas_urls.get(blob_name, permission, expiry_minutes)
+
+    def _sign(self, blob_name: str, permission: str, expiry: datetime) -> str:
+        return generate_blob_sas(
             account_name=self.client.account_name,
             container_name=self.container_name,
             blob_name=blob_name,
-            account_key=self._get_account_key(),
-            permission=BlobSasPermissions(read=True),
-            expiry=datetime.utcnow() + timedelta(minutes=expiry_minutes),
+            account_key=get_account_key(),
+            permission=BlobSasPermissions.from_string(permission),
+            expiry=expiry,
         )
-        return f"https://{self.client.account_name}.blob.core.windows.net/{self.container_name}/{blob_name}?{sas_token}"
 
+    @timed("blob", "download")
+    def download_bytes(self, blob_name: str) -> bytes:
+        """Download a blob's content into memory."""
+        blob_client = self.container.get_blob_client(blob_name)
+        return blob_client.download_blob().readall()
+
+    @timed("blob", "list")
+    def list_blob_names(self, prefix: str) -> list[str]:
+        """Names of every blob starting with `prefix`."""
+        return [blob.name for blob in self.container.list_blobs(name_starts_with=prefix)]
+
+    @timed("blob", "exists")
     def blob_exists(self, blob_name: str) -> bool:
         """Check if a blob exists in Azure Blob Storage."""
         blob_client = self.container.get_blob_client(blob_name)
@@ -34,10 +68,3 @@ class AzureBlobFetcher:
         except Exception as e:
             print(f"⚠️ Unexpected error checking blob existence: {e}")
             return False
-
-    def _get_account_key(self) -> str:
-        """Extract the account key from the connection string."""
-        for segment in AZURE_STORAGE_CONNECTION_STRING.split(";"):
-            if segment.startswith("AccountKey="):
-                return segment.replace("AccountKey=", "")
-        raise ValueError("AccountKey not found in AZURE_STORAGE_CONNECTION_STRING")
\ No newline at end of file
@@ -1,4 +1,6 @@
+import threading
 from pathlib import Path
+from typing import IO, Optional
 from fastapi import UploadFile
 
 from app.storage.azure.blob.azure_blob_deleter import AzureBlobDeleter
@@ -6,6 +8,8 @@ from app.storage.azure.blob.azure_blob_fetcher import AzureBlobFetcher
 from app.storage.azure.blob.azure_blob_uploader import AzureBlobUploader
 
 class AzureBlobService:
+    """Blob operations of the app. All helpers share the process-wide client from blob_client.py."""
+
     def __init__(self):
         self.uploader = AzureBlobUploader()
         self.deleter = AzureBlobDeleter()
@@ -19,15 +23,27 @@ class AzureBlobService:
     def upload_file(self, tmp_path, blob_path):
         return self.uploader.uploadfile(tmp_path, blob_path)
 
+    def upload_bytes(self, data: bytes | IO[bytes], blob_path: str, content_type: str = "application/octet-stream") -> str:
+        """Upload bytes or a readable stream straight from memory."""
+        return self.uploader.upload_bytes(data, blob_path, content_type)
+
     # === Fetch ===
     def generate_sas_url(self, blob_name: str) -> str:
-        """Generate a temporary SAS URL for accessing a blob."""
+        """Temporary SAS URL for a blob, reused (byte-identical) until it nears expiry."""
         return self.fetcher.generate_sas_url(blob_name)
 
+    def download_blob(self, blob_name: str) -> bytes:
+        """Download a blob's content into memory."""
+        return self.fetcher.download_bytes(blob_name)
+
     def blob_exists(self, blob_name: str) -> bool:
         """Check if a blob exists (requires implementation in AzureFetcher)."""
         return self.fetcher.blob_exists(blob_name)
 
+    def list_blob_names(self, prefix: str) -> list[str]:
+        """Names of every blob starting with `prefix`."""
+        return self.fetcher.list_blob_names(prefix)
+
     # === Delete ===
     def delete_blob(self, blob_name: str):
         """Delete a blob by name."""
@@ -35,4 +51,18 @@ class AzureBlobService:
 
     def delete_blob_from_url(self, url: str):
         """Delete a blob using its full SAS URL."""
-        return self.deleter.delete_blob_from_url(url)
\ No newline at end of file
+        return self.deleter.delete_blob_from_url(url)
+
+
+_service: Optional[AzureBlobService] = None
+_service_lock = threading.Lock()
+
+
+def get_azure_blob_service() -> AzureBlobService:
+    """Return the process-wide blob service."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = AzureBlobService()
+    return _service
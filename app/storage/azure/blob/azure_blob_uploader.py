@@ -3,9 +3,13 @@
 import shutil
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import IO
 from fastapi import UploadFile
 
+from app.core.config import AUDIO_STREAMING_INGEST
 from app.storage.azure.azure_uploader import AzureUploader
+from app.storage.azure.azure_streaming_uploader import TranscodeError
+from app.storage.audio_format import sniff
 
 
 class AzureBlobUploader:
@@ -31,11 +35,44 @@ class AzureBlobUploader:
         self.uploader.upload_file(tmp_path, blob_path)
         return blob_path
 
+    def upload_bytes(self, data: bytes | IO[bytes], blob_path: str, content_type: str = "application/octet-stream") -> str:
+        """
+        Upload in-memory content (bytes or a readable stream) to Azure Blob Storage
+        without staging it on disk, and return the blob path.
+        """
+        self.uploader.upload_bytes(data, blob_path, content_type=content_type)
+        return blob_path
+
     def upload_uploadfile(self, file: UploadFile, blob_name: str, convert_to_wav: bool = True) -> None:
         """
-        Accepts a FastAPI UploadFile, saves to a temp file,
-        optionally converts to WAV, then uploads to Azure.
+        Accepts a FastAPI UploadFile, optionally converts it to WAV, then uploads to Azure.
+
+        Uploads that already are 16 kHz mono 16-bit PCM WAV (judged from the header alone)
+        are stored unchanged; everything else is converted to exactly that.
+
+        With AUDIO_STREAMING_INGEST the conversion streams through ffmpeg straight into the
+        blob, with bounded memory. Otherwise (or when ffmpeg can't decode the input from a
+        pipe, e.g. an MP4 whose index sits at the end) the file is saved to a temp file and
+        converted in full.
         """
+        if convert_to_wav and file.file.seekable():
+            audio_format = sniff(file.file)
+            if audio_format.speech_ready:
+                print(f"🎧 Upload is speech-ready ({audio_format.describe()}), storing it unchanged")
+                self.uploader.upload_bytes(file.file, blob_name, content_type="audio/wav")
+                return blob_name
+            print(f"🎧 Converting {audio_format.describe()} upload to 16 kHz mono PCM")
+
+        if convert_to_wav and AUDIO_STREAMING_INGEST:
+            try:
+                self.uploader.upload_stream_as_wav(file.file, blob_name)
+                return blob_name
+            except (TranscodeError, OSError) as e:
+                if not file.file.seekable():
+                    raise
+                print(f"⚠️ Streaming ingest failed, converting from a temp file instead: {e}")
+                file.file.seek(0)
+
         tmp_path = None
         converted_path = None
 
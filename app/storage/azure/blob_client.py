@@ -0,0 +1,109 @@
+"""
+blob_client.py
+
+The process-wide Azure Blob Storage clients.
+
+Every uploader, fetcher and deleter goes through the same lazily created `BlobServiceClient`,
+so a process keeps one HTTP connection pool (AZURE_BLOB_POOL_SIZE connections) instead of one
+per helper object. `get_async_blob_service_client` is the `azure.storage.blob.aio` counterpart
+for async routes; it lives on the event loop that first asks for it and is closed at shutdown.
+"""
+
+import threading
+from typing import Any, Optional
+
+from azure.storage.blob import BlobServiceClient, ContainerClient
+
+from app.core.config import (
+    AZURE_STORAGE_CONNECTION_STRING,
+    AZURE_CONTAINER_NAME,
+    AZURE_BLOB_POOL_SIZE,
+    AZURE_BLOB_CONNECTION_TIMEOUT_SEC,
+    AZURE_BLOB_READ_TIMEOUT_SEC,
+    AZURE_BLOB_RETRY_TOTAL,
+)
+
+_client: Optional[BlobServiceClient] = None
+_async_client = None
+_account_key: Optional[str] = None
+_lock = threading.Lock()
+
+
+def _client_options() -> dict[str, Any]:
+    return {
+        "connection_timeout": AZURE_BLOB_CONNECTION_TIMEOUT_SEC,
+        "read_timeout": AZURE_BLOB_READ_TIMEOUT_SEC,
+        "retry_total": AZURE_BLOB_RETRY_TOTAL,
+    }
+
+
+def get_blob_service_client() -> BlobServiceClient:
+    """Return the shared client, creating it (and its connection pool) on first use."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from azure.core.pipeline.transport import RequestsTransport
+
+                # requests keeps 10 connections per host by default; concurrent block uploads need more
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=AZURE_BLOB_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+
+                _client = BlobServiceClient.from_connection_string(
+                    AZURE_STORAGE_CONNECTION_STRING,
+                    transport=RequestsTransport(session=session, session_owner=False),
+                    **_client_options(),
+                )
+    return _client
+
+
+def get_container_client() -> ContainerClient:
+    return get_blob_service_client().get_container_client(AZURE_CONTAINER_NAME)
+
+
+def get_account_key() -> str:
+    """The AccountKey of AZURE_STORAGE_CONNECTION_STRING (used to sign SAS tokens), parsed once."""
+    global _account_key
+    if _account_key is None:
+        for segment in (AZURE_STORAGE_CONNECTION_STRING or "").split(";"):
+            if segment.startswith("AccountKey="):
+                _account_key = segment[len("AccountKey="):]
+                break
+        else:
+            raise ValueError("AccountKey not found in AZURE_STORAGE_CONNECTION_STRING")
+    return _account_key
+
+
+def get_async_blob_service_client():
+    """
+    Return the shared `azure.storage.blob.aio` client. Call it from async code: its aiohttp
+    session belongs to the running event loop.
+    """
+    global _async_client
+    if _async_client is None:
+        import aiohttp
+        from azure.core.pipeline.transport import AioHttpTransport
+        from azure.storage.blob.aio import BlobServiceClient as AsyncBlobServiceClient
+
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=AZURE_BLOB_POOL_SIZE))
+        _async_client = AsyncBlobServiceClient.from_connection_string(
+            AZURE_STORAGE_CONNECTION_STRING,
+            transport=AioHttpTransport(session=session, session_owner=True),
+            **_client_options(),
+        )
+    return _async_client
+
+
+def get_async_container_client():
+    return get_async_blob_service_client().get_container_client(AZURE_CONTAINER_NAME)
+
+
+async def close_async_blob_service_client():
+    global _async_client
+    if _async_client is not None:
+        client, _async_client = _async_client, None
+        await client.close()
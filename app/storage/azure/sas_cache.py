@@ -0,0 +1,80 @@
+"""
+sas_cache.py
+
+Read URLs (SAS) for blobs, signed once and reused until they are close to expiring.
+
+Expiries are rounded up to SAS_EXPIRY_BUCKET_MIN, so every request for a blob within the
+same window is signed with the same expiry and gets a byte-identical URL, which lets browsers
+and the frontend cache reuse what they already downloaded. A cached URL is handed out while
+at least SAS_REFRESH_MARGIN_MIN of it is left, then re-signed with the next window's expiry.
+An artifact overwritten in the meantime keeps its URL; uploads are stored with
+SAS_BLOB_CACHE_CONTROL so clients revalidate by ETag instead of trusting a stale copy.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from app.core.config import (
+    SAS_TTL_MIN,
+    SAS_EXPIRY_BUCKET_MIN,
+    SAS_REFRESH_MARGIN_MIN,
+    SAS_CACHE_SIZE,
+)
+
+# (blob_name, permission, expiry) -> SAS token
+Signer = Callable[[str, str, datetime], str]
+
+
+def bucketed_expiry(now: datetime, ttl: timedelta, bucket: timedelta) -> datetime:
+    """`now + ttl` rounded up to the next multiple of `bucket` since the epoch."""
+    target = now + ttl
+    epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+    remainder = (target - epoch) % bucket
+    return target if not remainder else target + (bucket - remainder)
+
+
+class SasUrlCache:
+    def __init__(
+            self,
+            sign: Signer,
+            base_url: str,
+            ttl_minutes: int = SAS_TTL_MIN,
+            bucket_minutes: int = SAS_EXPIRY_BUCKET_MIN,
+            refresh_margin_minutes: int = SAS_REFRESH_MARGIN_MIN,
+            max_entries: int = SAS_CACHE_SIZE,
+            clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+    ):
+        self.sign = sign
+        self.base_url = base_url.rstrip("/")
+        self.ttl = timedelta(minutes=ttl_minutes)
+        self.bucket = timedelta(minutes=max(1, bucket_minutes))
+        # A URL must outlive its margin when it is minted, or it would never be reused
+        self.refresh_margin = min(timedelta(minutes=refresh_margin_minutes), self.ttl / 2)
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries: OrderedDict[tuple[str, str, timedelta], tuple[datetime, str]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, blob_name: str, permission: str = "r", ttl_minutes: Optional[int] = None) -> str:
+        ttl = timedelta(minutes=ttl_minutes) if ttl_minutes is not None else self.ttl
+        key = (blob_name, permission, ttl)
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] - now >= min(self.refresh_margin, ttl / 2):
+                self._entries.move_to_end(key)
+                return entry[1]
+
+        expiry = bucketed_expiry(now, ttl, self.bucket)
+        url = f"{self.base_url}/{blob_name}?{self.sign(blob_name, permission, expiry)}"
+
+        with self._lock:
+            self._entries[key] = (expiry, url)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return url
+
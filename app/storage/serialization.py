@@ -0,0 +1,35 @@
+"""
+serialization.py
+
+Encoding of the JSON and text artifacts stored next to each session.
+
+Artifacts are encoded compactly, straight to bytes, and uploaded from memory. orjson is used
+when it is installed (several times faster on large transcripts); the stdlib encoder produces
+the same JSON otherwise.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback
+    orjson = None
+
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def dumps_json(content: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads_json(data: bytes | str) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def encode_text(content: str) -> bytes:
+    return content.encode("utf-8")
@@ -1,16 +1,18 @@
-import json
-from pathlib import Path
-from typing import Any
+import threading
+from typing import Any, Optional
 
 from fastapi import UploadFile
-from tempfile import NamedTemporaryFile
 
-from app.storage.azure.blob.azure_blob_service import AzureBlobService
+from app.core.config import SUMMARY_DEFAULT_STYLE
+from app.storage.azure.blob.azure_blob_service import AzureBlobService, get_azure_blob_service
+from app.storage.azure.blob.azure_blob_async_service import AsyncAzureBlobService, get_async_azure_blob_service
+from app.storage.serialization import JSON_CONTENT_TYPE, TEXT_CONTENT_TYPE, dumps_json, encode_text, loads_json
 
 
 class SessionStorage:
-    def __init__(self):
-        self.azure = AzureBlobService()
+    def __init__(self, azure: Optional[AzureBlobService] = None, azure_async: Optional[AsyncAzureBlobService] = None):
+        self.azure = azure or get_azure_blob_service()
+        self.azure_async = azure_async or get_async_azure_blob_service()
 
     # === Upload ===
 
@@ -22,31 +24,30 @@ class SessionStorage:
     def store_transcript(self, session_id: str, content:  list[dict[str, Any]]) -> str:
         return self._store_json(session_id, "transcript", content)
 
-    def store_summary(self, session_id: str, content: str) -> str:
-        return self._store_text(session_id, "summary", content)
+    def store_summary(self, session_id: str, content: str, style: Optional[str] = None) -> str:
+        return self._store_text(session_id, self._summary_name(style), content)
 
     def store_emotions(self, session_id: str, content: list[dict[str, Any]]) -> str:
         return self._store_json(session_id, "emotions", content)
 
+    def store_timings(self, session_id: str, timings: dict[str, Any]) -> str:
+        return self._store_json(session_id, "timings", timings)
+
+    def store_checkpoint(self, session_id: str, checkpoint: dict[str, Any]) -> str:
+        return self._store_json(session_id, "checkpoint", checkpoint)
+
+    # Artifacts are encoded straight to bytes and uploaded from memory, never staged on disk
+
     def _store_text(self, session_id: str, name: str, content: str) -> str:
         blob_path = f"{session_id}/{name}"
-        tmp_path = self._write_temp_file(content, suffix=".txt")
-        self.azure.upload_file(tmp_path, blob_path)
-        tmp_path.unlink(missing_ok=True)
+        self.azure.upload_bytes(encode_text(content), blob_path, content_type=TEXT_CONTENT_TYPE)
         return blob_path
 
     def _store_json(self, session_id: str, name: str, content: dict | list) -> str:
         blob_path = f"{session_id}/{name}"
-        tmp_path = self._write_temp_file(json.dumps(content, indent=2), suffix=".json")
-        self.azure.upload_file(tmp_path, blob_path)
-        tmp_path.unlink(missing_ok=True)
+        self.azure.upload_bytes(dumps_json(content), blob_path, content_type=JSON_CONTENT_TYPE)
         return blob_path
 
-    def _write_temp_file(self, content: str, suffix: str = ".tmp") -> Path:
-        with NamedTemporaryFile(delete=False, suffix=suffix, mode="w", encoding="utf-8") as tmp:
-            tmp.write(content)
-            return Path(tmp.name)
-
     # === Fetch ===
 
     def generate_sas_url(self, blob_path: str) -> str:
@@ -55,6 +56,32 @@ class SessionStorage:
     def blob_exists(self, blob_path: str) -> bool:
         return self.azure.blob_exists(blob_path)
 
+    def load_transcript(self, session_id: str) -> list[dict[str, Any]]:
+        return self._load_json(f"{session_id}/transcript")
+
+    def load_emotions(self, session_id: str) -> list[dict[str, Any]]:
+        return self._load_json(f"{session_id}/emotions")
+
+    def load_checkpoint(self, session_id: str) -> dict[str, Any]:
+        blob_path = f"{session_id}/checkpoint"
+        return self._load_json(blob_path) if self.blob_exists(blob_path) else {}
+
+    def load_summary(self, session_id: str, style: Optional[str] = None) -> str:
+        return self.azure.download_blob(self.summary_blob_path(session_id, style)).decode("utf-8")
+
+    def summary_blob_path(self, session_id: str, style: Optional[str] = None) -> str:
+        return f"{session_id}/{self._summary_name(style)}"
+
+    @staticmethod
+    def _summary_name(style: Optional[str]) -> str:
+        # The default style keeps the original "summary" blob; every other style gets its own blob
+        if not style or style == SUMMARY_DEFAULT_STYLE:
+            return "summary"
+        return f"summary_{style}"
+
+    def _load_json(self, blob_path: str) -> Any:
+        return loads_json(self.azure.download_blob(blob_path))
+
     # === Delete ===
 
     def delete_audio(self, session_id: str):
@@ -63,14 +90,47 @@ class SessionStorage:
     def delete_transcript(self, session_id: str):
         self.azure.delete_blob(f"{session_id}/transcript")
 
-    def delete_summary(self, session_id: str):
-        self.azure.delete_blob(f"{session_id}/summary")
+    def delete_summary(self, session_id: str, style: Optional[str] = None):
+        self.azure.delete_blob(self.summary_blob_path(session_id, style))
+
+    def delete_style_summaries(self, session_id: str, styles: list[str]):
+        for style in styles:
+            if style != SUMMARY_DEFAULT_STYLE:
+                self.delete_summary(session_id, style)
 
     def delete_emotions(self, session_id: str):
         self.azure.delete_blob(f"{session_id}/emotions")
 
+    def delete_checkpoint(self, session_id: str):
+        self.azure.delete_blob(f"{session_id}/checkpoint")
+
+    def delete_timings(self, session_id: str):
+        self.azure.delete_blob(f"{session_id}/timings")
+
+    @staticmethod
+    def session_prefix(session_id: str) -> str:
+        # Every artifact of a session lives under "<session_id>/", whatever its status or style
+        return f"{session_id}/"
+
+    async def delete_all_async(self, session_id: str):
+        """Delete every blob of a session concurrently without blocking the event loop (for async routes)."""
+        blob_paths = await self.azure_async.list_blob_names(self.session_prefix(session_id))
+        await self.azure_async.delete_blobs(blob_paths)
+
     def delete_all(self, session_id: str):
-        self.delete_audio(session_id)
-        self.delete_transcript(session_id)
-        self.delete_summary(session_id)
-        self.delete_emotions(session_id)
\ No newline at end of file
+        for blob_path in self.azure.list_blob_names(self.session_prefix(session_id)):
+            self.azure.delete_blob(blob_path)
+
+
+_storage: Optional[SessionStorage] = None
+_storage_lock = threading.Lock()
+
+
+def get_session_storage() -> SessionStorage:
+    """Return the process-wide session storage; endpoints and services share it (and its blob client)."""
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = SessionStorage()
+    return _storage
@@ -0,0 +1,70 @@
+import random
+from difflib import SequenceMatcher
+
+from app.services.summary.aligner import EmotionAligner
+
+
+def brute_force_match(t, emotions, time_threshold=0.05, similarity_threshold=0.95):
+    # Reference: the original O(n·m) scan from Summarizer.annotate_by_matching
+    for e in emotions:
+        time_match = abs(float(t["start_time"]) - float(e["start_time"])) <= time_threshold
+        text_match = SequenceMatcher(None, t["text"].strip(), e["text"].strip()).ratio() >= similarity_threshold
+        if time_match and text_match:
+            return e
+    return None
+
+
+def make_lines(n, seed=7):
+    rng = random.Random(seed)
+    words = ["okay", "yes", "no", "really", "I think", "we should", "maybe", "tomorrow", "great", "sorry"]
+    lines = []
+    for i in range(n):
+        start = round(i * 1.7 + rng.random(), 2)
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(1, 8)))
+        lines.append({"speaker": rng.randint(1, 3), "text": text, "start_time": start, "end_time": start + 1})
+    return lines
+
+
+def test_matches_brute_force_on_noisy_data():
+    rng = random.Random(3)
+    transcript = make_lines(300)
+    emotions = []
+    for line in transcript:
+        if rng.random() < 0.1:
+            continue  # dropped by the emotion stage (e.g. empty text)
+        text = line["text"]
+        if rng.random() < 0.2:
+            text = text + rng.choice([".", "!", " uh"])  # near-identical text
+        start = line["start_time"] + rng.choice([0, 0, 0.01, 0.05, 0.2])
+        emotions.append({"text": f" {text} ", "start_time": start, "emotions": [{"label": "joy", "score": rng.random()}]})
+    rng.shuffle(emotions)
+
+    aligner = EmotionAligner(emotions)
+    for t, match in zip(transcript, aligner.align(transcript)):
+        expected = brute_force_match(t, emotions)
+        if match is not None and match is not expected:
+            # The only allowed difference: an exact-text match beats an earlier fuzzy one
+            assert expected is not None
+            assert match["text"].strip() == t["text"].strip() != expected["text"].strip()
+        else:
+            assert match is expected
+
+
+def test_exact_match_prefers_first_entry_in_input_order():
+    emotions = [
+        {"text": "hello there", "start_time": 1.02, "emotions": ["second"]},
+        {"text": "hello there", "start_time": 1.00, "emotions": ["first"]},
+    ]
+    match = EmotionAligner(emotions).match(1.01, "hello there")
+    assert match["emotions"] == ["second"]
+
+
+def test_no_match_outside_time_window():
+    emotions = [{"text": "hello there", "start_time": 2.0, "emotions": []}]
+    assert EmotionAligner(emotions).match(1.0, "hello there") is None
+
+
+def test_fuzzy_fallback_within_window():
+    emotions = [{"text": "this is a fairly long sentence about the budget!", "start_time": 5.0, "emotions": ["x"]}]
+    match = EmotionAligner(emotions).match(5.03, "this is a fairly long sentence about the budget.")
+    assert match is emotions[0]
@@ -0,0 +1,36 @@
+import io
+import struct
+
+from app.storage.audio_format import sniff, sniff_bytes
+
+
+def wav(sample_rate=16000, channels=1, bits=16, tag=1, extra_chunks=b""):
+    block_align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", tag, channels, sample_rate, sample_rate * block_align, block_align, bits)
+    if tag == 0xFFFE:
+        fmt += struct.pack("<HHI", 22, bits, 0x4) + struct.pack("<H", 1) + b"\x00" * 14
+    body = b"WAVE" + extra_chunks + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", 4) + b"\0" * 4
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def test_speech_ready_wav_is_recognized_from_the_header():
+    assert sniff_bytes(wav()).speech_ready
+    # LIST chunk before fmt, odd size padded to a word boundary
+    assert sniff_bytes(wav(extra_chunks=b"LIST" + struct.pack("<I", 3) + b"abc\0")).speech_ready
+    assert sniff_bytes(wav(tag=0xFFFE)).speech_ready
+
+
+def test_other_audio_needs_conversion():
+    assert not sniff_bytes(wav(sample_rate=44100, channels=2)).speech_ready
+    assert not sniff_bytes(wav(bits=24)).speech_ready
+    assert sniff_bytes(wav(tag=3)).codec == "0x0003"  # float PCM
+    assert sniff_bytes(b"ID3\x04" + b"\0" * 20).container == "mp3"
+    assert sniff_bytes(b"OggS" + b"\0" * 20).container == "ogg"
+    assert sniff_bytes(b"\0\0\0\x20ftypM4A ").container == "mp4"
+    assert sniff_bytes(b"hello").container == "unknown"
+
+
+def test_sniff_leaves_the_stream_where_it_was():
+    stream = io.BytesIO(wav())
+    assert sniff(stream).describe() == "wav/pcm 16000 Hz, 1 ch, 16-bit"
+    assert stream.tell() == 0
@@ -0,0 +1,48 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from app.core.cancellation import (
+    CancellationToken,
+    Cancelled,
+    DeadlineExceeded,
+    cancellation_scope,
+    check_cancelled,
+    outcome_status,
+    wait_result,
+)
+
+
+def test_deadline_bounds_future_wait():
+    token = CancellationToken(timeout=0.05)
+    future = Future()
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded) as exceeded:
+        token.result(future)
+    assert time.monotonic() - start < 1
+    assert future.cancelled() and outcome_status(exceeded.value) == "timed_out"
+
+
+def test_cancel_reaches_child_tokens_and_pending_waits():
+    parent = CancellationToken()
+    child = CancellationToken(timeout=60, parent=parent)
+    future = Future()
+
+    with cancellation_scope(child):
+        check_cancelled()
+        parent.cancel("deleted")
+        with pytest.raises(Cancelled) as cancelled:
+            wait_result(future)
+
+    assert cancelled.value.reason == "deleted"
+    assert future.cancelled()
+    assert outcome_status(RuntimeError("boom")) == "failed"
+
+
+def test_no_token_means_no_limit():
+    future = Future()
+    future.set_result(42)
+    check_cancelled()
+    assert wait_result(future) == 42
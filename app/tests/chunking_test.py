@@ -0,0 +1,18 @@
+from app.services.summary.chunking import chunk_lines
+
+
+def test_chunks_preserve_order_and_respect_budget():
+    lines = [f"line {i}" for i in range(50)]
+    chunks = chunk_lines(lines, max_tokens=10, token_counts=[3] * len(lines))
+
+    assert [line for chunk in chunks for line in chunk] == lines
+    assert all(len(chunk) * 4 <= 10 for chunk in chunks)
+
+
+def test_oversized_line_gets_its_own_chunk():
+    chunks = chunk_lines(["a", "huge", "b"], max_tokens=10, token_counts=[2, 50, 2])
+    assert chunks == [["a"], ["huge"], ["b"]]
+
+
+def test_empty_input():
+    assert chunk_lines([], max_tokens=10) == []
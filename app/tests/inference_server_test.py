@@ -0,0 +1,59 @@
+import queue
+
+import pytest
+
+from app.services.emotions.inference_server import (
+    _DEAD,
+    _READY,
+    EmotionInferenceClient,
+    InferenceConnection,
+    _drop_cancelled,
+)
+
+
+def test_cancelled_requests_are_not_batched():
+    cancel_q = queue.Queue()
+    cancel_q.put((0, 2))
+    cancel_q.put((1, 1))  # same request id, another client: still wanted
+    cancel_q.put((0, 7))  # answered by another worker: never seen here
+    cancelled = {}
+
+    kept = _drop_cancelled([(0, 1, ["a"]), (0, 2, ["b"]), (0, 3, ["c"]), (1, 2, ["d"])], cancel_q, cancelled)
+
+    assert [(client_id, request_id) for client_id, request_id, _ in kept] == [(0, 1), (0, 3), (1, 2)]
+    assert list(cancelled) == [(1, 1), (0, 7)]
+
+
+def make_client(client_id=0):
+    connection = InferenceConnection(
+        client_id=client_id, requests_q=queue.Queue(), responses_q=queue.Queue(),
+        cancel_qs=[queue.Queue()], max_batch=2, workers=1,
+    )
+    return EmotionInferenceClient(connection)
+
+
+def test_client_gets_answers_from_its_own_queue():
+    client = make_client(client_id=3)
+
+    future = client.submit(["a", "b"])
+    client_id, request_id, texts = client.connection.requests_q.get(timeout=1)
+    client.connection.responses_q.put((_READY, 123, None))
+    client.connection.responses_q.put((request_id, [["joy"], ["anger"]], None))
+
+    assert (client_id, texts) == (3, ["a", "b"])
+    assert future.result(timeout=1) == [["joy"], ["anger"]]
+    assert client.is_ready()
+    client.close()
+
+
+def test_dead_host_fails_pending_requests():
+    client = make_client()
+
+    future = client.submit(["a"])
+    client.connection.responses_q.put((_DEAD, None, "Emotion inference workers exited unexpectedly"))
+
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
+    assert not client.is_ready()
+    with pytest.raises(RuntimeError):
+        client.submit(["b"])
@@ -0,0 +1,275 @@
+import threading
+import time
+
+import pytest
+
+from app.jobs.job_queue import JobQueue, SQLiteJobQueue
+from app.jobs.worker import Worker
+
+
+def make_queue(tmp_path, **kwargs):
+    return SQLiteJobQueue(tmp_path / "jobs.sqlite3", **kwargs)
+
+
+def test_incomplete_backend_fails_when_created():
+    class HalfQueue(JobQueue):
+        def enqueue(self, kind, payload, dedupe_key=None, max_attempts=1, owner=None, weight=1.0):
+            return 1
+
+    with pytest.raises(TypeError):
+        HalfQueue()
+
+
+def test_claim_complete_and_dedupe(tmp_path):
+    queue = make_queue(tmp_path)
+    job_id = queue.enqueue("process_session", {"session_id": "s1"}, dedupe_key="s1")
+    assert queue.enqueue("process_session", {"session_id": "s1"}, dedupe_key="s1") == job_id
+
+    job = queue.claim("w1", visibility_timeout=60)
+    assert job.id == job_id and job.payload == {"session_id": "s1"} and job.attempts == 1
+    assert queue.claim("w2", visibility_timeout=60) is None
+
+    queue.complete(job.id, "w1")
+    assert queue.stats()["jobs"]["process_session"]["done"] == 1
+    # Finished jobs no longer block a new job for the same session
+    assert queue.enqueue("process_session", {"session_id": "s1"}, dedupe_key="s1") != job_id
+
+
+def test_failed_jobs_back_off_then_die(tmp_path):
+    queue = make_queue(tmp_path, retry_backoff=0)
+    queue.enqueue("process_session", {}, max_attempts=2)
+
+    queue.fail(queue.claim("w1", 60).id, "w1", "boom")
+    job = queue.claim("w1", 60)
+    assert job.attempts == 2 and job.last_error == "boom"
+
+    queue.fail(job.id, "w1", "boom again")
+    assert queue.claim("w1", 60) is None
+    assert queue.stats()["jobs"]["process_session"]["dead"] == 1
+
+
+def test_expired_lease_makes_job_visible_again(tmp_path):
+    queue = make_queue(tmp_path, retry_backoff=0)
+    queue.enqueue("process_session", {})
+
+    first = queue.claim("crashed-worker", visibility_timeout=0.01)
+    time.sleep(0.05)
+    second = queue.claim("w2", visibility_timeout=60)
+
+    assert second.id == first.id and second.attempts == 2
+    assert not queue.extend(first.id, "crashed-worker", 60)
+
+
+def test_kind_caps_limit_running_jobs(tmp_path):
+    queue = make_queue(tmp_path, kind_caps={"process_session": 1})
+    queue.enqueue("process_session", {})
+    queue.enqueue("process_session", {})
+    queue.enqueue("other", {})
+
+    assert queue.claim("w1", 60).kind == "process_session"
+    assert queue.claim("w2", 60).kind == "other"
+    assert queue.claim("w3", 60) is None
+
+
+def test_stage_slots_cap_concurrency(tmp_path):
+    queue = make_queue(tmp_path)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run():
+        with queue.stage_slot("emotions", cap=2, lease_sec=60, poll_interval=0.01):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak[0] == 2
+
+
+def test_worker_runs_handler_and_records_failures(tmp_path):
+    queue = make_queue(tmp_path, retry_backoff=0)
+    queue.enqueue("ok", {"n": 1})
+    queue.enqueue("broken", {}, max_attempts=1)
+    seen = []
+
+    def broken(job):
+        raise RuntimeError("nope")
+
+    worker = Worker(queue, {"ok": lambda job: seen.append(job.payload["n"]), "broken": broken})
+    while worker.run_once():
+        pass
+
+    stats = queue.stats()["jobs"]
+    assert seen == [1]
+    assert stats["ok"]["done"] == 1 and stats["broken"]["dead"] == 1
+
+
+def test_fair_share_alternates_between_owners(tmp_path):
+    queue = make_queue(tmp_path, max_in_flight=0, user_max_running=0)
+    for n in range(3):
+        queue.enqueue("process_session", {"n": f"a{n}"}, owner="alice")
+    queue.enqueue("process_session", {"n": "b0"}, owner="bob")
+
+    # Bob's single upload overtakes Alice's backlog instead of waiting behind it
+    order = [queue.claim("w1", 60).payload["n"] for _ in range(3)]
+    assert order == ["a0", "b0", "a1"]
+
+
+def test_user_quota_and_in_flight_limit(tmp_path):
+    queue = make_queue(tmp_path, max_in_flight=3, user_max_running=2)
+    for _ in range(3):
+        queue.enqueue("process_session", {}, owner="alice")
+    for _ in range(2):
+        queue.enqueue("process_session", {}, owner="bob")
+
+    owners = [queue.claim("w1", 60).owner for _ in range(3)]
+    assert sorted(owners) == ["alice", "alice", "bob"]
+    assert queue.claim("w1", 60) is None  # 3 in flight
+    assert queue.backlog(owner="alice") == {"queued": 1, "running": 2}
+
+
+def test_position_estimates_round_robin_place(tmp_path):
+    from app.jobs.admission import AdmissionController, AdmissionRejected
+
+    queue = make_queue(tmp_path)
+    alice = [queue.enqueue("process_session", {}, owner="alice") for _ in range(3)]
+    bob = queue.enqueue("process_session", {}, owner="bob")
+    assert queue.position(bob) == 2
+    assert queue.position(alice[2]) == 4
+
+    admission = AdmissionController(queue, max_queued=10, user_max_queued=3)
+    admission.admit("bob")
+    with pytest.raises(AdmissionRejected) as rejected:
+        admission.admit("alice")
+    assert rejected.value.retry_after >= 5
+
+
+def test_cancel_drops_queued_job_and_stops_running_one(tmp_path):
+    from app.core.cancellation import check_cancelled
+
+    queue = make_queue(tmp_path)
+    queue.enqueue("process_session", {}, dedupe_key="queued")
+    assert queue.cancel("queued") == "cancelled"
+    assert queue.claim("w1", 60) is None
+
+    queue.enqueue("process_session", {}, dedupe_key="running")
+    started = threading.Event()
+
+    def long_job(job):
+        started.set()
+        while True:
+            check_cancelled()
+            time.sleep(0.01)
+
+    worker = Worker(queue, {"process_session": long_job}, cancel_poll_interval=0.05)
+    thread = threading.Thread(target=worker.run_once)
+    thread.start()
+    assert started.wait(2)
+    assert queue.cancel("running", reason="deleted") == "cancelling"
+    thread.join(2)
+
+    assert not thread.is_alive()
+    assert queue.stats()["jobs"]["process_session"]["cancelled"] == 2
+    assert queue.cancel("running") is None
+
+
+def test_worker_runs_jobs_concurrently_and_drains_on_stop(tmp_path):
+    queue = make_queue(tmp_path)
+    for n in range(3):
+        queue.enqueue("slow", {"n": n})
+    running, release = threading.Semaphore(0), threading.Event()
+
+    def slow(job):
+        running.release()
+        release.wait(5)
+
+    worker = Worker(queue, {"slow": slow}, poll_interval=0.01, concurrency=3)
+    stop = threading.Event()
+    thread = threading.Thread(target=worker.run, args=(stop,))
+    thread.start()
+    for _ in range(3):
+        assert running.acquire(timeout=2)
+
+    stop.set()
+    release.set()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert queue.stats()["jobs"]["slow"]["done"] == 3
+
+
+def test_worker_heartbeats_until_it_stops(tmp_path):
+    queue = make_queue(tmp_path)
+    worker = Worker(queue, {}, poll_interval=0.01, heartbeat_interval=0.01, status=lambda: {"ready": False})
+    stop = threading.Event()
+    thread = threading.Thread(target=worker.run, args=(stop,))
+    thread.start()
+    time.sleep(0.1)
+
+    [entry] = queue.workers(max_age_sec=5)
+    assert entry["id"] == worker.worker_id and entry["ready"] is False and entry["running"] == 0
+
+    stop.set()
+    thread.join(2)
+    assert queue.workers(max_age_sec=5) == []
+
+
+def test_silent_workers_are_forgotten(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.heartbeat("w1", {"ready": True})
+    time.sleep(0.05)
+
+    assert queue.workers(max_age_sec=0.01) == []
+
+
+def test_admission_limits_hold_under_concurrent_uploads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.jobs.admission import AdmissionController, AdmissionRejected
+
+    admission = AdmissionController(make_queue(tmp_path), max_queued=0, user_max_queued=3)
+
+    def upload(n):
+        try:
+            admission.admit("alice")  # every upload passes the early check...
+            time.sleep(0.05)
+            return admission.enqueue("process_session", {"n": n}, owner="alice", dedupe_key=f"s{n}")
+        except AdmissionRejected:
+            return None
+
+    with ThreadPoolExecutor(8) as pool:
+        job_ids = list(pool.map(upload, range(8)))
+
+    # ...but only three get into the queue
+    assert len([job_id for job_id in job_ids if job_id is not None]) == 3
+    assert admission.queue.backlog(owner="alice")["queued"] == 3
+
+
+def test_cancel_and_wait_returns_once_the_worker_has_stopped(tmp_path, monkeypatch):
+    import asyncio
+
+    from app.jobs import handlers
+
+    queue = make_queue(tmp_path)
+    monkeypatch.setattr(handlers, "get_job_queue", lambda: queue)
+    queue.enqueue("process_session", {}, dedupe_key="s1")
+    job = queue.claim("w1", 60)
+
+    # The worker notices the cancel a little later and records it
+    threading.Timer(0.2, queue.cancelled, args=(job.id, "w1", "deleted")).start()
+    started = time.monotonic()
+    assert asyncio.run(handlers.cancel_session_and_wait("s1", "deleted", timeout=2, poll_interval=0.02))
+    assert time.monotonic() - started >= 0.2
+    assert not queue.is_active("s1")
+
+    queue.enqueue("process_session", {}, dedupe_key="s2")
+    queue.claim("w1", 60)
+    assert not asyncio.run(handlers.cancel_session_and_wait("s2", "deleted", timeout=0.1, poll_interval=0.02))
@@ -0,0 +1,146 @@
+import threading
+
+import pytest
+
+from app.services.pipeline import PipelineExecutor, Stage, StageFailed
+from app.services.session_context import SessionContext
+
+
+class MemoryCheckpoints:
+    def __init__(self):
+        self.data = {}
+
+    def load(self, session_id):
+        return self.data.get(session_id, {})
+
+    def save(self, session_id, checkpoint):
+        self.data[session_id] = {"stages": dict(checkpoint["stages"])}
+
+
+def make_stages(calls, fail=()):
+    def step(name):
+        def run(ctx):
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError(f"{name} broke")
+            return {"from": name}
+        return run
+
+    return [
+        Stage("transcribe", run=step("transcribe"), restore=lambda ctx, out: calls.append(f"restore:{out['from']}")),
+        Stage("metadata", run=step("metadata"), depends_on=("transcribe",)),
+        Stage("emotions", run=step("emotions"), depends_on=("transcribe",)),
+        Stage("summary", run=step("summary"), depends_on=("transcribe", "emotions")),
+    ]
+
+
+def test_runs_stages_in_dependency_order():
+    calls = []
+    outcome = PipelineExecutor(make_stages(calls), MemoryCheckpoints()).run(SessionContext("s", "a.wav"))
+
+    assert set(outcome.values()) == {"completed"}
+    assert calls[0] == "transcribe" and calls[-1] == "summary"
+    assert calls.index("emotions") < calls.index("summary")
+
+
+def test_independent_stages_run_in_parallel():
+    barrier = threading.Barrier(2, timeout=2)
+    stages = [
+        Stage("a", run=lambda ctx: barrier.wait() and None),
+        Stage("b", run=lambda ctx: barrier.wait() and None),
+    ]
+    # Would time out (BrokenBarrierError) if the two stages ran one after the other
+    assert PipelineExecutor(stages, MemoryCheckpoints()).run(SessionContext("s", "a.wav")) == {
+        "a": "completed",
+        "b": "completed",
+    }
+
+
+def test_resume_skips_checkpointed_stages_and_restores_dependencies():
+    checkpoints = MemoryCheckpoints()
+    calls = []
+    with pytest.raises(StageFailed) as error:
+        PipelineExecutor(make_stages(calls, fail={"summary"}), checkpoints).run(SessionContext("s", "a.wav"))
+    assert error.value.stage == "summary"
+
+    calls.clear()
+    outcome = PipelineExecutor(make_stages(calls), checkpoints).run(SessionContext("s", "a.wav"), resume=True)
+
+    assert outcome == {"transcribe": "skipped", "metadata": "skipped", "emotions": "skipped", "summary": "completed"}
+    assert calls == ["restore:transcribe", "summary"]
+
+
+def test_resume_skips_stages_whose_artifacts_exist():
+    calls = []
+    stages = make_stages(calls)
+    stages[0].artifacts_exist = lambda ctx: True
+    stages[0].restore = None
+
+    outcome = PipelineExecutor(stages, MemoryCheckpoints()).run(SessionContext("s", "a.wav"), resume=True)
+
+    assert outcome["transcribe"] == "skipped"
+    assert "transcribe" not in calls
+
+
+def test_rejects_cycles():
+    stages = [Stage("a", run=lambda ctx: None, depends_on=("b",)), Stage("b", run=lambda ctx: None, depends_on=("a",))]
+    with pytest.raises(ValueError):
+        PipelineExecutor(stages, MemoryCheckpoints())
+
+
+def test_stage_and_call_spans_land_in_the_session_timings():
+    from app.core.metrics import call_span
+
+    def transcribe(ctx):
+        with call_span("speech", "create_job"):
+            pass
+
+    ctx = SessionContext("s", "a.wav")
+    PipelineExecutor([Stage("transcribe", run=transcribe)], MemoryCheckpoints()).run(ctx)
+    timings = ctx.timings.to_dict()
+
+    assert set(timings["stages"]) == {"transcribe"}
+    assert timings["calls"]["speech.create_job"]["count"] == 1
+    assert [s["parent"] for s in timings["spans"] if s["kind"] == "call"] == ["transcribe"]
+
+
+def test_only_reruns_selected_stages_on_stored_results():
+    checkpoints = MemoryCheckpoints()
+    PipelineExecutor(make_stages([]), checkpoints).run(SessionContext("s", "a.wav"))
+
+    calls = []
+    outcome = PipelineExecutor(make_stages(calls), checkpoints).run(SessionContext("s", "a.wav"), only={"emotions"})
+
+    assert outcome["emotions"] == "completed" and outcome["summary"] == "skipped"
+    assert calls == ["restore:transcribe", "emotions"]
+
+
+def test_cancelled_session_stops_before_the_next_stage():
+    from app.core.cancellation import Cancelled
+
+    calls = []
+    ctx = SessionContext("s", "a.wav")
+    stages = make_stages(calls)
+    stages[0] = Stage("transcribe", run=lambda c: calls.append("transcribe") or c.cancellation.cancel())
+
+    with pytest.raises(StageFailed) as failed:
+        PipelineExecutor(stages, MemoryCheckpoints()).run(ctx)
+    assert isinstance(failed.value.error, Cancelled) and failed.value.error.reason == "cancelled"
+    assert calls == ["transcribe"]
+
+
+def test_only_fails_when_a_dependency_cannot_be_restored():
+    checkpoints = MemoryCheckpoints()
+    PipelineExecutor(make_stages([]), checkpoints).run(SessionContext("s", "a.wav"))
+
+    def restore(ctx, outputs):
+        raise FileNotFoundError("transcript blob missing")
+
+    calls = []
+    stages = make_stages(calls)
+    stages[0].restore = restore
+
+    with pytest.raises(StageFailed) as failed:
+        PipelineExecutor(stages, checkpoints).run(SessionContext("s", "a.wav"), only={"emotions"})
+    assert failed.value.stage == "transcribe"
+    assert calls == []
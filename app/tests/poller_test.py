@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from app.services.transcript.poller import TranscriptionPoller, TranscriptionPollError
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, data=None, headers=None):
+        self.status_code = status_code
+        self.data = data
+        self.headers = headers or {}
+        self.text = str(data)
+
+    def json(self):
+        return self.data
+
+
+class ScriptedHttp:
+    """Answers each GET with the next scripted response (or raises it); the last one repeats."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append(time.monotonic())
+        response = self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def running(status="Running"):
+    return FakeResponse(data={"status": status})
+
+
+def make_poller(http, **kwargs):
+    options = {"min_interval": 0.02, "max_interval": 0.08, "backoff": 2.0}
+    return TranscriptionPoller(http=http, **{**options, **kwargs})
+
+
+def test_polls_with_growing_interval_until_terminal():
+    http = ScriptedHttp(running(), running(), running(), running("Succeeded"))
+
+    assert make_poller(http).submit("job").result(timeout=5) == {"status": "Succeeded"}
+
+    gaps = [b - a for a, b in zip(http.calls, http.calls[1:])]
+    assert len(gaps) == 3
+    assert gaps[0] < gaps[2]  # 0.02 s, then 0.04 s, then 0.08 s (±10% jitter)
+
+
+def test_retry_after_overrides_backoff():
+    http = ScriptedHttp(FakeResponse(429, headers={"Retry-After": "0.3"}), running("Succeeded"))
+
+    make_poller(http).submit("job").result(timeout=5)
+
+    assert http.calls[1] - http.calls[0] >= 0.3
+
+
+def test_non_retryable_client_error_fails_fast():
+    http = ScriptedHttp(FakeResponse(404, data={"error": "not found"}))
+
+    with pytest.raises(TranscriptionPollError):
+        make_poller(http, min_interval=5).submit("job").result(timeout=2)
+    assert len(http.calls) == 1
+
+
+def test_unexpected_errors_resolve_the_job():
+    http = ScriptedHttp(ValueError("bad stub"))
+
+    with pytest.raises(ValueError):
+        make_poller(http).submit("job").result(timeout=2)
+
+
+def test_cancelled_job_stops_being_polled():
+    http = ScriptedHttp(running())
+    poller = make_poller(http)
+
+    future = poller.submit("job")
+    time.sleep(0.1)
+    future.cancel()
+    time.sleep(0.05)
+    polls = len(http.calls)
+    time.sleep(0.2)
+
+    assert poller.in_flight == 0
+    assert len(http.calls) == polls
@@ -0,0 +1,50 @@
+import threading
+import time
+
+import pytest
+
+from app.core.cancellation import Cancelled, CancellationToken, DeadlineExceeded, cancellation_scope
+from app.services.summary.rate_limiter import AzureOpenAIRateLimiter
+
+
+def test_waiting_caller_leaves_the_queue_when_cancelled():
+    limiter = AzureOpenAIRateLimiter(requests_per_minute=1, tokens_per_minute=1000)
+    limiter.acquire(10)  # the next request has to wait about a minute
+
+    token = CancellationToken()
+    threading.Timer(0.1, token.cancel).start()
+    started = time.monotonic()
+    with cancellation_scope(token), pytest.raises(Cancelled):
+        limiter.acquire(10)
+
+    assert time.monotonic() - started < 2
+    assert limiter.queue_depth == 0
+
+
+def test_waiting_caller_stops_at_the_session_deadline():
+    limiter = AzureOpenAIRateLimiter(requests_per_minute=1, tokens_per_minute=1000)
+    limiter.acquire(10)
+
+    with cancellation_scope(CancellationToken(timeout=0.2)), pytest.raises(DeadlineExceeded):
+        limiter.acquire(10)
+
+
+def test_processes_sharing_the_queue_database_share_one_quota(tmp_path):
+    from app.jobs.job_queue import SQLiteJobQueue
+    from app.services.summary.rate_limiter import SharedQuota
+
+    def limiter():
+        # A queue object per limiter, as in separate worker processes
+        queue = SQLiteJobQueue(tmp_path / "jobs.sqlite3")
+        return AzureOpenAIRateLimiter(quota=SharedQuota(queue, requests_per_minute=2, tokens_per_minute=1000))
+
+    first, second = limiter(), limiter()
+    first.acquire(10)
+    second.acquire(10)
+
+    with pytest.raises(TimeoutError):
+        first.acquire(10, timeout=0.2)
+    assert second.stats()["requests_available"] < 1
+
+    second.penalize({"retry-after": "30"}, fallback_sec=1)
+    assert first.stats()["blocked_for_sec"] > 25
@@ -0,0 +1,49 @@
+import pytest
+
+from app.db.status_writer import SessionStatusWriter
+from app.services.facade import DialogueProcessor
+from app.services.pipeline import StageFailed
+
+
+class FakeSessionDB:
+    def __init__(self):
+        self.rows = {"s1": {"id": "s1", "audio_file_url": "s1/audio.wav", "duration": 60}}
+
+    def get_session(self, session_id):
+        return self.rows.get(session_id)
+
+    def transition(self, session_id, updates):
+        self.rows[session_id].update(updates)
+
+
+class FakeStorage:
+    def load_checkpoint(self, session_id):
+        return {}
+
+    def store_checkpoint(self, session_id, checkpoint):
+        pass
+
+    def load_transcript(self, session_id):
+        return [{"speaker": "A", "text": "hello", "start_time": 0, "end_time": 1}]
+
+
+class BrokenEmotioner:
+    def get_emotions(self, transcript):
+        raise RuntimeError("model unavailable")
+
+
+def test_reprocess_flushes_buffered_statuses_and_records_the_failure():
+    db = FakeSessionDB()
+    processor = DialogueProcessor(
+        session_db=db, session_storage=FakeStorage(), transcriber=object(),
+        emotion_analyzer=BrokenEmotioner(), summarizer=object(),
+    )
+    # Write-behind: nothing reaches the row unless reprocess() flushes it
+    processor.status = SessionStatusWriter(db, write_behind=True, flush_interval=3600)
+
+    with pytest.raises(StageFailed):
+        processor.reprocess("s1", ["emotions"])
+
+    row = db.rows["s1"]
+    assert row["emotion_breakdown_status"] == "failed"
+    assert row["session_status"] == "failed" and row["processing_error"] == "model unavailable"
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta, timezone
+
+from app.storage.azure.sas_cache import SasUrlCache, bucketed_expiry
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2025, 1, 1, 12, 3, tzinfo=timezone.utc)
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(clock, signed):
+    def sign(blob_name, permission, expiry):
+        signed.append((blob_name, permission, expiry))
+        return f"sp={permission}&se={expiry:%Y-%m-%dT%H:%M:%SZ}"
+
+    return SasUrlCache(sign, "https://acct.blob.core.windows.net/c", ttl_minutes=60,
+                       bucket_minutes=10, refresh_margin_minutes=15, clock=clock)
+
+
+def test_expiry_is_rounded_up_to_the_bucket():
+    now = datetime(2025, 1, 1, 12, 3, 20, tzinfo=timezone.utc)
+    bucket = timedelta(minutes=10)
+
+    assert bucketed_expiry(now, timedelta(minutes=60), bucket) == datetime(2025, 1, 1, 13, 10, tzinfo=timezone.utc)
+    assert bucketed_expiry(now - timedelta(seconds=20), timedelta(minutes=57), bucket) == datetime(2025, 1, 1, 13, 0, tzinfo=timezone.utc)
+
+
+def test_url_is_reused_until_it_nears_expiry():
+    clock, signed = Clock(), []
+    cache = make_cache(clock, signed)
+
+    first = cache.get("s1/summary")
+    clock.now += timedelta(minutes=40)
+    assert cache.get("s1/summary") == first
+    assert first == "https://acct.blob.core.windows.net/c/s1/summary?sp=r&se=2025-01-01T13:10:00Z"
+    assert len(signed) == 1
+
+    # Separate entries per permission and per blob
+    cache.get("s1/summary", permission="rw")
+    cache.get("s1/transcript")
+    assert len(signed) == 3
+
+    # Less than the refresh margin left: re-signed for the next window
+    clock.now += timedelta(minutes=13)
+    renewed = cache.get("s1/summary")
+    assert renewed != first and renewed.endswith("se=2025-01-01T14:00:00Z")
+
+
+def test_oldest_entries_are_evicted():
+    clock, signed = Clock(), []
+    cache = make_cache(clock, signed)
+    cache.max_entries = 2
+
+    for name in ("a", "b", "a", "c", "a", "b"):
+        cache.get(name)
+
+    assert [blob for blob, _, _ in signed] == ["a", "b", "c", "b"]
@@ -0,0 +1,22 @@
+import json
+
+from app.storage import serialization
+
+
+def test_json_artifacts_are_compact_and_round_trip():
+    content = [{"speaker": "1", "text": "héllo — ok", "emotions": [{"label": "joy", "score": 0.91}]}]
+
+    payload = serialization.dumps_json(content)
+
+    assert isinstance(payload, bytes)
+    assert b"\n" not in payload and b", " not in payload
+    assert json.loads(payload) == content == serialization.loads_json(payload)
+
+
+def test_stdlib_fallback_matches(monkeypatch):
+    content = {"stages": {"transcribe": {"status": "completed", "outputs": {"duration_ms": 1200}}}}
+    fast = serialization.dumps_json(content)
+
+    monkeypatch.setattr(serialization, "orjson", None)
+    assert serialization.dumps_json(content) == fast
+    assert serialization.loads_json(fast) == content
@@ -0,0 +1,34 @@
+import asyncio
+
+from app.storage.session_storage import SessionStorage, get_session_storage
+
+
+class RecordingAsyncBlobs:
+    def __init__(self, names):
+        self.names = names
+        self.deleted = []
+
+    async def list_blob_names(self, prefix):
+        return [name for name in self.names if name.startswith(prefix)]
+
+    async def delete_blobs(self, blob_names):
+        self.deleted.extend(blob_names)
+
+
+def test_delete_removes_every_blob_of_the_session():
+    blobs = RecordingAsyncBlobs([
+        "s1/audio.wav", "s1/transcript", "s1/summary", "s1/summary_clinical_summary", "s1/checkpoint", "s10/summary",
+    ])
+    storage = SessionStorage(azure=object(), azure_async=blobs)
+
+    asyncio.run(storage.delete_all_async("s1"))
+
+    # Including a style that is no longer configured, and not another session sharing the prefix "s1"
+    assert blobs.deleted == ["s1/audio.wav", "s1/transcript", "s1/summary", "s1/summary_clinical_summary", "s1/checkpoint"]
+
+
+def test_session_storage_is_shared(monkeypatch):
+    monkeypatch.setattr("app.storage.session_storage._storage", None)
+    monkeypatch.setattr("app.storage.session_storage.get_azure_blob_service", lambda: object())
+
+    assert get_session_storage() is get_session_storage()
@@ -0,0 +1,38 @@
+from app.db.status_writer import SessionStatusWriter
+
+
+class RecordingDB:
+    def __init__(self):
+        self.updates = []
+
+    def transition(self, session_id, updates):
+        self.updates.append((session_id, dict(updates)))
+
+
+def test_direct_mode_writes_one_update_per_transition():
+    db = RecordingDB()
+    writer = SessionStatusWriter(db, write_behind=False)
+
+    writer.update("s1", {"transcript_url": "s1/transcript", "transcript_status": "completed"})
+    writer.update("s1", {"session_status": "failed"}, error="boom")
+
+    assert db.updates == [
+        ("s1", {"transcript_url": "s1/transcript", "transcript_status": "completed"}),
+        ("s1", {"session_status": "failed", "processing_error": "boom"}),
+    ]
+
+
+def test_write_behind_coalesces_until_flush():
+    db = RecordingDB()
+    writer = SessionStatusWriter(db, write_behind=True, flush_interval=3600)
+
+    writer.update("s1", {"transcript_status": "processing"})
+    writer.update("s1", {"transcript_status": "completed", "transcript_url": "s1/transcript"})
+    writer.update("s2", {"summary_status": "processing"})
+    assert db.updates == []
+
+    writer.flush("s1")
+    assert db.updates == [("s1", {"transcript_status": "completed", "transcript_url": "s1/transcript"})]
+
+    writer.flush()
+    assert db.updates[-1] == ("s2", {"summary_status": "processing"})
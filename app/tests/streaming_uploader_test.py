@@ -0,0 +1,67 @@
+import io
+import struct
+import threading
+
+import pytest
+
+from app.storage.azure.azure_streaming_uploader import AzureStreamingUploader, TranscodeError, wav_header
+
+
+class FakeBlob:
+    def __init__(self):
+        self.staged = {}
+        self.committed = None
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def stage_block(self, block_id, data, length=None):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.staged[block_id] = bytes(data)
+        with self._lock:
+            self.in_flight -= 1
+
+    def commit_block_list(self, blocks, content_settings=None):
+        self.committed = b"".join(self.staged[block.id] for block in blocks)
+
+
+class FakeContainer:
+    def __init__(self):
+        self.blob = FakeBlob()
+
+    def get_blob_client(self, name):
+        return self.blob
+
+
+class PassthroughUploader(AzureStreamingUploader):
+    """`cat` stands in for ffmpeg: the "PCM" out is exactly the bytes in."""
+
+    def __init__(self, container, command=("cat",), **kwargs):
+        super().__init__(container, **kwargs)
+        self.command = list(command)
+
+    def transcode_command(self):
+        return self.command
+
+
+def test_streams_blocks_and_commits_header_first():
+    container = FakeContainer()
+    pcm = bytes(range(256)) * 1000  # 256 000 bytes
+
+    stored = PassthroughUploader(container, block_bytes=10_000, concurrency=3).upload_wav(io.BytesIO(pcm), "s/audio.wav")
+
+    blob = container.blob
+    assert stored == len(pcm)
+    assert blob.committed == wav_header(len(pcm)) + pcm
+    assert len(blob.staged) == 1 + 26  # header + ceil(256 000 / 10 000) data blocks
+    assert blob.max_in_flight <= 3
+    assert struct.unpack("<I", blob.committed[40:44])[0] == len(pcm)
+
+
+def test_failed_transcode_commits_nothing():
+    container = FakeContainer()
+    with pytest.raises(TranscodeError):
+        PassthroughUploader(container, command=("false",)).upload_wav(io.BytesIO(b"not audio"), "s/audio.wav")
+    assert container.blob.committed is None
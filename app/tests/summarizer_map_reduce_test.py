@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+from app.services.summary.prompts import CHUNK_SUMMARY_PROMPT, PromptStyle
+from app.services.summary.summarizer import Summarizer
+
+
+class NoLimit:
+    def acquire(self, tokens):
+        pass
+
+    def update_from_headers(self, headers):
+        pass
+
+
+class FakeClient:
+    """Chat client answering map prompts with a short note and reduce prompts with a summary."""
+
+    def __init__(self):
+        self.map_calls = 0
+        self.reduce_calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=self))
+
+    def create(self, messages, max_tokens, **kwargs):
+        is_map = messages[0]["content"] == CHUNK_SUMMARY_PROMPT["system"]
+        if is_map:
+            self.map_calls += 1
+        else:
+            self.reduce_calls += 1
+        message = SimpleNamespace(content="short note" if is_map else "summary")
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+class EchoClient:
+    """Chat client whose 'summary' is as long as the prompt it was given."""
+
+    def __init__(self):
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(with_raw_response=self))
+
+    def create(self, messages, max_tokens, **kwargs):
+        prompt = messages[-1]["content"]
+        self.calls.append(prompt)
+        message = SimpleNamespace(content=prompt)
+        response = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+
+def annotated(lines: int) -> list[dict]:
+    return [
+        {"speaker": str(i % 2), "text": f"sentence number {i} about the quarterly plan",
+         "emotions": [{"label": "joy", "score": 0.9}]}
+        for i in range(lines)
+    ]
+
+
+def test_map_reduce_stops_when_notes_do_not_shrink():
+    client = EchoClient()
+    summarizer = Summarizer(token_budget=400, chunk_tokens=200, client=client, rate_limiter=NoLimit(), use_cache=False)
+
+    summary = summarizer.summarize_annotated(annotated(200), PromptStyle.EMOTIONAL_STORY)
+
+    assert summary
+    map_calls = len(client.calls) - 1
+    # One round, then it notices the notes grew instead of looping forever
+    assert 0 < map_calls < 200
+    # ...and reduces the shorter input of that round, not the longer notes it produced
+    reduce_prompt = client.calls[-1]
+    assert "sentence number 199" in reduce_prompt and "Part 1/" not in reduce_prompt
+
+
+def test_map_step_runs_once_for_all_styles():
+    styles = [PromptStyle.EMOTIONAL_STORY, PromptStyle.ANALYTICAL, PromptStyle.PER_SPEAKER]
+    single, many = FakeClient(), FakeClient()
+
+    make = lambda client: Summarizer(token_budget=400, chunk_tokens=200, client=client, rate_limiter=NoLimit(), use_cache=False)
+    make(single).summarize_annotated(annotated(200), styles[0])
+
+    summarizer = make(many)
+    summarizer.annotate_by_matching = lambda transcript, emotions: annotated(200)
+    summaries = summarizer.summarize_many([], [], styles)
+
+    assert set(summaries) == set(styles)
+    assert single.map_calls > 1
+    assert many.map_calls == single.map_calls
+    assert many.reduce_calls == len(styles)
@@ -0,0 +1,66 @@
+import itertools
+from types import SimpleNamespace
+
+from app.services.summary.summary_cache import SummaryCache, make_cache_key
+
+
+def make_cache(tmp_path, monkeypatch, max_bytes):
+    # A strictly increasing clock, so "least recently used" never depends on timer resolution
+    ticks = itertools.count(1)
+    monkeypatch.setattr("app.services.summary.summary_cache.time", SimpleNamespace(time=lambda: next(ticks)))
+    return SummaryCache(tmp_path / "summaries.sqlite3", max_bytes=max_bytes)
+
+
+def test_key_changes_with_style_deployment_and_temperature():
+    parts = {"preset": "emotional_story", "prompt": "lines", "deployment": "gpt-4o", "temperature": 0.7}
+    key = make_cache_key(**parts)
+
+    assert make_cache_key(**dict(reversed(parts.items()))) == key
+    assert make_cache_key(**{**parts, "preset": "clinical_summary"}) != key
+    assert make_cache_key(**{**parts, "deployment": "gpt-4o-mini"}) != key
+    assert make_cache_key(**{**parts, "temperature": 0.2}) != key
+
+
+def test_summarizer_keys_cover_style_deployment_and_temperature(monkeypatch):
+    from app.services.summary.prompts import PromptStyle
+    from app.services.summary.summarizer import Summarizer
+
+    def key(style=PromptStyle.EMOTIONAL_STORY, temperature=0.7):
+        summarizer = Summarizer(temperature=temperature, client=object(), rate_limiter=object(), use_cache=False)
+        return summarizer._cache_key(style, "system", "lines")
+
+    base = key()
+    assert key() == base
+    assert key(style=PromptStyle.CLINICAL) != base
+    assert key(temperature=0.2) != base
+    monkeypatch.setattr("app.services.summary.summarizer.AZURE_OPENAI_DEPLOYMENT", "another-deployment")
+    assert key() != base
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, monkeypatch, max_bytes=25)
+
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    assert cache.get("a") == "x" * 10  # "b" is now the least recently used
+    cache.put("c", "z" * 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "x" * 10 and cache.get("c") == "z" * 10
+
+    cache.put("too-big", "w" * 26)  # never stored, evicts nothing
+    assert cache.get("too-big") is None
+    assert cache.stats()["entries"] == 2
+
+
+def test_counters(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, monkeypatch, max_bytes=10)
+
+    assert cache.get("a") is None
+    cache.put("a", "x" * 10)
+    assert cache.get("a") == "x" * 10
+    cache.put("b", "y" * 10)
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5 and stats["bytes"] == 10
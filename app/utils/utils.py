@@ -1,6 +1,8 @@
 import time
 import json
+from email.utils import parsedate_to_datetime
 from pathlib import Path
+from typing import Optional
 
 
 def start_timer(stop_flag):
@@ -22,4 +24,18 @@ def start_timer(stop_flag):
 
 def save_json(data, path: Path):
     with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
\ No newline at end of file
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None